@@ -10,11 +10,15 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Set under `manage.py test`, whose runs leave the metrics and log directories alone
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -42,6 +46,9 @@ INSTALLED_APPS = [
     'panel_module',
     'announcement_module',
     'site_settings_module',
+    'monitoring_module',
+    'job_module',
+    'notification_module',
 ]
 
 MIDDLEWARE = [
@@ -50,6 +57,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoring_module.middleware.RequestProfilingMiddleware',
+    'monitoring_module.middleware.MetricsMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,7 +67,7 @@ ROOT_URLCONF = 'Rayka_institution.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'monitoring_module.template_backend.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -82,10 +91,169 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Cold storage: the scores, attendance and enrollments of archived terms (see
+    # account_module.cold_storage). Create it with `migrate --database=archive`.
+    'archive': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('ARCHIVE_DATABASE', BASE_DIR / 'archive.sqlite3'),
+    },
+}
+
+DATABASE_ROUTERS = ['account_module.routers.ArchiveRouter']
+
+
+# Request profiling
+# Staff requests sent with the X-Profile header (or a random SAMPLE_RATE share of all
+# requests) get a cProfile dump written to DUMP_DIR. Open dumps with `python -m pstats`.
+
+REQUEST_PROFILING = {
+    'HEADER': 'X-Profile',
+    'TOKEN': os.environ.get('REQUEST_PROFILING_TOKEN'),
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', 0)),
+    'DUMP_DIR': BASE_DIR / 'profiles',
+}
+
+
+# Metrics
+# Every worker process writes its samples to a memory-mapped file in DIR; /metrics/ sums
+# them. Empty DIR before (re)starting the server, as Prometheus' multiprocess mode expects.
+# Without DIR (as in test runs), each process keeps its samples in memory.
+
+METRICS = {
+    'DIR': None if TESTING else os.environ.get('METRICS_DIR', BASE_DIR / 'metrics'),
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+
+# Slow-query log
+# Queries slower than THRESHOLD_MS are EXPLAINed in the background and appended to
+# LOG_FILE; summarize them with `manage.py slow_queries`.
+
+SLOW_QUERY_LOG = {
+    'THRESHOLD_MS': float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100)),
+    'EXPLAIN': True,
+    'LOG_FILE': BASE_DIR / 'logs' / 'slow_queries.jsonl',
+}
+
+
+# Slug cache
+# User and class slugs from panel URLs are resolved through a per-process LRU of
+# LOCAL_SIZE entries (kept LOCAL_TTL seconds) in front of the default cache (TIMEOUT).
+
+SLUG_CACHE = {
+    'LOCAL_SIZE': 1024,
+    'LOCAL_TTL': 30,
+    'TIMEOUT': 60 * 60,
+}
+
+
+# Change feed
+# /api/changes/ serves the change log to staff or to `Authorization: Bearer <TOKEN>`.
+# `manage.py prune_changes` compacts it and drops entries older than RETENTION_DAYS.
+
+CHANGE_FEED = {
+    'TOKEN': os.environ.get('CHANGE_FEED_TOKEN'),
+    'RETENTION_DAYS': 30,
 }
 
 
+# Backups
+# `manage.py backup_db` snapshots the databases into DIR while the site runs: SQLite in
+# steps of PAGES pages, SLEEP seconds apart, PostgreSQL through pg_dump. Snapshots are
+# gzipped with a .sha256 file each; the newest KEEP of every database are kept.
+
+BACKUPS = {
+    'DIR': os.environ.get('BACKUP_DIR', BASE_DIR / 'backups'),
+    'PAGES': 256,
+    'SLEEP': 0.05,
+    'KEEP': 7,
+}
+
+
+# Parent notifications
+# Absences and grades are queued as SMS (to parent_number) and email and sent by the job
+# worker in batches per channel, within RATE_PER_MINUTE, retrying failures MAX_ATTEMPTS
+# times. Messages left sending by a worker that died are queued again after SEND_TIMEOUT
+# seconds. The loopback provider only appends messages to PATH; in production use
+# notification_module.providers.HttpSmsProvider (URL, TOKEN) and EmailProvider (FROM).
+
+NOTIFICATIONS = {
+    'PROVIDERS': {
+        'sms': {
+            'BACKEND': 'notification_module.providers.LoopbackProvider',
+            'PATH': BASE_DIR / 'logs' / 'notifications.jsonl',
+            'BATCH_SIZE': 100,
+            'RATE_PER_MINUTE': 600,
+        },
+        'email': {
+            'BACKEND': 'notification_module.providers.LoopbackProvider',
+            'PATH': BASE_DIR / 'logs' / 'notifications.jsonl',
+            'BATCH_SIZE': 50,
+            'RATE_PER_MINUTE': 300,
+        },
+    },
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,
+    'SEND_TIMEOUT': 600,
+}
+
+
+# Logging
+# Domain events (grade changes, promotions, new classes) and the per-request timings go
+# to rotated JSON-lines files through a queue, so the request thread never writes to
+# disk. The console only gets warnings. Test runs log no request timings and write no files.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'events': {
+            '()': 'monitoring_module.events.QueuedJsonLinesHandler',
+            'filename': os.environ.get('EVENT_LOG_FILE', BASE_DIR / 'logs' / 'events.jsonl'),
+            'max_bytes': 10 * 1024 * 1024,
+            'backup_count': 10,
+        },
+        'requests': {
+            '()': 'monitoring_module.events.QueuedJsonLinesHandler',
+            'filename': os.environ.get('REQUEST_LOG_FILE', BASE_DIR / 'logs' / 'requests.jsonl'),
+            'max_bytes': 10 * 1024 * 1024,
+            'backup_count': 5,
+            'plain': True,
+        },
+    },
+    'loggers': {
+        'monitoring_module': {
+            'handlers': ['console'],
+            'level': os.environ.get('MONITORING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+        'monitoring_module.requests': {
+            'handlers': ['requests'],
+            'level': 'WARNING' if TESTING else 'INFO',
+            'propagate': False,
+        },
+        'job_module': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'monitoring_module.events': {
+            'handlers': ['events'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+if TESTING:
+    # Tests read events with assertLogs, which replaces the handlers anyway
+    LOGGING['handlers']['events'] = LOGGING['handlers']['requests'] = {'class': 'logging.NullHandler'}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -1,9 +1,146 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Max
+from django.utils.functional import cached_property
+from job_module.jobs import enqueue
 from . import models
-admin.site.register(models.User)
-admin.site.register(models.Score)
-admin.site.register(models.Term)
-admin.site.register(models.Class)
-admin.site.register(models.AttendanceRecord)
-admin.site.register(models.AttendanceSession)
-admin.site.register(models.AcademicRecord)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids a full COUNT(*) on large, unfiltered changelists.
+
+    PostgreSQL's planner statistics are used when available; otherwise the highest
+    primary key is taken as the estimate, which is an index lookup on every backend.
+    Filtered querysets and small tables still get an exact count.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+        estimate = self.estimate_row_count(self.object_list.model)
+        if estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+    @staticmethod
+    def estimate_row_count(model):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return int(row[0])
+        return model._default_manager.aggregate(highest=Max('pk'))['highest'] or 0
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(models.User)
+class UserAdmin(LargeTableAdmin):
+    list_display = ('username', 'first_name', 'last_name', 'user_type', 'gender', 'current_term')
+    list_filter = ('user_type', 'gender')
+    list_select_related = ('current_term',)
+    # Prefix lookups (istartswith), served by the case-insensitive indexes of migration 0016
+    search_fields = ('^username', '^last_name', '^slug')
+    autocomplete_fields = ('current_term',)
+    filter_horizontal = ('groups', 'user_permissions')
+
+
+@admin.register(models.Term)
+class TermAdmin(admin.ModelAdmin):
+    list_display = ('name', 'order', 'slug', 'closed', 'archived')
+    list_filter = ('closed', 'archived')
+    ordering = ('order',)
+    search_fields = ('name',)
+    actions = ('rollover',)
+
+    @admin.action(description='Roll classes over into the next term')
+    def rollover(self, request, queryset):
+        for term in queryset:
+            enqueue('account_module.rollover_term', {'term_id': term.pk}, key=f'rollover-term:{term.pk}')
+        self.message_user(request, f'Queued the rollover of {len(queryset)} term(s).')
+
+
+@admin.register(models.TermCalendar)
+class TermCalendarAdmin(admin.ModelAdmin):
+    list_display = ('term', 'start_date', 'weekdays', 'session_count')
+    autocomplete_fields = ('term',)
+
+
+class EnrollmentInline(admin.TabularInline):
+    model = models.Enrollment
+    fields = ('student', 'status', 'enrolled_at', 'left_at')
+    autocomplete_fields = ('student',)
+    extra = 0
+    # Ending an enrollment keeps it as history; set its status instead
+    can_delete = False
+
+
+@admin.register(models.Class)
+class ClassAdmin(LargeTableAdmin):
+    list_display = ('name', 'gender', 'term', 'teacher', 'capacity')
+    list_filter = ('gender', 'term')
+    list_select_related = ('term', 'teacher')
+    search_fields = ('^name', '^slug')
+    autocomplete_fields = ('teacher', 'term', 'parent')
+    inlines = (EnrollmentInline,)
+
+
+@admin.register(models.AttendanceSession)
+class AttendanceSessionAdmin(LargeTableAdmin):
+    list_display = ('session_number', 'class_obj', 'date')
+    list_filter = ('date',)
+    list_select_related = ('class_obj',)
+    search_fields = ('^class_obj__name',)
+    autocomplete_fields = ('class_obj',)
+
+
+@admin.register(models.AttendanceRecord)
+class AttendanceRecordAdmin(LargeTableAdmin):
+    list_display = ('student', 'session', 'present')
+    list_filter = ('present',)
+    list_select_related = ('student', 'session__class_obj')
+    search_fields = ('^student__username',)
+    autocomplete_fields = ('student',)
+    raw_id_fields = ('session',)
+
+
+@admin.register(models.ArchivedAttendance)
+class ArchivedAttendanceAdmin(LargeTableAdmin):
+    list_display = ('student', 'class_obj', 'term', 'session_count', 'archived_at')
+    list_filter = ('term',)
+    list_select_related = ('student', 'class_obj', 'term')
+    search_fields = ('^student__username',)
+    # Written by the archiver only
+    readonly_fields = ('student', 'class_obj', 'term', 'present_bits', 'recorded_bits', 'session_count')
+
+
+@admin.register(models.AcademicRecord)
+class AcademicRecordAdmin(LargeTableAdmin):
+    list_display = ('student', 'term', 'passed')
+    list_filter = ('passed', 'term')
+    list_select_related = ('student', 'term')
+    search_fields = ('^student__username',)
+    autocomplete_fields = ('student', 'term')
+
+
+@admin.register(models.Score)
+class ScoreAdmin(LargeTableAdmin):
+    list_display = ('student', 'term', 'quiz_1', 'quiz_2', 'oral_or_listening', 'class_activity', 'final', 'total')
+    list_filter = ('term',)
+    list_select_related = ('student', 'term')
+    search_fields = ('^student__username',)
+    autocomplete_fields = ('student', 'term')
+
+    @admin.display(description='Total')
+    def total(self, obj):
+        return obj.total_score
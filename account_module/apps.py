@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccountModuleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account_module'
+
+    def ready(self):
+        from . import signals  # noqa: F401
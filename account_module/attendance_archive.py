@@ -0,0 +1,138 @@
+"""
+Archival of the attendance of closed terms into bitmaps.
+
+A live AttendanceRecord is one row per student per session. Once a term is closed,
+`archive_term()` folds its records into one ArchivedAttendance row per student and
+class and deletes them, a chunk of records per transaction, so a term's attendance
+takes a tenth or less of the rows. Re-running it (after records were added to a closed
+term, or after an interrupted run) merges into the existing rows.
+
+The read helpers below return live records and the archived ones decoded into unsaved
+AttendanceRecord instances, so pages render the same before and after archival. A live
+record of a session overrides that session's archived bit.
+"""
+from django.db import DEFAULT_DB_ALIAS, transaction
+from .models import User, Term, AttendanceSession, AttendanceRecord, ArchivedAttendance, archiving
+
+
+def session_presence(session):
+    """
+    {student_id: present} for an attendance session.
+    """
+    bit = 1 << (session.session_number - 1)
+    presence = {
+        student_id: bool(present_bits & bit)
+        for student_id, present_bits, recorded_bits in ArchivedAttendance.objects.filter(
+            class_obj_id=session.class_obj_id,
+        ).values_list('student_id', 'present_bits', 'recorded_bits')
+        if recorded_bits & bit
+    } if session.session_number <= ArchivedAttendance.MAX_SESSIONS else {}
+    presence.update(AttendanceRecord.objects.filter(session=session).values_list('student_id', 'present'))
+    return presence
+
+
+def student_class_records(student, class_obj, using=DEFAULT_DB_ALIAS):
+    """
+    The attendance records of a student in a class, by session number, from the given
+    database (see cold_storage.records_db()).
+    """
+    if student._state.db != using:
+        # Rows of one database can't refer to objects of another
+        student = User.objects.using(using).get(pk=student.pk)
+    live = list(
+        AttendanceRecord.objects.using(using).filter(session__class_obj_id=class_obj.pk, student_id=student.pk)
+        .select_related('student', 'session')
+    )
+    archived = ArchivedAttendance.objects.using(using).filter(student_id=student.pk, class_obj_id=class_obj.pk).first()
+    if archived is not None:
+        marks = archived.marks()
+        for record in live:
+            marks.pop(record.session.session_number, None)
+        sessions = {
+            session.session_number: session
+            for session in AttendanceSession.objects.using(using).filter(
+                class_obj_id=class_obj.pk, session_number__in=marks,
+            )
+        }
+        live.extend(
+            AttendanceRecord(session=sessions[number], student=student, present=present)
+            for number, present in marks.items() if number in sessions
+        )
+    return sorted(live, key=lambda record: record.session.session_number)
+
+
+def archivable_records(term):
+    return AttendanceRecord.objects.filter(
+        session__class_obj__term=term, session__session_number__lte=ArchivedAttendance.MAX_SESSIONS,
+    )
+
+
+def archive_term(term, chunk_size=5000, dry_run=False):
+    """
+    Fold the attendance records of a closed term into ArchivedAttendance rows, `chunk_size`
+    records per transaction. Returns the numbers of records archived and of bitmap rows
+    written, and of records left live because their session number does not fit.
+    """
+    if not term.closed:
+        raise ValueError(f'"{term}" is not closed.')
+    too_late = AttendanceRecord.objects.filter(
+        session__class_obj__term=term, session__session_number__gt=ArchivedAttendance.MAX_SESSIONS,
+    ).count()
+    if dry_run:
+        records = archivable_records(term)
+        return {
+            'records': records.count(),
+            'rows': records.values('student_id', 'session__class_obj_id').distinct().count(),
+            'skipped': too_late,
+        }
+
+    archived = rows = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                archivable_records(term).order_by('pk')
+                .values_list('pk', 'student_id', 'session__class_obj_id', 'session__session_number', 'present')
+                [:chunk_size]
+            )
+            if not chunk:
+                break
+            rows += archive_chunk(term, chunk)
+            archived += len(chunk)
+    return {'records': archived, 'rows': rows, 'skipped': too_late}
+
+
+def archive_chunk(term, chunk):
+    marks = {}
+    for _, student_id, class_id, session_number, present in chunk:
+        marks.setdefault((student_id, class_id), {})[session_number] = present
+
+    existing = {
+        (row.student_id, row.class_obj_id): row
+        for row in ArchivedAttendance.objects.filter(
+            student_id__in={student_id for student_id, _ in marks},
+            class_obj_id__in={class_id for _, class_id in marks},
+        )
+    }
+    to_create, to_update = [], []
+    for (student_id, class_id), class_marks in marks.items():
+        row = existing.get((student_id, class_id))
+        if row is None:
+            row = ArchivedAttendance(student_id=student_id, class_obj_id=class_id, term=term)
+            to_create.append(row)
+        else:
+            to_update.append(row)
+        row.merge(class_marks)
+    ArchivedAttendance.objects.bulk_create(to_create, batch_size=1000)
+    ArchivedAttendance.objects.bulk_update(
+        to_update, ['present_bits', 'recorded_bits', 'session_count', 'archived_at'], batch_size=1000,
+    )
+
+    # The records are moved, not deleted, so neither the change feed nor the students'
+    # page versions should see a change
+    with archiving():
+        AttendanceRecord.objects.filter(pk__in=[pk for pk, *_ in chunk]).delete()
+    return len(to_create)
+
+
+def closed_terms():
+    return Term.objects.filter(closed=True).order_by('order')
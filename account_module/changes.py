@@ -0,0 +1,163 @@
+"""
+Change log behind the change feed (`api/changes/`).
+
+Every save or delete of a score, academic record, attendance record or user, and every
+enrollment or unenrollment, appends a `Change` in the same transaction as the write (see
+the handlers in `account_module.signals`; bulk writes call `record_many()` themselves).
+Consumers keep the id of the last change they processed and ask for the ones after it.
+
+That cursor holds only if ids follow commit order: a transaction that took a lower id
+but committed after a consumer read a higher one would be skipped for good. So writers
+of the log are serialized from their first entry to their commit, and each takes its ids
+after every earlier writer committed. SQLite's database-wide write lock already does
+that; on PostgreSQL the log's table is locked against other writers (`LOCK_LOG`), which
+leaves reads of the feed alone. Other databases are not supported.
+
+The log is kept bounded by `compact()`, which drops entries superseded by a later entry
+for the same row (a consumer only needs the latest state), and `prune()`, which drops
+entries older than the retention period and moves the horizon below which cursors are
+rejected. Both run from `manage.py prune_changes`.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+from .models import User, Score, AcademicRecord, AttendanceRecord, Enrollment, Change, ChangeLogHorizon
+
+DEFAULT_CHANGE_FEED_SETTINGS = {
+    'TOKEN': None,
+    'RETENTION_DAYS': 30,
+}
+
+# vendor -> statement taken before writing to the log, held until the transaction ends
+LOCK_LOG = {
+    'postgresql': f'LOCK TABLE {Change._meta.db_table} IN SHARE ROW EXCLUSIVE MODE',
+}
+
+# model -> (table name in the feed, fields in the snapshot or None for every column)
+TRACKED = {
+    Score: ('score', None),
+    AcademicRecord: ('academic_record', None),
+    AttendanceRecord: ('attendance_record', None),
+    User: ('user', (
+        'id', 'username', 'slug', 'first_name', 'last_name', 'user_type', 'gender', 'current_term_id',
+        'national_id', 'parent_number', 'is_active',
+    )),
+}
+ENROLLMENT = 'enrollment'
+
+
+class CursorExpired(Exception):
+    """
+    Raised when the requested cursor is older than the pruned part of the log.
+    """
+
+
+def change_feed_settings():
+    return {**DEFAULT_CHANGE_FEED_SETTINGS, **getattr(settings, 'CHANGE_FEED', {})}
+
+
+def tracked_fields(model):
+    return TRACKED[model][1] or [field.attname for field in model._meta.concrete_fields]
+
+
+def snapshot(instance):
+    return {field: getattr(instance, field) for field in tracked_fields(type(instance))}
+
+
+def _entry(instance, action):
+    table = TRACKED[type(instance)][0]
+    data = snapshot(instance) if action == Change.SAVE else None
+    return Change(table=table, key=str(instance.pk), action=action, data=data)
+
+
+def _write(entries):
+    # Locked even for a single entry: an autocommitted write is ordered like any other
+    statement = LOCK_LOG.get(connection.vendor)
+    if statement is None:
+        return Change.objects.bulk_create(entries)
+    with transaction.atomic(savepoint=False):
+        with connection.cursor() as cursor:
+            cursor.execute(statement)
+        return Change.objects.bulk_create(entries)
+
+
+def record(instance, action=Change.SAVE):
+    _write([_entry(instance, action)])
+
+
+def record_many(instances, action=Change.SAVE):
+    """
+    Log saves (or deletes) of rows written with bulk_create()/bulk_update().
+    """
+    _write([_entry(instance, action) for instance in instances])
+
+
+def record_enrollments(class_id, student_ids, action, status=None):
+    status = status or Enrollment.ACTIVE
+    _write([
+        Change(
+            table=ENROLLMENT, key=f'{class_id}:{student_id}', action=action,
+            data={'class_id': class_id, 'student_id': student_id, 'status': status}
+            if action == Change.SAVE else None,
+        )
+        for student_id in student_ids
+    ])
+
+
+def record_enrollment_rows(enrollments):
+    # The bulk Enrollment APIs, which carry each row's own status
+    _write([
+        Change(
+            table=ENROLLMENT, key=f'{enrollment.class_obj_id}:{enrollment.student_id}', action=Change.SAVE,
+            data={
+                'class_id': enrollment.class_obj_id, 'student_id': enrollment.student_id,
+                'status': enrollment.status,
+            },
+        )
+        for enrollment in enrollments
+    ])
+
+
+def feed(after=None, limit=100):
+    """
+    Up to `limit` changes with ids above `after`, and whether more are waiting.
+    Without a cursor the feed starts at the oldest retained change.
+    """
+    horizon = ChangeLogHorizon.current()
+    if after is not None and after < horizon:
+        raise CursorExpired(f'Changes up to #{horizon} have been pruned; download everything again.')
+    changes = list(
+        Change.objects.filter(id__gt=max(after or 0, horizon))
+        .order_by('id')
+        .values('id', 'table', 'key', 'action', 'data', 'created_at')[:limit + 1]
+    )
+    return changes[:limit], len(changes) > limit
+
+
+def compact():
+    """
+    Delete every change followed by a later change of the same row. Returns the number deleted.
+    """
+    superseded = Change.objects.filter(table=OuterRef('table'), key=OuterRef('key'), id__gt=OuterRef('id'))
+    return Change.objects.filter(Exists(superseded)).delete()[0]
+
+
+def prune(older_than=None):
+    """
+    Delete changes older than `older_than` (the retention period by default) and raise
+    the horizon to the newest of them. Returns the number deleted.
+    """
+    if older_than is None:
+        older_than = timedelta(days=change_feed_settings()['RETENTION_DAYS'])
+    expired = Change.objects.filter(created_at__lt=timezone.now() - older_than)
+    with transaction.atomic():
+        newest = expired.aggregate(newest=Max('id'))['newest']
+        if newest is None:
+            return 0
+        horizon = ChangeLogHorizon.get()
+        horizon.pruned_through = max(horizon.pruned_through, newest)
+        horizon.save()
+        return Change.objects.filter(id__lte=newest).delete()[0]
@@ -0,0 +1,190 @@
+"""
+Cold storage of closed terms.
+
+Panels only need the current terms, yet the scores, attendance and enrollments of every
+past term share their tables and indexes. `archive_term()` moves those rows of a closed
+term into the archive database (DATABASES['archive'], a SQLite file by default) and
+marks the term archived; transcript reads then fetch the term's rows from there.
+
+The archive is self-contained: along with the moved rows it gets a copy of the terms,
+classes, sessions and users they refer to, refreshed on every run. Rows move a chunk at a
+time, copied in a transaction on the archive and then deleted in one on the hot database,
+so an interrupted run leaves at worst rows in both, which the next run copies over again.
+The deletes run under archiving(): moved rows did not change, so neither the change feed
+nor the students' page versions should see them go.
+"""
+from django.db import DEFAULT_DB_ALIAS, transaction
+from .models import (
+    User, Term, Class, Enrollment, AttendanceSession, AttendanceRecord, ArchivedAttendance, AcademicRecord, Score,
+    archiving,
+)
+from .routers import ARCHIVE_DB
+
+# Moved models and the lookup of their term
+MOVED = (
+    (Score, 'term'),
+    (AcademicRecord, 'term'),
+    (AttendanceRecord, 'session__class_obj__term'),
+    (ArchivedAttendance, 'term'),
+    (Enrollment, 'term'),
+)
+
+
+def records_db(term):
+    """
+    The database holding the scores, attendance and enrollments of a term.
+    """
+    return ARCHIVE_DB if term.archived else DEFAULT_DB_ALIAS
+
+
+def archived_term_ids():
+    return list(Term.objects.filter(archived=True).values_list('pk', flat=True))
+
+
+def drop_conflicts(model, rows):
+    """
+    Delete the archived rows that hold the unique values of `rows` under another key, such
+    as the attendance record of a session that was recorded again after archival.
+    """
+    pks = {row.pk for row in rows}
+    unique_sets = [*model._meta.unique_together, *(c.fields for c in model._meta.total_unique_constraints)]
+    for fields in unique_sets:
+        attnames = [model._meta.get_field(name).attname for name in fields]
+        incoming = {tuple(getattr(row, attname) for attname in attnames) for row in rows}
+        candidates = model._base_manager.using(ARCHIVE_DB).filter(**{
+            f'{attnames[0]}__in': {values[0] for values in incoming},
+        }).exclude(pk__in=pks).values_list('pk', *attnames)
+        stale = [pk for pk, *values in candidates if tuple(values) in incoming]
+        if stale:
+            with archiving():
+                model._base_manager.using(ARCHIVE_DB).filter(pk__in=stale).delete()
+
+
+def copy_rows(model, rows):
+    """
+    Insert or refresh rows loaded from the hot database in the archive, as they are.
+    """
+    drop_conflicts(model, rows)
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    # bulk_create() stamps auto_now fields with the current time; bulk_update() doesn't
+    stamped = [field for field in fields if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    stamps = [[getattr(row, field.attname) for field in stamped] for row in rows]
+    model._base_manager.using(ARCHIVE_DB).bulk_create(
+        rows, update_conflicts=True, unique_fields=[model._meta.pk.name],
+        update_fields=[field.name for field in fields],
+    )
+    if stamped:
+        for row, values in zip(rows, stamps):
+            for field, value in zip(stamped, values):
+                setattr(row, field.attname, value)
+        model._base_manager.using(ARCHIVE_DB).bulk_update(rows, [field.name for field in stamped])
+
+
+def copy_queryset(queryset, chunk_size):
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+        if not rows:
+            return
+        copy_rows(queryset.model, rows)
+        last_pk = rows[-1].pk
+
+
+def class_ids_with_ancestors(term):
+    class_ids = set(Class.objects.filter(term=term).values_list('pk', flat=True))
+    frontier = class_ids
+    while frontier:
+        frontier = set(
+            Class.objects.filter(pk__in=frontier, parent__isnull=False).values_list('parent_id', flat=True)
+        ) - class_ids
+        class_ids |= frontier
+    return class_ids
+
+
+def copy_references(term, chunk_size):
+    # What the moved rows refer to, in one transaction so that every foreign key holds
+    class_ids = class_ids_with_ancestors(term)
+    user_ids = set(Class.objects.filter(pk__in=class_ids).values_list('teacher_id', flat=True))
+    for model, lookup in MOVED:
+        user_ids.update(model._base_manager.filter(**{lookup: term}).values_list('student_id', flat=True).distinct())
+    with transaction.atomic(using=ARCHIVE_DB):
+        copy_queryset(Term.objects.all(), chunk_size)
+        copy_queryset(User.objects.filter(pk__in=user_ids), chunk_size)
+        copy_queryset(Class.objects.filter(pk__in=class_ids), chunk_size)
+        copy_queryset(AttendanceSession.objects.filter(class_obj__term=term), chunk_size)
+
+
+def archive_term(term, chunk_size=1000, dry_run=False):
+    """
+    Move the scores, attendance and enrollments of a closed term into the archive
+    database, `chunk_size` rows per transaction. Returns the number of rows moved per model.
+    """
+    if not term.closed:
+        raise ValueError(f'"{term}" is not closed.')
+    if dry_run:
+        return {
+            model._meta.model_name: model._base_manager.filter(**{lookup: term}).count()
+            for model, lookup in MOVED
+        }
+
+    copy_references(term, chunk_size)
+    moved = {}
+    for model, lookup in MOVED:
+        moved[model._meta.model_name] = 0
+        while True:
+            rows = list(model._base_manager.filter(**{lookup: term}).order_by('pk')[:chunk_size])
+            if not rows:
+                break
+            with transaction.atomic(using=ARCHIVE_DB):
+                copy_rows(model, rows)
+            with transaction.atomic(), archiving():
+                model._base_manager.filter(pk__in=[row.pk for row in rows]).delete()
+            moved[model._meta.model_name] += len(rows)
+
+    Term.objects.filter(pk=term.pk).update(archived=True)
+    Term.objects.using(ARCHIVE_DB).filter(pk=term.pk).update(archived=True)
+    term.archived = True
+    return moved
+
+
+async def transcript(student):
+    """
+    The scores of a student in every term, those of archived terms from the archive.
+    """
+    scores = [score async for score in Score.objects.filter(student_id=student.pk).select_related('term')]
+    archived = [term_id async for term_id in Term.objects.filter(archived=True).values_list('pk', flat=True)]
+    if archived:
+        # Rows written after their term was archived stay in the hot database
+        live = {score.pk for score in scores}
+        scores += [
+            score async for score in
+            Score.objects.using(ARCHIVE_DB).filter(student_id=student.pk, term_id__in=archived).select_related('term')
+            if score.pk not in live
+        ]
+        scores.sort(key=lambda score: score.pk)
+    return scores
+
+
+def archived_score_term_ids(student):
+    """
+    The archived terms in which a student has scores.
+    """
+    archived = archived_term_ids()
+    if not archived:
+        return []
+    return list(
+        Score.objects.using(ARCHIVE_DB).filter(student_id=student.pk, term_id__in=archived)
+        .values_list('term_id', flat=True).distinct()
+    )
+
+
+def archived_class(student, class_slug):
+    """
+    A class of an archived term the student was a member of, or None.
+    """
+    class_obj = Class.objects.select_related('term').filter(slug=class_slug, term__archived=True).first()
+    if class_obj is None or not Enrollment.objects.using(ARCHIVE_DB).members().filter(
+        class_obj_id=class_obj.pk, student_id=student.pk,
+    ).exists():
+        return None
+    return class_obj
@@ -0,0 +1,36 @@
+from job_module.jobs import job
+from .models import User, Term, TermCalendar, generate_sessions, rollover_term
+
+
+@job('account_module.promote_student')
+def promote_student(student_id):
+    """
+    Promote a student whose academic record was marked as passed; the promotion (and the
+    next class and its sessions, if they do not exist yet) is created here rather than in
+    the request that saved the grade.
+    """
+    student = User.objects.filter(pk=student_id).first()
+    if student is None:
+        return False
+    return student.promote_to_next_term()
+
+
+@job('account_module.generate_term_sessions')
+def generate_term_sessions(term_id):
+    """
+    Bring the sessions of a term in line with its calendar after the calendar was saved.
+    """
+    calendar = TermCalendar.objects.select_related('term').filter(term_id=term_id).first()
+    if calendar is None:
+        return None
+    return generate_sessions(calendar.term)
+
+
+@job('account_module.rollover_term')
+def rollover_term_classes(term_id, carry_teachers=False):
+    """
+    Create the successors of a term's classes in the next term ahead of promotions.
+    """
+    term = Term.objects.get(pk=term_id)
+    target, created = rollover_term(term, carry_teachers=carry_teachers)
+    return {'target_term': target.pk, 'created': len(created)}
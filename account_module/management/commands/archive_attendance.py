@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from account_module.attendance_archive import archive_term, closed_terms
+from account_module.models import Term
+
+
+class Command(BaseCommand):
+    help = "Fold the attendance records of closed terms into one bitmap row per student and class."
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*', help='Slugs of the terms to archive; all closed terms by default.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Records moved per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        terms = closed_terms()
+        if options['terms']:
+            terms = Term.objects.filter(slug__in=options['terms']).order_by('order')
+            missing = set(options['terms']) - {term.slug for term in terms}
+            if missing:
+                raise CommandError(f'No term with slug {", ".join(sorted(missing))}.')
+            open_terms = [term.slug for term in terms if not term.closed]
+            if open_terms:
+                raise CommandError(f'Terms {", ".join(open_terms)} are not closed.')
+
+        for term in terms:
+            result = archive_term(term, chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+            verb = 'Would archive' if options['dry_run'] else 'Archived'
+            self.stdout.write(
+                f'{term}: {verb} {result["records"]} record(s) into {result["rows"]} new row(s).'
+            )
+            if result['skipped']:
+                self.stdout.write(self.style.WARNING(
+                    f'  {result["skipped"]} record(s) of sessions after the 63rd were left live.'
+                ))
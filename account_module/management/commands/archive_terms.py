@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from account_module.attendance_archive import closed_terms
+from account_module.cold_storage import archive_term
+from account_module.models import Term
+from account_module.routers import ARCHIVE_DB
+
+
+class Command(BaseCommand):
+    help = 'Move the scores, attendance and enrollments of closed terms into the archive database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*', help='Slugs of the terms to archive; all closed terms by default.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows moved per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be moved.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+        executor = MigrationExecutor(connections[ARCHIVE_DB])
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            raise CommandError(f'The archive database is not up to date; run `migrate --database={ARCHIVE_DB}` first.')
+
+        terms = closed_terms()
+        if options['terms']:
+            terms = Term.objects.filter(slug__in=options['terms']).order_by('order')
+            missing = set(options['terms']) - {term.slug for term in terms}
+            if missing:
+                raise CommandError(f'No term with slug {", ".join(sorted(missing))}.')
+            open_terms = [term.slug for term in terms if not term.closed]
+            if open_terms:
+                raise CommandError(f'Terms {", ".join(open_terms)} are not closed.')
+
+        for term in terms:
+            moved = archive_term(term, chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+            verb = 'Would move' if options['dry_run'] else 'Moved'
+            counts = ', '.join(f'{count} {name}' for name, count in moved.items())
+            self.stdout.write(f'{term}: {verb} {counts}.')
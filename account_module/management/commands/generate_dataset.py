@@ -0,0 +1,177 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from account_module import search, slug_cache
+from account_module.models import (
+    User, Term, Class, Enrollment, AttendanceSession, AttendanceRecord, Score, AcademicRecord,
+)
+
+DEFAULT_PASSWORD = 'rayka-benchmark'
+FIRST_NAMES = ('Ali', 'Sara', 'Reza', 'Maryam', 'Hossein', 'Zahra', 'Mohammad', 'Fatemeh', 'Amir', 'Narges')
+LAST_NAMES = ('Ahmadi', 'Hosseini', 'Karimi', 'Rezaei', 'Moradi', 'Jafari', 'Rahimi', 'Sadeghi', 'Ebrahimi', 'Kazemi')
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a realistic synthetic dataset (terms, classes, students, sessions, attendance, scores).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terms', type=int, default=4)
+        parser.add_argument('--classes-per-gender', type=int, default=5, help='Classes per gender in each term.')
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--teachers', type=int, default=10)
+        parser.add_argument('--sessions', type=int, default=12, help='Attendance sessions per class.')
+        parser.add_argument('--attendance-rate', type=float, default=0.9)
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password shared by every generated user.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, so runs are reproducible.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Hashing is deliberately slow; hash once and share the result between all users
+        self.password = make_password(options['password'])
+        self.id_base = self.next_national_id()
+
+        with transaction.atomic():
+            terms = self.create_terms(options['terms'])
+            teachers = self.create_teachers(options['teachers'])
+            classes = self.create_classes(terms, teachers, options['classes_per_gender'])
+            students = self.create_students(options['students'], terms)
+            self.enroll(students, classes)
+            sessions = self.create_sessions(classes, options['sessions'])
+            records = self.create_attendance(classes, sessions, options['attendance_rate'])
+            scores = self.create_scores(students)
+        search.rebuild_index()
+        # bulk_create bypasses the signals that keep the slug cache in sync
+        slug_cache.users.forget(user.slug for user in [*teachers, *students])
+        slug_cache.classes.forget(class_obj.slug for class_obj in classes)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(terms)} terms, {len(teachers)} teachers, {len(classes)} classes, '
+            f'{len(students)} students, {len(sessions)} sessions, {records} attendance records and '
+            f'{scores} scores in {elapsed:.1f}s.'
+        ))
+
+    def next_national_id(self):
+        highest = User.objects.filter(national_id__regex=r'^[0-9]{10}$').aggregate(highest=Max('national_id'))['highest']
+        return int(highest) + 1 if highest else 1000000000
+
+    def make_user(self, index, user_type, **extra):
+        national_id = f'{self.id_base + index:010d}'
+        return User(
+            username=national_id,
+            national_id=national_id,
+            slug=f'{user_type}-{national_id}',
+            password=self.password,
+            user_type=user_type,
+            first_name=self.random.choice(FIRST_NAMES),
+            last_name=self.random.choice(LAST_NAMES),
+            **extra
+        )
+
+    def create_terms(self, count):
+        first_order = (Term.objects.aggregate(highest=Max('order'))['highest'] or 0) + 1
+        terms = [Term(name=f'Term {order}', slug=f'term-{order}', order=order)
+                 for order in range(first_order, first_order + count)]
+        return Term.objects.bulk_create(terms)
+
+    def create_teachers(self, count):
+        teachers = [
+            self.make_user(i, 'teacher', gender=self.random.choice(('male', 'female')))
+            for i in range(count)
+        ]
+        self.id_base += count
+        return User.objects.bulk_create(teachers, batch_size=self.batch_size)
+
+    def create_classes(self, terms, teachers, per_gender):
+        classes = []
+        for term in terms:
+            for gender in ('male', 'female'):
+                for number in range(1, per_gender + 1):
+                    name = f'Class {number} - {term.name} - {gender.capitalize()}'
+                    classes.append(Class(
+                        name=name,
+                        slug=f'class-{number}-{term.slug}-{gender}-{term.pk}',
+                        gender=gender,
+                        term=term,
+                        teacher=teachers[len(classes) % len(teachers)],
+                    ))
+        return Class.objects.bulk_create(classes, batch_size=self.batch_size)
+
+    def create_students(self, count, terms):
+        students = [
+            self.make_user(
+                i, 'student',
+                gender=self.random.choice(('male', 'female')),
+                current_term=self.random.choice(terms),
+                parent_number=f'09{self.random.randrange(10 ** 9):09d}',
+            )
+            for i in range(count)
+        ]
+        self.id_base += count
+        return User.objects.bulk_create(students, batch_size=self.batch_size)
+
+    def enroll(self, students, classes):
+        by_term_and_gender = {}
+        for class_obj in classes:
+            by_term_and_gender.setdefault((class_obj.term_id, class_obj.gender), []).append(class_obj)
+        enrollments = []
+        self.rosters = {class_obj.pk: [] for class_obj in classes}
+        for student in students:
+            class_obj = self.random.choice(by_term_and_gender[(student.current_term_id, student.gender)])
+            enrollments.append(Enrollment(class_obj=class_obj, student=student, term_id=class_obj.term_id))
+            self.rosters[class_obj.pk].append(student)
+        Enrollment.objects.bulk_create(enrollments, batch_size=self.batch_size)
+
+    def create_sessions(self, classes, count):
+        sessions = [
+            AttendanceSession(session_number=number, class_obj=class_obj)
+            for class_obj in classes for number in range(1, count + 1)
+        ]
+        return AttendanceSession.objects.bulk_create(sessions, batch_size=self.batch_size)
+
+    def create_attendance(self, classes, sessions, rate):
+        sessions_by_class = {}
+        for session in sessions:
+            sessions_by_class.setdefault(session.class_obj_id, []).append(session)
+        created = 0
+        batch = []
+        for class_obj in classes:
+            for session in sessions_by_class.get(class_obj.pk, []):
+                for student in self.rosters[class_obj.pk]:
+                    batch.append(AttendanceRecord(
+                        session=session, student=student, present=self.random.random() < rate,
+                    ))
+            if len(batch) >= self.batch_size:
+                AttendanceRecord.objects.bulk_create(batch, batch_size=self.batch_size)
+                created += len(batch)
+                batch = []
+        AttendanceRecord.objects.bulk_create(batch, batch_size=self.batch_size)
+        return created + len(batch)
+
+    def create_scores(self, students):
+        scores, records = [], []
+        for student in students:
+            score = Score(
+                student=student,
+                term_id=student.current_term_id,
+                quiz_1=self.random.randint(5, 15),
+                quiz_2=self.random.randint(5, 15),
+                oral_or_listening=self.random.randint(5, 10),
+                class_activity=self.random.randint(5, 10),
+                final=self.random.randint(15, 50),
+            )
+            scores.append(score)
+            # Score.save() would trigger promotions; store the resulting academic record directly
+            records.append(AcademicRecord(
+                student=student, term_id=student.current_term_id, passed=score.total_score > 70,
+            ))
+        Score.objects.bulk_create(scores, batch_size=self.batch_size)
+        AcademicRecord.objects.bulk_create(records, batch_size=self.batch_size)
+        return len(scores)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from account_module.models import Term, generate_sessions
+
+
+class Command(BaseCommand):
+    help = "Create and date the sessions of every class in a term after the term's calendar."
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='+', metavar='term', help='Slug of a term with a calendar.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing.')
+
+    def handle(self, *args, **options):
+        for slug in options['terms']:
+            term = Term.objects.select_related('calendar').filter(slug=slug).first()
+            if term is None:
+                raise CommandError(f'No term with slug "{slug}".')
+            if not hasattr(term, 'calendar'):
+                raise CommandError(f'Term "{term}" has no calendar.')
+            counts = generate_sessions(term, dry_run=options['dry_run'])
+            prefix = '[dry run] ' if options['dry_run'] else ''
+            self.stdout.write(self.style.SUCCESS(
+                f"{prefix}{term}: {counts['created']} created, {counts['updated']} re-dated, "
+                f"{counts['unchanged']} unchanged, {counts['extra']} beyond the calendar."
+            ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from account_module.models import Term
+from account_module.placement import place_students
+
+
+class Command(BaseCommand):
+    help = 'Place the students of a term without a class into its classes, opening overflow classes if needed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('term', help='Slug of the term whose unplaced students are placed.')
+        parser.add_argument('--dry-run', action='store_true', help='Report the placement without saving it.')
+
+    def handle(self, *args, **options):
+        term = Term.objects.filter(slug=options['term']).first()
+        if term is None:
+            raise CommandError(f'No term with slug "{options["term"]}".')
+        try:
+            placement = place_students(term, dry_run=options['dry_run'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        for entry in placement.classes:
+            class_obj = entry.class_obj
+            note = ' (new overflow class)' if entry.overflow else ''
+            self.stdout.write(
+                f'{class_obj.name}: {entry.size} + {len(entry.students)} = {entry.total}/{class_obj.capacity}{note}'
+            )
+        if placement.skipped:
+            self.stdout.write(self.style.WARNING(f'{len(placement.skipped)} student(s) without a gender skipped.'))
+        summary = (
+            f'{placement.placed} student(s) placed in {term}, '
+            f'{len(placement.overflow_classes)} overflow class(es).'
+        )
+        if options['dry_run']:
+            self.stdout.write(f'[dry run] {summary}')
+            return
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from account_module import changes
+
+
+class Command(BaseCommand):
+    help = 'Compact the change log and drop entries older than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help="Retention in days; defaults to CHANGE_FEED['RETENTION_DAYS'].",
+        )
+        parser.add_argument('--no-compact', action='store_true', help='Only drop expired entries.')
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days is None:
+            days = changes.change_feed_settings()['RETENTION_DAYS']
+        compacted = 0 if options['no_compact'] else changes.compact()
+        pruned = changes.prune(timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {compacted} superseded and {pruned} expired change(s).'
+        ))
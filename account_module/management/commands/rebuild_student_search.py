@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from account_module import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the student search index from the user table.'
+
+    def handle(self, *args, **options):
+        if not search.uses_fts():
+            self.stdout.write('This database uses trigram indexes; nothing to rebuild.')
+            return
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Student search index rebuilt.'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from account_module.models import Term, rollover_term
+
+
+class Command(BaseCommand):
+    help = 'Create the successor of every class of a term in the next term, with its sessions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('term', help='Slug of the term whose classes are rolled over.')
+        parser.add_argument('--to', dest='target', help='Slug of the target term; defaults to the next one by order.')
+        parser.add_argument(
+            '--carry-teachers', action='store_true',
+            help='Give each successor the teacher of its class instead of the default teacher.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='List the classes that would be created.')
+
+    def get_term(self, slug):
+        term = Term.objects.filter(slug=slug).first()
+        if term is None:
+            raise CommandError(f'No term with slug "{slug}".')
+        return term
+
+    def handle(self, *args, **options):
+        term = self.get_term(options['term'])
+        target = self.get_term(options['target']) if options['target'] else None
+        try:
+            target, classes = rollover_term(
+                term, target, carry_teachers=options['carry_teachers'], dry_run=options['dry_run'],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        if options['dry_run']:
+            for class_obj in classes:
+                self.stdout.write(f'{class_obj.parent} -> {class_obj.name} ({class_obj.slug})')
+            self.stdout.write(f'[dry run] {len(classes)} class(es) would be created in {target}.')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Created {len(classes)} class(es) in {target}.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from account_module.models import Term
+from account_module.teacher_load import term_loads
+
+
+class Command(BaseCommand):
+    help = 'Show how classes and active students are spread over the active teachers of each term.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*', help='Slugs of the terms to report; all terms by default.')
+
+    def handle(self, *args, **options):
+        terms = Term.objects.order_by('order')
+        if options['terms']:
+            terms = terms.filter(slug__in=options['terms'])
+            missing = set(options['terms']) - {term.slug for term in terms}
+            if missing:
+                raise CommandError(f'No term with slug {", ".join(sorted(missing))}.')
+
+        for term in terms:
+            loads = list(term_loads(term.pk).order_by('-class_count', '-student_count', 'pk'))
+            self.stdout.write(self.style.MIGRATE_HEADING(str(term)))
+            if not loads:
+                self.stdout.write('  No active teachers.')
+                continue
+            for teacher in loads:
+                name = teacher.full_name().strip() or teacher.username
+                self.stdout.write(
+                    f'  {name:<30} {teacher.class_count:>4} class(es) {teacher.student_count:>6} student(s)'
+                )
+            counts = [teacher.class_count for teacher in loads]
+            self.stdout.write(
+                f'  Classes per teacher: min {min(counts)}, max {max(counts)}, '
+                f'mean {sum(counts) / len(counts):.1f}'
+            )
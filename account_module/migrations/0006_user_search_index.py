@@ -0,0 +1,47 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE account_module_user_search USING fts5("
+    "first_name, last_name, national_id, parent_number, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO account_module_user_search (rowid, first_name, last_name, national_id, parent_number) "
+    "SELECT id, COALESCE(first_name, ''), COALESCE(last_name, ''), COALESCE(national_id, ''), "
+    "COALESCE(parent_number, '') FROM account_module_user WHERE user_type = 'student'",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS account_module_user_search",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+] + [
+    f"CREATE INDEX IF NOT EXISTS user_{field}_trgm_idx ON account_module_user "
+    f"USING gin (UPPER({field}) gin_trgm_ops)"
+    for field in ('first_name', 'last_name', 'national_id', 'parent_number')
+]
+POSTGRES_BACKWARD = [
+    f"DROP INDEX IF EXISTS user_{field}_trgm_idx"
+    for field in ('first_name', 'last_name', 'national_id', 'parent_number')
+]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0005_user_name_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_statements({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:53
+
+import account_module.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0009_attendance_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('weekdays', models.CharField(help_text='Comma-separated weekday numbers, 0 for Monday to 6 for Sunday, e.g. "5,0,2".', max_length=13, validators=[account_module.models.validate_weekdays])),
+                ('holidays', models.JSONField(blank=True, default=list, help_text='Dates without sessions, as ["YYYY-MM-DD", ...].')),
+                ('session_count', models.PositiveIntegerField(default=12)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attendancesession',
+            name='date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['date'], name='session_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='termcalendar',
+            name='term',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='calendar', to='account_module.term'),
+        ),
+    ]
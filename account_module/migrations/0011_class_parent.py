@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_successors(apps, schema_editor):
+    """
+    Link the classes created by promotions so far, which were matched by name, to the
+    class they continue.
+    """
+    Class = apps.get_model('account_module', 'Class')
+    Term = apps.get_model('account_module', 'Term')
+    db_alias = schema_editor.connection.alias
+    next_terms = {}
+    for term in Term.objects.using(db_alias):
+        next_terms[term.pk] = Term.objects.using(db_alias).filter(order=term.order + 1).first()
+    linked = set()
+    for class_obj in Class.objects.using(db_alias).order_by('pk'):
+        next_term = next_terms.get(class_obj.term_id)
+        if next_term is None:
+            continue
+        name = f"{class_obj.name.split(' - ')[0]} - {next_term.name} - {class_obj.gender.capitalize()}"
+        successor = Class.objects.using(db_alias).filter(
+            name=name, term=next_term, gender=class_obj.gender, parent__isnull=True,
+        ).exclude(pk__in=linked).order_by('pk').first()
+        if successor is not None:
+            successor.parent = class_obj
+            successor.save(update_fields=['parent'])
+            linked.add(successor.pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0010_term_calendar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='successors', to='account_module.class'),
+        ),
+        migrations.AddConstraint(
+            model_name='class',
+            constraint=models.UniqueConstraint(fields=('parent',), name='class_unique_successor'),
+        ),
+        migrations.RunPython(link_successors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_terms(apps, schema_editor):
+    """
+    Copy each existing enrollment's class term onto it. The rows that survive are the
+    current memberships, so they stay active from the time of this migration.
+    """
+    Class = apps.get_model('account_module', 'Class')
+    Enrollment = apps.get_model('account_module', 'Enrollment')
+    db_alias = schema_editor.connection.alias
+    for class_id, term_id in Class.objects.using(db_alias).values_list('pk', 'term_id'):
+        Enrollment.objects.using(db_alias).filter(class_obj_id=class_id).update(term_id=term_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0011_class_parent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The join table behind Class.students becomes the Enrollment model as it is
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Enrollment',
+                    fields=[
+                        ('id', models.AutoField(primary_key=True, serialize=False)),
+                        ('class_obj', models.ForeignKey(db_column='class_id', on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='account_module.class')),
+                        ('student', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'account_module_class_students',
+                        'unique_together': {('class_obj', 'student')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='class',
+                    name='students',
+                    field=models.ManyToManyField(blank=True, related_name='enrolled_classes', through='account_module.Enrollment', through_fields=('class_obj', 'student'), to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='term',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='account_module.term'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('completed', 'Completed'), ('dropped', 'Dropped')], default='active', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='enrolled_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='left_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_terms, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='enrollment',
+            name='term',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='account_module.term'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', 'term'], name='enrollment_student_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['class_obj', 'status'], name='enrollment_class_status_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0012_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='capacity',
+            field=models.PositiveIntegerField(default=30),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0013_class_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='term',
+            name='closed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present_bits', models.PositiveBigIntegerField(default=0)),
+                ('recorded_bits', models.PositiveBigIntegerField(default=0)),
+                ('session_count', models.PositiveSmallIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('class_obj', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='account_module.class')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to=settings.AUTH_USER_MODEL)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='account_module.term')),
+            ],
+            options={
+                'unique_together': {('student', 'class_obj')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0014_attendance_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='term',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+    ]
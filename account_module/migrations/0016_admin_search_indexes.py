@@ -0,0 +1,52 @@
+from django.db import migrations
+
+# Columns searched by prefix (`^field`, i.e. istartswith) in the admin
+PREFIX_SEARCHED = [
+    ('account_module_user', 'username', 'user_username'),
+    ('account_module_user', 'last_name', 'user_last_name'),
+    ('account_module_user', 'slug', 'user_slug'),
+    ('account_module_class', 'name', 'class_name'),
+    ('account_module_class', 'slug', 'class_slug'),
+]
+
+# SQLite runs istartswith as `col LIKE 'x%' ESCAPE '\'`, case-insensitively; only an index
+# with the NOCASE collation can serve that
+SQLITE_FORWARD = [
+    f'CREATE INDEX IF NOT EXISTS {name}_nocase_idx ON {table} ({column} COLLATE NOCASE)'
+    for table, column, name in PREFIX_SEARCHED
+]
+SQLITE_BACKWARD = [
+    f'DROP INDEX IF EXISTS {name}_nocase_idx' for _, _, name in PREFIX_SEARCHED
+]
+
+# PostgreSQL runs it as `UPPER(col::text) LIKE UPPER('x%')`, which needs an index on that
+# very expression, with the pattern operator class so that LIKE can use it in any locale
+POSTGRES_FORWARD = [
+    f'CREATE INDEX IF NOT EXISTS {name}_upper_idx ON {table} (UPPER({column}::text) text_pattern_ops)'
+    for table, column, name in PREFIX_SEARCHED
+]
+POSTGRES_BACKWARD = [
+    f'DROP INDEX IF EXISTS {name}_upper_idx' for _, _, name in PREFIX_SEARCHED
+]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0015_term_archived'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_statements({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
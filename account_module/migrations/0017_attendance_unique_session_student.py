@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:59
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Keep one record per student and session: the winning mark (the latest taken, as the
+    attendance sync decides), and of equal ones the last written.
+    """
+    AttendanceRecord = apps.get_model('account_module', 'AttendanceRecord')
+    records = AttendanceRecord.objects.using(schema_editor.connection.alias)
+    duplicated = (
+        records.values('session_id', 'student_id').annotate(count=Count('pk')).filter(count__gt=1)
+        .values_list('session_id', 'student_id')
+    )
+    for session_id, student_id in list(duplicated):
+        pks = list(
+            records.filter(session_id=session_id, student_id=student_id)
+            .order_by(Coalesce('marked_at', 'updated_at').desc(), '-pk').values_list('pk', flat=True)
+        )
+        records.filter(pk__in=pks[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0016_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendancerecord',
+            constraint=models.UniqueConstraint(fields=('session', 'student'), name='attendance_unique_session_student'),
+        ),
+    ]
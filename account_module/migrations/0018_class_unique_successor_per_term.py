@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:25
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+search_indexes = import_module('account_module.migrations.0016_admin_search_indexes')
+
+# SQLite rebuilds the class table to change its constraint, which drops the indexes that
+# migration 0016 created on it; they are created again after the rebuild, either way
+CLASS_INDEXES = [
+    statement for statement in search_indexes.SQLITE_FORWARD if ' ON account_module_class ' in statement
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_module', '0017_attendance_unique_session_student'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, search_indexes.run_statements({'sqlite': CLASS_INDEXES})),
+        migrations.RemoveConstraint(
+            model_name='class',
+            name='class_unique_successor',
+        ),
+        migrations.AddConstraint(
+            model_name='class',
+            constraint=models.UniqueConstraint(fields=('parent', 'term'), name='class_unique_successor'),
+        ),
+        migrations.RunPython(search_indexes.run_statements({'sqlite': CLASS_INDEXES}), migrations.RunPython.noop),
+    ]
@@ -1,7 +1,24 @@
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
 from django.utils.text import slugify
+from job_module.jobs import enqueue
+from monitoring_module import events
+
+
+def validate_weekdays(value):
+    days = [day.strip() for day in value.split(',')]
+    if not all(day.isdigit() and int(day) < 7 for day in days):
+        raise ValidationError('Enter weekday numbers from 0 (Monday) to 6 (Sunday), separated by commas.')
 
 
 class User(AbstractUser):
@@ -24,6 +41,15 @@ class User(AbstractUser):
     slug = models.SlugField(unique=True, blank=True, null=True)
     national_id = models.CharField(max_length=10, blank=True, null=True)
     parent_number = models.CharField(max_length=11, blank=True, null=True)
+    # Bumped by touch_student_data() whenever the student's scores, records or attendance
+    # change; the student pages use them as ETag and Last-Modified
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+    data_updated_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='user_name_idx'),
+        ]
 
     def full_name(self):
         return f'{self.first_name} {self.last_name}'
@@ -31,73 +57,68 @@ class User(AbstractUser):
     def promote_to_next_term(self):
         """
         Promotes the student to the next term ONLY if they have passed the current term.
-        Ensures students from the same class remain classmates in the next term.
-        Creates 12 sessions for the new class using bulk creation.
+        Ensures students from the same class remain classmates in the next term, by
+        moving them to the successor of their class.
         """
         # Check if user is a student
         if self.user_type != 'student':
-            print(f"{self.first_name} {self.last_name} is not a student. Cannot promote.")
-            return False
+            return self._promotion_skipped('not_a_student')
 
         # Check if current term is set
         if not self.current_term:
-            print(f"{self.first_name} {self.last_name} has no current term assigned. Cannot promote.")
-            return False
+            return self._promotion_skipped('no_current_term')
         self.refresh_from_db()
         # Check if student passed the term
         try:
             academic_record = AcademicRecord.objects.get(student=self, term=self.current_term)
-            print(f"Found AcademicRecord: {academic_record}")
             if not academic_record.passed:
-                print(f"{self.first_name} {self.last_name} did not pass the current term. Cannot promote.")
-                return False
+                return self._promotion_skipped('not_passed')
         except AcademicRecord.DoesNotExist:
-            print(f"No academic record found for {self.first_name} {self.last_name}. Cannot promote.")
-            return False
+            return self._promotion_skipped('no_academic_record')
 
         # Promote to the next term if there is a higher one
         try:
             next_term = Term.objects.get(order=self.current_term.order + 1)
         except Term.DoesNotExist:
-            print(f"No higher term available for {self.first_name} {self.last_name}. Cannot promote.")
-            return False
+            return self._promotion_skipped('no_next_term')
 
         # Identify the current class of the student
-        try:
-            current_class = Class.objects.get(term=self.current_term, students=self)
-        except Class.DoesNotExist:
-            print(
-                f"{self.first_name} {self.last_name} is not enrolled in any class for the current term. Cannot promote."
-            )
-            return False
-
-        # Find or create the corresponding next class for the current class
-        base_class_name = current_class.name.split(' - ')[0]
-        next_class_name = f"{base_class_name} - {next_term.name} - {current_class.gender.capitalize()}"
-        next_class, created = Class.objects.get_or_create(
-            name=next_class_name,
-            term=next_term,
-            gender=current_class.gender,
+        enrollment = Enrollment.objects.active().select_related('class_obj').filter(
+            student=self, term=self.current_term,
+        ).first()
+        if enrollment is None:
+            return self._promotion_skipped('not_enrolled')
+        current_class = enrollment.class_obj
+
+        # The successor of the current class, normally created ahead of time by the term
+        # rollover; created here (with its sessions) if the rollover has not run yet
+        next_class = Class.objects.filter(parent=current_class, term=next_term).first()
+        if next_class is None:
+            rollover_classes([current_class], next_term)
+            next_class = Class.objects.filter(parent=current_class, term=next_term).first()
+            if next_class is None:
+                return self._promotion_skipped('no_next_class')
+
+        # Finish the enrollment in the current class, which stays as history, and enroll
+        # the student in the next class
+        previous_term_id = self.current_term_id
+        with transaction.atomic():
+            Enrollment.objects.leave(current_class, [self])
+            Enrollment.objects.enroll(next_class, [self])
+
+            # Update the student's current term
+            self.current_term = next_term
+            self.save()
+        events.record(
+            'student.promoted', student=self.pk, from_term=previous_term_id, to_term=next_term.pk,
+            from_class=current_class.pk, to_class=next_class.pk,
         )
-
-        if created:
-            print(f"Created new class: {next_class.name}")
-            create_sessions_for_class(next_class)  # Call as a standalone function
-
-        # Remove the student from the current class
-        current_class.students.remove(self)
-        print(f"Removed {self.first_name} {self.last_name} from {current_class.name}")
-
-        # Add the student to the next class
-        next_class.students.add(self)
-        print(f"Added {self.first_name} {self.last_name} to {next_class.name}")
-
-        # Update the student's current term
-        self.current_term = next_term
-        self.save()
-        print(f"Promoted {self.first_name} {self.last_name} to {next_term.name}.")
         return True
 
+    def _promotion_skipped(self, reason):
+        events.record('student.promotion_skipped', student=self.pk, reason=reason)
+        return False
+
     def save(self, *args, **kwargs):
         self.username = self.national_id
         if not self.slug:
@@ -118,6 +139,10 @@ class Term(models.Model):
     name = models.CharField(max_length=50)
     order = models.PositiveIntegerField()
     slug = models.SlugField(db_index=True, blank=True)
+    # Finished for good; its attendance can be archived (see account_module.attendance_archive)
+    closed = models.BooleanField(default=False)
+    # Its scores, attendance and enrollments live in the archive database (see account_module.cold_storage)
+    archived = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
         self.slug = slugify(self.name)
@@ -136,20 +161,35 @@ class Class(models.Model):
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES)
     teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='classes_taught')
     term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='classes_in_term')
-    students = models.ManyToManyField(User, related_name='enrolled_classes', blank=True)
+    # Every enrollment, including finished ones; filter on Enrollment.status for the current roster
+    students = models.ManyToManyField(
+        User, through='Enrollment', through_fields=('class_obj', 'student'), related_name='enrolled_classes',
+        blank=True,
+    )
     slug = models.SlugField(unique=True, blank=True, null=True, max_length=100)
+    # Most active students the placement engine puts in the class; see account_module.placement
+    capacity = models.PositiveIntegerField(default=30)
+    # The class of the previous term this one continues; see rollover_classes()
+    parent = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, blank=True, null=True, related_name='successors',
+    )
+
+    class Meta:
+        constraints = [
+            # One successor per term: a class rolled over into a term other than the next
+            # one still gets its successor in the next
+            models.UniqueConstraint(fields=['parent', 'term'], name='class_unique_successor'),
+        ]
+
+    def successor_name(self, term):
+        # Only the display name; successors are found through `parent`, never by name
+        base_class_name = self.name.split(' - ')[0]
+        return f"{base_class_name} - {term.name} - {self.gender.capitalize()}"
 
     def save(self, *args, **kwargs):
-        # If no teacher is assigned, assign a default teacher (e.g., admin user)
+        # If no teacher is assigned, assign the least-loaded teacher of the term
         if not self.teacher_id:
-            try:
-                default_teacher = User.objects.filter(user_type='teacher').first()
-                if default_teacher:
-                    self.teacher = default_teacher
-                else:
-                    raise ValueError("No teacher exists in the system. Please create a teacher first.")
-            except User.DoesNotExist:
-                raise ValueError("No teacher exists in the system. Please create a teacher first.")
+            self.teacher_id = default_teacher_id(self.term_id)
 
         # Generate a unique slug
         if not self.slug:
@@ -159,12 +199,130 @@ class Class(models.Model):
                 self.slug = f"{base_slug}-{uuid.uuid4().hex[:6]}"
 
         # Call the parent save method
+        created = self._state.adding
         super().save(*args, **kwargs)
+        if created:
+            events.record(
+                'class.created', class_id=self.pk, name=self.name, term=self.term_id, teacher=self.teacher_id,
+            )
 
     def __str__(self):
         return self.name
 
 
+# Sent by the bulk Enrollment APIs, which bypass m2m_changed; `enrollments` are the rows written
+enrollments_changed = Signal()
+
+
+class EnrollmentQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # Class.students.add() writes through here; fill in the denormalized term
+        objs = list(objs)
+        missing = {obj.class_obj_id for obj in objs if obj.term_id is None}
+        if missing:
+            terms = dict(Class.objects.using(self.db).filter(pk__in=missing).values_list('pk', 'term_id'))
+            for obj in objs:
+                if obj.term_id is None:
+                    obj.term_id = terms[obj.class_obj_id]
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def active(self):
+        return self.filter(status=Enrollment.ACTIVE)
+
+    def members(self):
+        return self.filter(status__in=Enrollment.MEMBER_STATUSES)
+
+
+class EnrollmentManager(models.Manager.from_queryset(EnrollmentQuerySet)):
+    def enroll(self, class_obj, students):
+        """
+        Enroll students in a class in bulk, reactivating earlier enrollments in it. Returns
+        the enrollments that were created or reactivated.
+        """
+        student_ids = {getattr(student, 'pk', student) for student in students}
+        now = timezone.now()
+        existing = {
+            enrollment.student_id: enrollment
+            for enrollment in self.filter(class_obj=class_obj, student_id__in=student_ids)
+        }
+        reactivated = [enrollment for enrollment in existing.values() if enrollment.status != Enrollment.ACTIVE]
+        for enrollment in reactivated:
+            enrollment.status, enrollment.enrolled_at, enrollment.left_at = Enrollment.ACTIVE, now, None
+        new = [
+            Enrollment(class_obj=class_obj, student_id=student_id, term_id=class_obj.term_id, enrolled_at=now)
+            for student_id in student_ids - existing.keys()
+        ]
+        with transaction.atomic():
+            self.bulk_create(new, ignore_conflicts=True)
+            self.bulk_update(reactivated, ['status', 'enrolled_at', 'left_at'])
+        changed = new + reactivated
+        if changed:
+            enrollments_changed.send(sender=Enrollment, enrollments=changed)
+        return changed
+
+    def leave(self, class_obj, students, status=None):
+        """
+        End the active enrollments of students in a class in bulk, keeping them as history
+        with `status` (completed by default) and the time they left. Returns the ended ones.
+        """
+        status = status or Enrollment.COMPLETED
+        student_ids = {getattr(student, 'pk', student) for student in students}
+        ended = list(self.active().filter(class_obj=class_obj, student_id__in=student_ids))
+        now = timezone.now()
+        for enrollment in ended:
+            enrollment.status, enrollment.left_at = status, now
+        self.bulk_update(ended, ['status', 'left_at'])
+        if ended:
+            enrollments_changed.send(sender=Enrollment, enrollments=ended)
+        return ended
+
+
+class Enrollment(models.Model):
+    """
+    A student's place in a class. Ending it (see EnrollmentManager.leave) keeps the row as
+    history; the current roster is the active enrollments. Uses the table of the former
+    plain many-to-many field.
+    """
+    ACTIVE = 'active'
+    COMPLETED = 'completed'
+    DROPPED = 'dropped'
+    STATUS_CHOICES = (
+        (ACTIVE, 'Active'),
+        (COMPLETED, 'Completed'),
+        (DROPPED, 'Dropped'),
+    )
+    # Students a class's pages show: those still in it and those who finished it
+    MEMBER_STATUSES = (ACTIVE, COMPLETED)
+
+    # The join table's existing integer key
+    id = models.AutoField(primary_key=True)
+    class_obj = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='enrollments', db_column='class_id')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='enrollments', db_column='user_id')
+    # The class's term, copied so a student's enrollment in a term is found by index
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='enrollments')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=ACTIVE)
+    enrolled_at = models.DateTimeField(default=timezone.now)
+    left_at = models.DateTimeField(blank=True, null=True)
+
+    objects = EnrollmentManager()
+
+    class Meta:
+        db_table = 'account_module_class_students'
+        unique_together = [('class_obj', 'student')]
+        indexes = [
+            models.Index(fields=['student', 'term'], name='enrollment_student_term_idx'),
+            models.Index(fields=['class_obj', 'status'], name='enrollment_class_status_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.term_id is None:
+            self.term_id = self.class_obj.term_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.student} in {self.class_obj} ({self.status})"
+
+
 class AcademicRecord(models.Model):
     """
     Represents an academic record for a student in a specific term.
@@ -172,6 +330,7 @@ class AcademicRecord(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='academic_records')
     term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='academic_records_in_term')
     passed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         # Check if the student has a score for this term
@@ -187,20 +346,89 @@ class AcademicRecord(models.Model):
         # Save the academic record
         super().save(*args, **kwargs)
 
-        # Promote the student to the next term if they passed
+        # Promote the student to the next term if they passed; the worker does the promotion
+        # (and creates the next class with its sessions) outside of the grade request
         if self.passed:
-            self.student.promote_to_next_term()
+            enqueue(
+                'account_module.promote_student', {'student_id': self.student_id},
+                key=f'promote-student:{self.student_id}:{self.term_id}',
+            )
 
     def __str__(self):
         return f"{self.student.username} - {self.term.name} - Passed: {self.passed}"
 
 
+class TermCalendar(models.Model):
+    """
+    When the classes of a term meet: `session_count` sessions on the given weekdays from
+    `start_date`, skipping holidays. generate_sessions() creates and dates the term's
+    sessions from it.
+    """
+    WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+    term = models.OneToOneField(Term, on_delete=models.CASCADE, related_name='calendar')
+    start_date = models.DateField()
+    weekdays = models.CharField(
+        max_length=13, validators=[validate_weekdays],
+        help_text='Comma-separated weekday numbers, 0 for Monday to 6 for Sunday, e.g. "5,0,2".',
+    )
+    holidays = models.JSONField(
+        default=list, blank=True, help_text='Dates without sessions, as ["YYYY-MM-DD", ...].',
+    )
+    session_count = models.PositiveIntegerField(default=12)
+
+    def clean(self):
+        if not isinstance(self.holidays, list):
+            raise ValidationError({'holidays': 'Enter a list of dates.'})
+        for day in self.holidays:
+            try:
+                date.fromisoformat(day)
+            except (TypeError, ValueError):
+                raise ValidationError({'holidays': f'"{day}" is not a YYYY-MM-DD date.'})
+
+    def save(self, *args, **kwargs):
+        # Not only through forms: session_dates() relies on valid weekdays
+        validate_weekdays(self.weekdays)
+        super().save(*args, **kwargs)
+
+    def weekday_numbers(self):
+        # Also checked here, for rows written around save()
+        validate_weekdays(self.weekdays)
+        return {int(day) for day in self.weekdays.split(',')}
+
+    def session_dates(self):
+        """
+        The date of each session, in order.
+        """
+        weekdays = self.weekday_numbers()
+        holidays = {date.fromisoformat(day) for day in self.holidays}
+        dates = []
+        # Every week has a session day, and each holiday takes at most one of them
+        for offset in range(7 * (self.session_count + len(holidays))):
+            if len(dates) == self.session_count:
+                break
+            day = self.start_date + timedelta(days=offset)
+            if day.weekday() in weekdays and day not in holidays:
+                dates.append(day)
+        return dates
+
+    def __str__(self):
+        return f"Calendar of {self.term}"
+
+
 class AttendanceSession(models.Model):
     """
     Represents an attendance session for a specific class.
     """
     session_number = models.PositiveIntegerField()
     class_obj = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='attendance_sessions')
+    # Set from the term's calendar; sessions of terms without one have no date
+    date = models.DateField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date'], name='session_date_idx'),
+        ]
 
     def __str__(self):
         return f"Session {self.session_number} - {self.class_obj.name}"
@@ -213,11 +441,67 @@ class AttendanceRecord(models.Model):
     session = models.ForeignKey(AttendanceSession, on_delete=models.CASCADE, related_name='records')
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attendance_records')
     present = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # When the teacher took the mark (on their device, for synced marks); the later mark wins
+    marked_at = models.DateTimeField(blank=True, null=True)
+    # Idempotency key of the synced mark that last set `present`
+    sync_key = models.CharField(max_length=64, blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # Also the conflict target of the attendance writes' upserts
+            models.UniqueConstraint(fields=['session', 'student'], name='attendance_unique_session_student'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {'Present' if self.present else 'Absent'}"
 
 
+class ArchivedAttendance(models.Model):
+    """
+    A student's attendance in a class of a closed term, in one row instead of one
+    AttendanceRecord per session: bit n - 1 of `recorded_bits` is set if session n had a
+    record, and the same bit of `present_bits` if the student was present.
+    """
+    # Bits of a positive 64-bit integer
+    MAX_SESSIONS = 63
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_attendance')
+    class_obj = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='archived_attendance')
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='archived_attendance')
+    present_bits = models.PositiveBigIntegerField(default=0)
+    recorded_bits = models.PositiveBigIntegerField(default=0)
+    # Sessions with a record, so attendance rates can be summed in SQL
+    session_count = models.PositiveSmallIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('student', 'class_obj')]
+
+    def merge(self, marks):
+        """
+        Set the bits of {session_number: present}, replacing earlier bits of those sessions.
+        """
+        for session_number, present in marks.items():
+            bit = 1 << (session_number - 1)
+            self.recorded_bits |= bit
+            self.present_bits = self.present_bits | bit if present else self.present_bits & ~bit
+        self.session_count = self.recorded_bits.bit_count()
+
+    def marks(self):
+        """
+        {session_number: present} for every recorded session.
+        """
+        return {
+            number: bool(self.present_bits >> (number - 1) & 1)
+            for number in range(1, self.recorded_bits.bit_length() + 1)
+            if self.recorded_bits >> (number - 1) & 1
+        }
+
+    def __str__(self):
+        return f"{self.student.username} - {self.class_obj.name} ({self.session_count} sessions)"
+
+
 class Score(models.Model):
     """
     Represents scores for a student in a specific term.
@@ -229,6 +513,28 @@ class Score(models.Model):
     oral_or_listening = models.FloatField(blank=True, null=True)
     class_activity = models.FloatField(blank=True, null=True)
     final = models.FloatField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    GRADE_FIELDS = ('quiz_1', 'quiz_2', 'oral_or_listening', 'class_activity', 'final')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the grades as loaded so save() can log what changed
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_grades = {field: getattr(instance, field) for field in cls.GRADE_FIELDS}
+        return instance
+
+    def grade_changes(self):
+        """
+        {field: [old, new]} for every grade that differs from the loaded values.
+        """
+        loaded = getattr(self, '_loaded_grades', {})
+        changes = {}
+        for field in self.GRADE_FIELDS:
+            old, new = loaded.get(field), getattr(self, field)
+            if old != new:
+                changes[field] = [old, new]
+        return changes
 
     @property
     def total_score(self):
@@ -244,21 +550,19 @@ class Score(models.Model):
         ]))
 
     def save(self, *args, **kwargs):
+        created = self._state.adding
+        changes = self.grade_changes()
         # Call the parent save method to save the score first
         super().save(*args, **kwargs)
-
-        print(f"Saving score for {self.student.username} in term {self.term.name}")
+        self._loaded_grades = {field: getattr(self, field) for field in self.GRADE_FIELDS}
 
         # Ensure an AcademicRecord exists for this student and term
-        academic_record, created = AcademicRecord.objects.get_or_create(
+        academic_record, _ = AcademicRecord.objects.get_or_create(
             student=self.student,
             term=self.term,
             defaults={'passed': False}  # Default to not passed
         )
 
-        print(
-            f"AcademicRecord {'created' if created else 'updated'} for {self.student.username} in term {self.term.name}")
-
         # Update the AcademicRecord based on the total score
         if self.total_score > 70:
             academic_record.passed = True
@@ -267,22 +571,262 @@ class Score(models.Model):
 
         # Save the updated AcademicRecord
         academic_record.save()
-        print(f"AcademicRecord saved with passed={academic_record.passed}")
+        if created or changes:
+            events.record(
+                'score.created' if created else 'score.changed', score=self.pk, student=self.student_id,
+                term=self.term_id, changes=changes, total=self.total_score, passed=academic_record.passed,
+            )
 
     def __str__(self):
         return f"{self.student.username} - Total: {self.total_score}"
 
 
+class Change(models.Model):
+    """
+    One entry of the change log behind the change feed: the row of `table` identified by
+    `key` was saved (with `data` as its new values) or deleted. Ids only grow, so they
+    serve as the feed's cursor. See changes.py.
+    """
+    SAVE = 'save'
+    DELETE = 'delete'
+    ACTION_CHOICES = (
+        (SAVE, 'Save'),
+        (DELETE, 'Delete'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    table = models.CharField(max_length=30)
+    key = models.CharField(max_length=64)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    data = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['table', 'key', 'id'], name='change_row_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.table} {self.key}"
+
+
+class ChangeLogHorizon(models.Model):
+    """
+    Single row recording the highest change id removed by pruning. Cursors below it can
+    no longer be served, since entries they have not seen are gone.
+    """
+    pruned_through = models.BigIntegerField(default=0)
+
+    @classmethod
+    def get(cls):
+        return cls.objects.get_or_create(pk=1)[0]
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('pruned_through', flat=True).first() or 0
+
+    def __str__(self):
+        return f"Pruned through #{self.pruned_through}"
+
+
 def create_sessions_for_class(new_class):
     """
-    Creates 12 sessions for a given class using bulk creation.
+    Creates the sessions of a new class; see create_sessions_for_classes().
+    """
+    create_sessions_for_classes([new_class])
+
+
+def create_sessions_for_classes(new_classes):
+    """
+    Creates the sessions of new classes in bulk: dated from their term's calendar if it has
+    one, otherwise 12 undated sessions each.
     """
+    calendars = {
+        calendar.term_id: calendar
+        for calendar in TermCalendar.objects.select_related('term').filter(
+            term_id__in={class_obj.term_id for class_obj in new_classes},
+        )
+    }
+    undated, dated = [], {}
+    for class_obj in new_classes:
+        if class_obj.term_id in calendars:
+            dated.setdefault(class_obj.term_id, []).append(class_obj)
+        else:
+            undated.append(class_obj)
+
     sessions = [
         AttendanceSession(
             session_number=i + 1,
-            class_obj=new_class,
+            class_obj=class_obj,
         )
+        for class_obj in undated
         for i in range(12)
     ]
-    AttendanceSession.objects.bulk_create(sessions)
-    print(f"Created 12 sessions for {new_class.name}")
\ No newline at end of file
+    AttendanceSession.objects.bulk_create(sessions, batch_size=1000)
+    for term_id, classes in dated.items():
+        calendar = calendars[term_id]
+        generate_sessions(calendar.term, classes=classes)
+    for class_obj in new_classes:
+        count = calendars[class_obj.term_id].session_count if class_obj.term_id in calendars else 12
+        events.record('class.sessions_created', class_id=class_obj.pk, count=count)
+
+
+def default_teacher_id(term_id, loads=None):
+    # The teacher a class of the term created without one gets; see account_module.teacher_load.
+    # Code creating several classes passes its TermLoads, so each pick counts the ones before
+    from .teacher_load import TermLoads  # imports this module
+    teacher_id = (loads or TermLoads(term_id)).assign()
+    if teacher_id is None:
+        raise ValueError("No teacher exists in the system. Please create a teacher first.")
+    return teacher_id
+
+
+def assign_unique_slugs(classes):
+    # Unique slugs for unsaved classes, as Class.save() would generate them, checked in one query
+    base_slugs = [slugify(class_obj.name) for class_obj in classes]
+    taken = set(Class.objects.filter(slug__in=base_slugs).values_list('slug', flat=True))
+    for class_obj, base_slug in zip(classes, base_slugs):
+        class_obj.slug = base_slug if base_slug not in taken else f"{base_slug}-{uuid.uuid4().hex[:6]}"
+        taken.add(class_obj.slug)
+
+
+def rollover_classes(classes, target_term, carry_teachers=False, dry_run=False):
+    """
+    Creates the successor of each of `classes` (that does not have one yet) in
+    `target_term`, with its sessions, in bulk. Successors keep the gender and are linked
+    through `parent`; they get the same teacher if `carry_teachers`, otherwise the
+    least-loaded teachers, as Class.save() would assign them.
+
+    Concurrent rollovers of the same class are safe: the unique (`parent`, `term`) lets only
+    one successor per term in. Returns the created classes (unsaved ones on a dry run).
+    """
+    classes = list(classes)
+    linked = set(
+        Class.objects.filter(parent__in=classes, term=target_term).values_list('parent_id', flat=True)
+    )
+    sources = [class_obj for class_obj in classes if class_obj.pk not in linked]
+    if not sources:
+        return []
+
+    from .teacher_load import TermLoads  # imports this module
+    loads = TermLoads(target_term.pk)
+    successors = [
+        Class(
+            name=source.successor_name(target_term),
+            gender=source.gender,
+            term=target_term,
+            teacher_id=source.teacher_id if carry_teachers else default_teacher_id(target_term.pk, loads),
+            parent=source,
+        )
+        for source in sources
+    ]
+
+    assign_unique_slugs(successors)
+    if dry_run:
+        return successors
+
+    with transaction.atomic():
+        # A class rolled over concurrently already has its successor; skip it
+        Class.objects.bulk_create(successors, batch_size=1000, ignore_conflicts=True)
+        created = list(Class.objects.filter(
+            slug__in=[successor.slug for successor in successors], parent__in=sources,
+        ))
+        create_sessions_for_classes(created)
+    for class_obj in created:
+        events.record(
+            'class.created', class_id=class_obj.pk, name=class_obj.name, term=class_obj.term_id,
+            teacher=class_obj.teacher_id, parent=class_obj.parent_id,
+        )
+    return created
+
+
+def rollover_term(term, target_term=None, carry_teachers=False, dry_run=False):
+    """
+    Rolls every class of `term` over into `target_term`, by default the term that follows
+    it. Returns the target term and the created classes.
+    """
+    if target_term is None:
+        target_term = Term.objects.filter(order=term.order + 1).first()
+        if target_term is None:
+            raise ValueError(f'No term follows "{term}".')
+    classes = Class.objects.filter(term=term)
+    return target_term, rollover_classes(classes, target_term, carry_teachers=carry_teachers, dry_run=dry_run)
+
+
+def generate_sessions(term, classes=None, dry_run=False):
+    """
+    Creates or re-dates the sessions of every class in `term` (or just `classes`) after
+    the term's calendar, in one pass: one query reads the existing sessions, then missing
+    sessions are bulk-created and only sessions whose date changed are updated. Running
+    it again without calendar changes writes nothing.
+
+    Sessions numbered beyond the calendar's session count are left as they are, since
+    they may hold attendance. Returns counts of created, updated, unchanged and extra
+    sessions.
+    """
+    dates = term.calendar.session_dates()
+    class_ids = [class_obj.pk for class_obj in classes] if classes is not None else list(
+        Class.objects.filter(term=term).values_list('pk', flat=True)
+    )
+    existing = {
+        (session.class_obj_id, session.session_number): session
+        for session in AttendanceSession.objects.filter(class_obj_id__in=class_ids).only(
+            'pk', 'class_obj_id', 'session_number', 'date',
+        )
+    }
+
+    to_create, to_update = [], []
+    for class_id in class_ids:
+        for number, day in enumerate(dates, start=1):
+            session = existing.get((class_id, number))
+            if session is None:
+                to_create.append(AttendanceSession(session_number=number, class_obj_id=class_id, date=day))
+            elif session.date != day:
+                session.date = day
+                to_update.append(session)
+
+    if not dry_run:
+        with transaction.atomic():
+            AttendanceSession.objects.bulk_create(to_create, batch_size=1000)
+            AttendanceSession.objects.bulk_update(to_update, ['date'], batch_size=1000)
+    scheduled = len(class_ids) * len(dates)
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'unchanged': scheduled - len(to_create) - len(to_update),
+        'extra': sum(1 for _, number in existing if number > len(dates)),
+    }
+
+
+# Set while rows are moved into an archive; see archiving()
+_archiving = ContextVar('archiving', default=False)
+
+
+@contextmanager
+def archiving():
+    """
+    Deletes made inside are rows moving into an archive, not changes to the data: the
+    signal handlers behind the change feed and the students' page versions skip them.
+    """
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def is_archiving():
+    return _archiving.get()
+
+
+def touch_student_data(student_ids):
+    """
+    Marks the data shown on the given students' panel pages as changed, so cached copies
+    of those pages are no longer answered with 304. Writes that bypass the signals (bulk
+    creates and updates) must call this themselves.
+    """
+    student_ids = set(student_ids)
+    if student_ids:
+        User.objects.filter(pk__in=student_ids).update(
+            data_version=F('data_version') + 1, data_updated_at=timezone.now(),
+        )
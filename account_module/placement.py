@@ -0,0 +1,150 @@
+"""
+Placement of new students into the classes of a term.
+
+Students of a term without an active enrollment in it are placed into its classes of
+their gender, never beyond a class's `capacity`, always into the emptiest class
+available, so class sizes stay balanced. The classes of each gender are kept in a heap
+keyed on their size, which makes placing n students into k classes O(n log k). When
+every class of a gender is full, an overflow class (with its sessions) is opened.
+
+A run reads the classes and their sizes once and writes everything in one transaction:
+the overflow classes, their sessions and the enrollments, each in bulk.
+"""
+import heapq
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from monitoring_module import events
+from .models import (
+    User, Class, Enrollment, assign_unique_slugs, create_sessions_for_classes, default_teacher_id,
+    enrollments_changed,
+)
+from .teacher_load import TermLoads
+
+
+@dataclass
+class ClassPlacement:
+    class_obj: Class
+    # Active students before the run
+    size: int
+    students: list = field(default_factory=list)
+    # Opened by this run (unsaved on a dry run)
+    overflow: bool = False
+
+    @property
+    def total(self):
+        return self.size + len(self.students)
+
+
+@dataclass
+class Placement:
+    term: object
+    classes: list
+    # Students that cannot be placed, such as those without a gender
+    skipped: list
+
+    @property
+    def placed(self):
+        return sum(len(entry.students) for entry in self.classes)
+
+    @property
+    def overflow_classes(self):
+        return [entry.class_obj for entry in self.classes if entry.overflow]
+
+
+def unplaced_students(term):
+    """
+    Students of `term` without an active enrollment in any of its classes.
+    """
+    enrolled = Enrollment.objects.active().filter(student=OuterRef('pk'), term=term)
+    return User.objects.filter(user_type='student', current_term=term).exclude(Exists(enrolled)).order_by('pk')
+
+
+def place_students(term, students=None, dry_run=False):
+    """
+    Places `students` (by default every unplaced student of `term`) into the classes of
+    `term` and returns the Placement. On a dry run nothing is written.
+    """
+    students = list(unplaced_students(term) if students is None else students)
+    with transaction.atomic():
+        classes = Class.objects.filter(term=term).order_by('pk')
+        if not dry_run:
+            # Locked before the sizes are counted; PostgreSQL refuses FOR UPDATE with GROUP BY
+            classes = classes.select_for_update()
+        classes = list(classes)
+        sizes = dict(
+            Enrollment.objects.filter(class_obj__term=term, status=Enrollment.ACTIVE)
+            .values('class_obj_id').annotate(size=Count('pk')).values_list('class_obj_id', 'size')
+        )
+        entries = [ClassPlacement(class_obj, sizes.get(class_obj.pk, 0)) for class_obj in classes]
+
+        # One heap of (size, tie-breaker, entry) per gender, holding the classes with room
+        heaps = {gender: [] for gender, _ in Class.GENDER_CHOICES}
+        for number, entry in enumerate(entries):
+            if entry.total < entry.class_obj.capacity:
+                heaps[entry.class_obj.gender].append((entry.total, number, entry))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+
+        skipped, capacity = [], Class._meta.get_field('capacity').default
+        # The teachers of the overflow classes, read on the first one
+        loads = TermLoads(term.pk)
+        for student in students:
+            heap = heaps.get(student.gender)
+            if heap is None:
+                skipped.append(student)
+                continue
+            if not heap:
+                entry = open_overflow_class(term, student.gender, entries, capacity, loads)
+                heapq.heappush(heap, (0, len(entries), entry))
+                entries.append(entry)
+            total, number, entry = heapq.heappop(heap)
+            entry.students.append(student)
+            if total + 1 < entry.class_obj.capacity:
+                heapq.heappush(heap, (total + 1, number, entry))
+
+        placement = Placement(term, [entry for entry in entries if entry.students or entry.overflow], skipped)
+        assign_unique_slugs(placement.overflow_classes)
+        if dry_run:
+            return placement
+        if not placement.placed:
+            return placement
+        save_placement(placement)
+    events.record(
+        'students.placed', term=term.pk, placed=placement.placed,
+        overflow_classes=[class_obj.pk for class_obj in placement.overflow_classes], skipped=len(skipped),
+    )
+    return placement
+
+
+def open_overflow_class(term, gender, entries, capacity, loads):
+    # Numbered after the classes of the gender the term already has
+    number = sum(1 for entry in entries if entry.class_obj.gender == gender) + 1
+    class_obj = Class(
+        name=f"{term.name} - {gender.capitalize()} {number}", gender=gender, term=term, capacity=capacity,
+        teacher_id=default_teacher_id(term.pk, loads),
+    )
+    return ClassPlacement(class_obj, 0, overflow=True)
+
+
+def save_placement(placement):
+    overflow = placement.overflow_classes
+    Class.objects.bulk_create(overflow, batch_size=1000)
+    create_sessions_for_classes(overflow)
+    for class_obj in overflow:
+        events.record(
+            'class.created', class_id=class_obj.pk, name=class_obj.name, term=class_obj.term_id,
+            teacher=class_obj.teacher_id, overflow=True,
+        )
+    # A student placed back into a class they left reactivates that enrollment
+    enrollments = Enrollment.objects.bulk_create(
+        [
+            Enrollment(class_obj=entry.class_obj, student=student, term=placement.term)
+            for entry in placement.classes for student in entry.students
+        ],
+        batch_size=1000, update_conflicts=True, unique_fields=['class_obj', 'student'],
+        update_fields=['status', 'enrolled_at', 'left_at'],
+    )
+    # Bulk writes skip the signals behind the change log and the students' page versions
+    enrollments_changed.send(sender=Enrollment, enrollments=enrollments)
@@ -0,0 +1,32 @@
+ARCHIVE_DB = 'archive'
+
+# account_module and the apps its models refer to
+ARCHIVE_APPS = {'account_module', 'auth', 'contenttypes'}
+
+
+class ArchiveRouter:
+    """
+    Keeps the archive database to the schema of account_module.
+
+    Nothing is routed to the archive implicitly: the terms a row belongs to decide where
+    it lives, so archived rows are read with `.using(ARCHIVE_DB)` (see cold_storage.py)
+    and their related objects follow them to the archive through the instance hint.
+    Rows of the two databases are never related to each other.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == ARCHIVE_DB:
+            return ARCHIVE_DB
+        return None
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return (obj1._state.db == ARCHIVE_DB) == (obj2._state.db == ARCHIVE_DB)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == ARCHIVE_DB:
+            return app_label in ARCHIVE_APPS
+        return None
@@ -0,0 +1,94 @@
+"""
+Student lookup by name, national ID or parent phone number.
+
+On SQLite the searchable columns are mirrored into an FTS5 table (see migration
+0006) keyed by the user's id, so prefix queries are answered from the full-text
+index instead of scanning the user table. On PostgreSQL the same columns carry
+trigram GIN indexes and plain `icontains` lookups are used. The index is kept in
+sync by the signal handlers in `account_module.signals`.
+"""
+from django.db import connection
+from django.db.models import Q
+from .models import User
+
+FTS_TABLE = 'account_module_user_search'
+SEARCH_FIELDS = ('first_name', 'last_name', 'national_id', 'parent_number')
+RESULT_FIELDS = ('id', 'slug', 'first_name', 'last_name', 'national_id')
+
+
+def uses_fts():
+    return connection.vendor == 'sqlite'
+
+
+def _tokens(query):
+    return [token.replace('"', '') for token in query.split() if token.replace('"', '')]
+
+
+def index_user(user):
+    """
+    Insert or refresh a user's row in the FTS table. Non-students are removed.
+    """
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [user.pk])
+        if user.user_type == 'student':
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, first_name, last_name, national_id, parent_number) '
+                f'VALUES (%s, %s, %s, %s, %s)',
+                [user.pk] + [getattr(user, field) or '' for field in SEARCH_FIELDS],
+            )
+
+
+def unindex_user(user_id):
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [user_id])
+
+
+def rebuild_index():
+    """
+    Repopulate the FTS table from scratch, e.g. after bulk inserts that bypassed signals.
+    """
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, first_name, last_name, national_id, parent_number) '
+            f"SELECT id, COALESCE(first_name, ''), COALESCE(last_name, ''), "
+            f"COALESCE(national_id, ''), COALESCE(parent_number, '') "
+            f"FROM {User._meta.db_table} WHERE user_type = 'student'"
+        )
+
+
+def search_students(query, limit=10):
+    """
+    Return up to `limit` students matching every word of `query` as a prefix of any
+    searchable field, as a list of dicts with the keys in RESULT_FIELDS.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    if uses_fts():
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        columns = ', '.join(f'u.{field}' for field in RESULT_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {columns} FROM {FTS_TABLE} s '
+                f'JOIN {User._meta.db_table} u ON u.id = s.rowid '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY s.rank LIMIT %s',
+                [match, limit],
+            )
+            return [dict(zip(RESULT_FIELDS, row)) for row in cursor.fetchall()]
+
+    lookup = 'icontains' if connection.vendor == 'postgresql' else 'istartswith'
+    queryset = User.objects.filter(user_type='student')
+    for token in tokens:
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__{lookup}': token})
+        queryset = queryset.filter(condition)
+    return list(queryset.order_by('last_name', 'first_name').values(*RESULT_FIELDS)[:limit])
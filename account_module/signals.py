@@ -0,0 +1,156 @@
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from job_module.jobs import enqueue
+from . import changes, search, slug_cache
+from .models import (
+    User, Class, Term, TermCalendar, Enrollment, Score, AcademicRecord, AttendanceRecord, Change,
+    enrollments_changed, is_archiving, touch_student_data,
+)
+
+
+@receiver(post_save, sender=User)
+def update_user_search_index(sender, instance, update_fields=None, **kwargs):
+    # Saves such as the last_login update on every sign-in don't touch searchable columns
+    if update_fields is not None and not set(update_fields) & {'user_type', *search.SEARCH_FIELDS}:
+        return
+    search.index_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_from_search_index(sender, instance, **kwargs):
+    search.unindex_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_slug(sender, instance, created=False, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(slug_cache.users.fields):
+        return
+    slug_cache.users.invalidate(instance.pk, instance.slug)
+
+
+@receiver(post_delete, sender=User)
+def forget_user_slug(sender, instance, **kwargs):
+    slug_cache.users.invalidate(instance.pk, instance.slug)
+
+
+@receiver(post_save, sender=Class)
+@receiver(post_delete, sender=Class)
+def invalidate_class_slug(sender, instance, **kwargs):
+    slug_cache.classes.invalidate(instance.pk, instance.slug)
+
+
+@receiver(post_save, sender=Term)
+def invalidate_term_classes(sender, instance, created=False, **kwargs):
+    # Cached classes carry their term's name
+    if not created:
+        for pk, slug in Class.objects.filter(term=instance).values_list('pk', 'slug'):
+            slug_cache.classes.invalidate(pk, slug)
+
+
+@receiver(post_save, sender=Score)
+@receiver(post_delete, sender=Score)
+@receiver(post_save, sender=AcademicRecord)
+@receiver(post_delete, sender=AcademicRecord)
+@receiver(post_save, sender=AttendanceRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+def touch_record_student(sender, instance, **kwargs):
+    if not is_archiving():
+        touch_student_data([instance.student_id])
+
+
+@receiver(post_save, sender=User)
+def touch_renamed_student(sender, instance, created=False, update_fields=None, **kwargs):
+    # The student pages show the student's name
+    if created or (update_fields is not None and not set(update_fields) & {'first_name', 'last_name'}):
+        return
+    if instance.user_type == 'student':
+        touch_student_data([instance.pk])
+
+
+@receiver(m2m_changed, sender=Enrollment)
+def touch_enrolled_students(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        touch_student_data([instance.pk])
+    elif action == 'pre_clear':
+        touch_student_data(instance.students.values_list('pk', flat=True))
+    else:
+        touch_student_data(pk_set)
+
+
+@receiver(post_save, sender=Class)
+def touch_class_students(sender, instance, created=False, **kwargs):
+    # The student pages show the class and term names
+    if not created:
+        touch_student_data(instance.students.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Term)
+def touch_term_students(sender, instance, created=False, **kwargs):
+    if not created:
+        touch_student_data(User.objects.filter(
+            Q(scores__term=instance) | Q(enrollments__term=instance)
+        ).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Score)
+@receiver(post_save, sender=AcademicRecord)
+@receiver(post_save, sender=AttendanceRecord)
+def log_saved_record(sender, instance, **kwargs):
+    changes.record(instance)
+
+
+@receiver(post_delete, sender=Score)
+@receiver(post_delete, sender=AcademicRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+@receiver(post_delete, sender=User)
+def log_deleted_record(sender, instance, **kwargs):
+    if not is_archiving():
+        changes.record(instance, Change.DELETE)
+
+
+@receiver(post_save, sender=User)
+def log_saved_user(sender, instance, update_fields=None, **kwargs):
+    # Such as the last_login update on every sign-in, which the feed does not carry
+    if update_fields is not None and not set(update_fields) & set(changes.tracked_fields(User)):
+        return
+    changes.record(instance)
+
+
+@receiver(m2m_changed, sender=Enrollment)
+def log_enrollments(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    change = Change.SAVE if action == 'post_add' else Change.DELETE
+    if action == 'pre_clear':
+        pk_set = (instance.enrolled_classes if reverse else instance.students).values_list('pk', flat=True)
+    if reverse:
+        # instance is the student, pk_set holds classes
+        for class_id in pk_set:
+            changes.record_enrollments(class_id, [instance.pk], change)
+    else:
+        changes.record_enrollments(instance.pk, pk_set, change)
+
+
+@receiver(enrollments_changed, sender=Enrollment)
+def log_enrollment_rows(sender, enrollments, **kwargs):
+    touch_student_data(enrollment.student_id for enrollment in enrollments)
+    changes.record_enrollment_rows(enrollments)
+
+
+@receiver(post_save, sender=Enrollment)
+def log_saved_enrollment(sender, instance, **kwargs):
+    # Single saves, such as the class admin's inline; Class.students and the bulk APIs
+    # report their own writes
+    log_enrollment_rows(sender, [instance])
+
+
+@receiver(post_save, sender=TermCalendar)
+def schedule_term_sessions(sender, instance, **kwargs):
+    # Dating every session of the term can take a while; the worker does it
+    enqueue(
+        'account_module.generate_term_sessions', {'term_id': instance.term_id},
+        key=f'generate-term-sessions:{instance.term_id}',
+    )
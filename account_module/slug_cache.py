@@ -0,0 +1,146 @@
+"""
+Slug -> row cache for the users and classes named in panel URLs.
+
+Two levels: a small per-process LRU answers hot slugs without any I/O, and the shared
+Django cache answers the rest without touching the database. Both hold only a minimal
+projection of the row (the `fields` of each cache below), from which a model instance
+can be built for views and templates.
+
+post_save/post_delete signals (see signals.py) invalidate an entry in this process and
+in the shared cache, including the entry of the previous slug if it changed. Other
+processes may serve their local copy for up to SLUG_CACHE['LOCAL_TTL'] seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from monitoring_module.metrics import record_cache_lookup
+from .models import User, Class
+
+DEFAULT_SLUG_CACHE_SETTINGS = {
+    'LOCAL_SIZE': 1024,
+    'LOCAL_TTL': 30,
+    'TIMEOUT': 60 * 60,
+}
+
+
+def slug_cache_settings():
+    return {**DEFAULT_SLUG_CACHE_SETTINGS, **getattr(settings, 'SLUG_CACHE', {})}
+
+
+class LocalLRU:
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, size):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SlugCache:
+    def __init__(self, name, model, fields, related=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        # {'term__name': ('term', 'name')}: values of a related row kept in the projection
+        self.related = related or {}
+        self.local = LocalLRU()
+
+    def key(self, slug):
+        return f'slug:{self.name}:{slug}'
+
+    def pk_key(self, pk):
+        # pk -> slug, so a save can invalidate the entry of the slug the row had before
+        return f'slug:{self.name}:pk:{pk}'
+
+    def resolve(self, slug):
+        """
+        The cached projection of the row with this slug, as a dict, or None if there is none.
+        """
+        if not slug:
+            return None
+        key = self.key(slug)
+        values = self.local.get(key)
+        record_cache_lookup(f'slug_{self.name}_local', values is not None)
+        if values is not None:
+            return values
+
+        config = slug_cache_settings()
+        values = shared_cache.get(key)
+        record_cache_lookup(f'slug_{self.name}_shared', values is not None)
+        if values is None:
+            values = self.model._default_manager.filter(slug=slug).values(*self.fields, *self.related).first()
+            if values is None:
+                return None
+            shared_cache.set_many({key: values, self.pk_key(values['id']): slug}, config['TIMEOUT'])
+        self.local.set(key, values, config['LOCAL_TTL'], config['LOCAL_SIZE'])
+        return values
+
+    def get_instance(self, slug):
+        """
+        A model instance built from the cached projection (other fields are deferred), or None.
+        """
+        values = self.resolve(slug)
+        if values is None:
+            return None
+        # from_db() takes the values in the model's field order
+        attnames = [field.attname for field in self.model._meta.concrete_fields if field.attname in self.fields]
+        instance = self.model.from_db('default', attnames, [values[attname] for attname in attnames])
+        for lookup, (relation, field) in self.related.items():
+            related_model = self.model._meta.get_field(relation).related_model
+            related = related_model.from_db(
+                'default', ['id', field], [values[f'{relation}_id'], values[lookup]],
+            )
+            setattr(instance, relation, related)
+        return instance
+
+    def invalidate(self, pk, slug=None):
+        stale = {slug} if slug else set()
+        previous = shared_cache.get(self.pk_key(pk))
+        if previous:
+            stale.add(previous)
+        for old_slug in stale:
+            self.local.delete(self.key(old_slug))
+        shared_cache.delete_many([self.key(old_slug) for old_slug in stale] + [self.pk_key(pk)])
+
+    def forget(self, slugs):
+        """
+        Drop the entries of these slugs. For bulk writes, which bypass the signals.
+        """
+        keys = [self.key(slug) for slug in slugs]
+        for key in keys:
+            self.local.delete(key)
+        shared_cache.delete_many(keys)
+
+
+users = SlugCache('user', User, ('id', 'slug', 'username', 'first_name', 'last_name', 'user_type', 'gender'))
+classes = SlugCache(
+    'class', Class, ('id', 'slug', 'name', 'gender', 'teacher_id', 'term_id'),
+    related={'term__name': ('term', 'name')},
+)
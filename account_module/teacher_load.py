@@ -0,0 +1,55 @@
+"""
+Teacher loads behind the default teacher of new classes.
+
+A class created without a teacher gets the active teacher with the fewest classes in its
+term (then the fewest active students, then the lowest id). The loads come from the
+database, in one query per term: a class saved on its own reads them for its pick, and
+code creating a batch of classes (a rollover, the overflow classes of a placement) reads
+them once into a TermLoads, whose heap picks in O(log n) and counts each pick right away,
+so the classes of the batch spread over the teachers.
+
+Nothing outlives the batch: classes, enrollments and teachers changed by any process
+count from the next read on, and the picks of a batch that is rolled back or only a dry
+run are forgotten with it.
+"""
+import heapq
+
+from django.db.models import Count, Q
+from .models import User, Enrollment
+
+
+def term_loads(term_id):
+    """
+    Active teachers annotated with their `class_count` and `student_count` in the term.
+    """
+    in_term = Q(classes_taught__term_id=term_id)
+    return User.objects.filter(user_type='teacher', is_active=True).annotate(
+        class_count=Count('classes_taught', filter=in_term, distinct=True),
+        student_count=Count(
+            'classes_taught__enrollments',
+            filter=in_term & Q(classes_taught__enrollments__status=Enrollment.ACTIVE),
+        ),
+    )
+
+
+class TermLoads:
+    """
+    The loads of a term's teachers for a batch of picks, read on the first one.
+    """
+    def __init__(self, term_id):
+        self.term_id = term_id
+        self.heap = None
+
+    def assign(self):
+        """
+        The least-loaded active teacher of the term, or None if there is no active teacher.
+        The class they get is counted right away, so successive picks spread the classes.
+        """
+        if self.heap is None:
+            self.heap = list(term_loads(self.term_id).values_list('class_count', 'student_count', 'pk'))
+            heapq.heapify(self.heap)
+        if not self.heap:
+            return None
+        classes, students, teacher_id = self.heap[0]
+        heapq.heapreplace(self.heap, (classes + 1, students, teacher_id))
+        return teacher_id
@@ -0,0 +1,100 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from account_module.admin import EstimatedCountPaginator
+from account_module.models import User, Term, Class, Score, AttendanceSession, AttendanceRecord
+
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='admin',
+            national_id='1111111111',
+            password='testpass123',
+            user_type='teacher',
+        )
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.admin_user, term=self.term)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+        self.client.force_login(self.admin_user)
+
+    def add_students(self, count, offset=0):
+        for i in range(offset, offset + count):
+            student = User.objects.create(
+                national_id=f'09{i:08d}',
+                first_name='Jane',
+                last_name=f'Smith {i}',
+                user_type='student',
+                current_term=self.term,
+            )
+            Score.objects.create(student=student, term=self.term, quiz_1=10, final=10)
+            AttendanceRecord.objects.create(session=self.session, student=student, present=True)
+
+    def changelist_queries(self, model_name):
+        url = reverse(f'admin:account_module_{model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.add_students(2)
+        small = {name: self.changelist_queries(name) for name in ('score', 'attendancerecord', 'user', 'class')}
+        self.add_students(10, offset=2)
+        large = {name: self.changelist_queries(name) for name in ('score', 'attendancerecord', 'user', 'class')}
+        self.assertEqual(small, large)
+
+    def test_class_change_form_uses_autocomplete_for_students(self):
+        response = self.client.get(reverse('admin:account_module_class_change', args=[self.class_obj.pk]))
+        self.assertContains(response, 'admin-autocomplete')
+
+    def test_user_search_by_national_id_prefix(self):
+        self.add_students(3)
+        response = self.client.get(reverse('admin:account_module_user_changelist'), {'q': '0900000001'})
+        self.assertContains(response, 'Smith 1')
+        self.assertNotContains(response, 'Smith 2')
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+
+    def test_small_tables_use_exact_count(self):
+        paginator = EstimatedCountPaginator(Term.objects.order_by('pk'), 10)
+        self.assertEqual(paginator.count, 1)
+
+    def test_large_unfiltered_tables_use_estimate(self):
+        Term.objects.create(name="Term 2", order=2, pk=50000)
+        paginator = EstimatedCountPaginator(Term.objects.order_by('pk'), 10)
+        self.assertEqual(paginator.count, 50000)
+
+    def test_filtered_querysets_use_exact_count(self):
+        Term.objects.create(name="Term 2", order=2, pk=50000)
+        paginator = EstimatedCountPaginator(Term.objects.filter(order=2).order_by('pk'), 10)
+        self.assertEqual(paginator.count, 1)
+
+
+class AdminSearchIndexTest(TestCase):
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+    def test_prefix_searches_use_an_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Checks the SQLite query plan.')
+        for queryset in (
+            User.objects.filter(username__istartswith='09'),
+            User.objects.filter(last_name__istartswith='smi'),
+            # The admin ORs the prefix lookups of all search_fields
+            User.objects.filter(Q(username__istartswith='s') | Q(last_name__istartswith='s') | Q(slug__istartswith='s')),
+            Class.objects.filter(name__istartswith='class'),
+            Score.objects.filter(student__username__istartswith='09'),
+        ):
+            with self.subTest(sql=str(queryset.query)):
+                plan = self.plan(queryset)
+                self.assertIn('_nocase_idx', plan)
+                self.assertNotIn('SCAN', plan)
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from account_module.attendance_archive import archive_term, session_presence
+from account_module.models import (
+    User, Term, Class, AttendanceSession, AttendanceRecord, ArchivedAttendance, Change,
+)
+
+
+class AttendanceArchiveTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1, closed=True)
+        self.teacher = User.objects.create_user(username='teacher1', national_id='1234567890', user_type='teacher')
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}', national_id=f'098765432{i}', user_type='student', current_term=self.term,
+            )
+            for i in range(3)
+        ]
+        self.class_obj.students.add(*self.students)
+        self.sessions = [
+            AttendanceSession.objects.create(session_number=number, class_obj=self.class_obj)
+            for number in range(1, 13)
+        ]
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(session=session, student=student, present=(session.session_number + i) % 3 != 0)
+            for session in self.sessions
+            for i, student in enumerate(self.students)
+        ])
+
+    def attendance_page(self, student):
+        self.client.force_login(student)
+        return self.client.get(reverse('attendance_info', args=[student.slug, self.class_obj.slug]))
+
+    def test_one_row_per_student_and_class(self):
+        result = archive_term(self.term, chunk_size=7)
+        self.assertEqual(result, {'records': 36, 'rows': 3, 'skipped': 0})
+        self.assertFalse(AttendanceRecord.objects.exists())
+        self.assertEqual(ArchivedAttendance.objects.count(), 3)
+        archived = ArchivedAttendance.objects.get(student=self.students[0])
+        self.assertEqual(archived.session_count, 12)
+        self.assertEqual(archived.marks(), {number: number % 3 != 0 for number in range(1, 13)})
+
+    def test_archival_is_not_a_change(self):
+        versions = dict(User.objects.values_list('pk', 'data_version'))
+        changes = Change.objects.count()
+        archive_term(self.term)
+        self.assertEqual(dict(User.objects.values_list('pk', 'data_version')), versions)
+        self.assertEqual(Change.objects.count(), changes)
+        # Deletes outside an archival run still are
+        AttendanceRecord.objects.create(session=self.sessions[0], student=self.students[0]).delete()
+        self.assertEqual(Change.objects.filter(action=Change.DELETE).count(), 1)
+
+    def test_student_view_is_unchanged(self):
+        before = [self.attendance_page(student).content for student in self.students]
+        archive_term(self.term)
+        self.assertEqual([self.attendance_page(student).content for student in self.students], before)
+
+    def test_live_records_override_archived_ones(self):
+        archive_term(self.term)
+        session = self.sessions[2]
+        self.assertEqual(session_presence(session), {student.pk: i % 3 != 0 for i, student in enumerate(self.students, 3)})
+
+        AttendanceRecord.objects.create(session=session, student=self.students[0], present=True)
+        self.assertTrue(session_presence(session)[self.students[0].pk])
+        page = self.attendance_page(self.students[0])
+        self.assertEqual(len(page.context['sessions_info']), 12)
+        self.assertTrue(page.context['sessions_info'][2].present)
+
+        # Archiving again folds the late record into the existing row
+        self.assertEqual(archive_term(self.term), {'records': 1, 'rows': 0, 'skipped': 0})
+        self.assertTrue(ArchivedAttendance.objects.get(student=self.students[0]).marks()[3])
+
+    def test_open_terms_are_refused(self):
+        open_term = Term.objects.create(name="Term 2", order=2)
+        with self.assertRaises(CommandError):
+            call_command('archive_attendance', open_term.slug, stdout=StringIO())
+        with self.assertRaises(ValueError):
+            archive_term(open_term)
+
+    def test_dry_run(self):
+        out = StringIO()
+        call_command('archive_attendance', '--dry-run', stdout=out)
+        self.assertIn('Would archive 36 record(s) into 3 new row(s).', out.getvalue())
+        self.assertEqual(AttendanceRecord.objects.count(), 36)
+        self.assertFalse(ArchivedAttendance.objects.exists())
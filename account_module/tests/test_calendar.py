@@ -0,0 +1,112 @@
+from datetime import date
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from account_module.models import (
+    User, Term, Class, TermCalendar, AttendanceSession, create_sessions_for_class, generate_sessions,
+)
+from job_module.jobs import run_pending
+
+
+class TermCalendarTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', password='testpass123',
+        )
+        self.classes = [
+            Class.objects.create(name=f"Class {i}", gender='female', teacher=self.teacher, term=self.term)
+            for i in range(3)
+        ]
+        # Saturdays and Mondays from Saturday 2024-01-06, without Monday 2024-01-08
+        self.calendar = TermCalendar(
+            term=self.term, start_date=date(2024, 1, 6), weekdays='5,0', holidays=['2024-01-08'], session_count=4,
+        )
+
+    def dates(self, class_obj):
+        return list(class_obj.attendance_sessions.order_by('session_number').values_list('date', flat=True))
+
+    def test_session_dates(self):
+        self.assertEqual(self.calendar.session_dates(), [
+            date(2024, 1, 6), date(2024, 1, 13), date(2024, 1, 15), date(2024, 1, 20),
+        ])
+
+    def test_validation(self):
+        self.calendar.weekdays = '1,9'
+        with self.assertRaises(ValidationError):
+            self.calendar.full_clean()
+        # Days beyond Sunday would never come up
+        self.calendar.weekdays = '7'
+        with self.assertRaises(ValidationError):
+            self.calendar.save()
+        with self.assertRaises(ValidationError):
+            self.calendar.session_dates()
+        self.calendar.weekdays = '1'
+        self.calendar.holidays = ['tomorrow']
+        with self.assertRaises(ValidationError):
+            self.calendar.full_clean()
+
+    def test_generation_is_one_pass_and_idempotent(self):
+        self.calendar.save()
+        with self.assertNumQueries(5):  # classes, sessions, then one bulk insert in a savepoint
+            counts = generate_sessions(self.term)
+        self.assertEqual(counts, {'created': 12, 'updated': 0, 'unchanged': 0, 'extra': 0})
+        self.assertEqual(self.dates(self.classes[0]), self.calendar.session_dates())
+
+        self.assertEqual(generate_sessions(self.term)['unchanged'], 12)
+        self.assertEqual(AttendanceSession.objects.count(), 12)
+
+    def test_only_changed_dates_are_regenerated(self):
+        self.calendar.save()
+        generate_sessions(self.term)
+        session = self.classes[0].attendance_sessions.get(session_number=1)
+
+        # The 2024-01-13 session moves to 2024-01-15 and everything after it shifts
+        self.calendar.holidays.append('2024-01-13')
+        self.calendar.save()
+        counts = generate_sessions(self.term)
+        self.assertEqual(counts, {'created': 0, 'updated': 9, 'unchanged': 3, 'extra': 0})
+        self.assertEqual(self.classes[0].attendance_sessions.get(session_number=1).pk, session.pk)
+        self.assertEqual(self.dates(self.classes[0])[1], date(2024, 1, 15))
+
+    def test_existing_undated_sessions_are_dated(self):
+        create_sessions_for_class(self.classes[0])  # 12 undated sessions
+        self.calendar.save()
+        counts = generate_sessions(self.term, dry_run=True)
+        self.assertEqual(counts, {'created': 8, 'updated': 4, 'unchanged': 0, 'extra': 8})
+        self.assertEqual(AttendanceSession.objects.filter(date__isnull=False).count(), 0)
+
+    def test_new_class_uses_the_calendar(self):
+        self.calendar.save()
+        class_obj = Class.objects.create(name="Class X", gender='female', teacher=self.teacher, term=self.term)
+        create_sessions_for_class(class_obj)
+        self.assertEqual(self.dates(class_obj), self.calendar.session_dates())
+
+    def test_saving_the_calendar_queues_generation(self):
+        self.calendar.save()
+        self.assertEqual(AttendanceSession.objects.count(), 0)
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(AttendanceSession.objects.count(), 12)
+
+    def test_command(self):
+        self.calendar.save()
+        out = StringIO()
+        call_command('generate_sessions', self.term.slug, dry_run=True, stdout=out)
+        self.assertIn('[dry run] Term 1: 12 created', out.getvalue())
+        call_command('generate_sessions', self.term.slug, stdout=out)
+        self.assertEqual(AttendanceSession.objects.count(), 12)
+
+    def test_today_sessions_api(self):
+        self.calendar.start_date = timezone.localdate()
+        self.calendar.weekdays = ','.join(str(day) for day in range(7))
+        self.calendar.holidays = []
+        self.calendar.save()
+        generate_sessions(self.term)
+        self.client.force_login(self.teacher)
+        results = self.client.get(reverse('api_teacher_today_sessions')).json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual({row['session_number'] for row in results}, {1})
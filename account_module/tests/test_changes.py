@@ -0,0 +1,148 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from account_module import changes
+from account_module.models import User, Class, Term, AttendanceSession, AttendanceRecord, Score, Change
+
+
+@override_settings(CHANGE_FEED={'TOKEN': 'secret'})
+class ChangeLogTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', password='testpass123',
+        )
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term,
+        )
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.class_obj.students.add(self.student)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+
+    def logged(self, after=0):
+        return [(change.table, change.key, change.action) for change in Change.objects.filter(id__gt=after)]
+
+    def head(self):
+        return Change.objects.order_by('id').last().id
+
+    def test_writes_are_logged(self):
+        head = self.head()
+        score = Score.objects.create(student=self.student, term=self.term, final=10)
+        record = AttendanceRecord.objects.create(session=self.session, student=self.student)
+        record_pk = record.pk
+        record.delete()
+        self.class_obj.students.remove(self.student)
+        logged = self.logged(head)
+        self.assertIn(('score', str(score.pk), 'save'), logged)
+        self.assertIn(('academic_record', str(self.student.academic_records.get().pk), 'save'), logged)
+        self.assertEqual(logged[-2:], [
+            ('attendance_record', str(record_pk), 'delete'),
+            ('enrollment', f'{self.class_obj.pk}:{self.student.pk}', 'delete'),
+        ])
+        self.assertEqual(Change.objects.get(table='score').data['final'], 10)
+
+    def test_user_snapshot_leaves_out_credentials(self):
+        data = Change.objects.filter(table='user', key=str(self.student.pk)).last().data
+        self.assertEqual(data['national_id'], '0987654321')
+        self.assertNotIn('password', data)
+
+        # Sign-ins only update last_login
+        head = self.head()
+        self.student.save(update_fields=['last_login'])
+        self.assertEqual(self.logged(head), [])
+
+    def test_bulk_attendance_is_logged(self):
+        head = self.head()
+        self.client.force_login(self.teacher)
+        url = reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.pk])
+        self.client.post(url, {f'student_{self.student.pk}': 'on'})
+        record = AttendanceRecord.objects.get()
+        self.assertEqual(self.logged(head), [('attendance_record', str(record.pk), 'save')])
+        self.assertTrue(Change.objects.last().data['present'])
+
+    def test_compact_keeps_the_latest_change_of_each_row(self):
+        score = Score.objects.create(student=self.student, term=self.term, final=10)
+        score.final = 20
+        score.save()
+        self.assertGreater(changes.compact(), 0)
+        entries = Change.objects.filter(table='score')
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].data['final'], 20)
+        self.assertEqual(changes.compact(), 0)
+
+    def test_feed_pages_through_the_log(self):
+        first, more = changes.feed(limit=2)
+        self.assertTrue(more)
+        self.assertEqual(len(first), 2)
+        rest, more = changes.feed(after=first[-1]['id'], limit=1000)
+        self.assertFalse(more)
+        self.assertEqual(len(first) + len(rest), Change.objects.count())
+
+    def test_prune_moves_the_horizon(self):
+        head = self.head()
+        Change.objects.update(created_at=timezone.now() - timedelta(days=40))
+        Score.objects.create(student=self.student, term=self.term, final=10)
+        self.assertEqual(changes.prune(timedelta(days=30)), head)
+        with self.assertRaises(changes.CursorExpired):
+            changes.feed(after=head - 1)
+        rows, _ = changes.feed(after=head)
+        self.assertTrue(rows)
+        self.assertEqual(changes.feed()[0], rows)
+
+    def test_prune_command(self):
+        Change.objects.update(created_at=timezone.now() - timedelta(days=40))
+        out = StringIO()
+        call_command('prune_changes', days=30, stdout=out)
+        self.assertIn('expired change(s)', out.getvalue())
+        self.assertFalse(Change.objects.exists())
+
+    def test_feed_endpoint(self):
+        url = reverse('api_changes')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.teacher)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        auth = {'Authorization': 'Bearer secret'}
+        data = self.client.get(url, {'limit': 2}, headers=auth).json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertTrue(data['more'])
+        cursor = data['next']
+        while data['more']:
+            data = self.client.get(url, {'after': data['next'], 'limit': 2}, headers=auth).json()
+        self.assertEqual(data['next'], self.head())
+
+        # Nothing new: the cursor stays put
+        data = self.client.get(url, {'after': data['next']}, headers=auth).json()
+        self.assertEqual((data['results'], data['next'], data['more']), ([], self.head(), False))
+
+        Score.objects.create(student=self.student, term=self.term, final=10)
+        data = self.client.get(url, {'after': data['next']}, headers=auth).json()
+        self.assertEqual(data['results'][0]['table'], 'score')
+
+        changes.prune(timedelta(0))
+        response = self.client.get(url, {'after': cursor}, headers=auth)
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.client.get(url, {'after': 'x'}, headers=auth).status_code, 400)
+
+    def test_fresh_changes_are_served(self):
+        head = self.head()
+        Score.objects.create(student=self.student, term=self.term, final=10)
+        self.assertEqual(changes.feed(after=head)[0][0]['table'], 'score')
+
+    def test_writers_lock_the_log_first(self):
+        # A stand-in for the PostgreSQL table lock, which SQLite's write lock makes unneeded
+        with mock.patch.dict(changes.LOCK_LOG, {connection.vendor: 'SELECT 1'}), \
+                CaptureQueriesContext(connection) as queries:
+            Score.objects.create(student=self.student, term=self.term, final=10)
+        statements = [query['sql'] for query in queries]
+        inserts = [n for n, sql in enumerate(statements) if sql.startswith(f'INSERT INTO "{Change._meta.db_table}"')]
+        self.assertTrue(inserts)
+        for n in inserts:
+            self.assertEqual(statements[n - 1], 'SELECT 1')
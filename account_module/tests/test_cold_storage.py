@@ -0,0 +1,93 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from account_module.models import (
+    User, Term, Class, Enrollment, AttendanceSession, AttendanceRecord, AcademicRecord, Score, Change,
+)
+from account_module.routers import ARCHIVE_DB
+
+
+class ColdStorageTest(TestCase):
+    databases = {'default', ARCHIVE_DB}
+
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1, closed=True)
+        self.next_term = Term.objects.create(name="Term 2", order=2)
+        self.teacher = User.objects.create_user(username='teacher1', national_id='1234567890', user_type='teacher')
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.next_class = Class.objects.create(
+            name="Class A2", gender='female', teacher=self.teacher, term=self.next_term, parent=self.class_obj,
+        )
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.next_term,
+        )
+        self.class_obj.students.add(self.student)
+        Enrollment.objects.leave(self.class_obj, [self.student])
+        self.next_class.students.add(self.student)
+        self.sessions = [
+            AttendanceSession.objects.create(session_number=number, class_obj=self.class_obj) for number in (1, 2)
+        ]
+        for session in self.sessions:
+            AttendanceRecord.objects.create(session=session, student=self.student, present=session.session_number == 1)
+        Score.objects.create(student=self.student, term=self.term, quiz_1=20, quiz_2=20, final=40)
+        Score.objects.create(student=self.student, term=self.next_term, quiz_1=10)
+        self.client.force_login(self.student)
+
+    def pages(self):
+        return [
+            self.client.get(reverse(name, args=args)).content
+            for name, args in (
+                ('score_courses', [self.student.slug]),
+                ('score_detail', [self.student.slug, self.class_obj.slug]),
+                ('attendance_info', [self.student.slug, self.class_obj.slug]),
+            )
+        ]
+
+    def test_closed_term_moves_to_the_archive(self):
+        out = StringIO()
+        call_command('archive_terms', '--chunk-size', '1', stdout=out)
+        self.assertIn('Moved 1 score, 1 academicrecord, 2 attendancerecord', out.getvalue())
+
+        for model in (Score, AcademicRecord, Enrollment):
+            self.assertFalse(model.objects.filter(term=self.term).exists())
+            self.assertTrue(model.objects.using(ARCHIVE_DB).filter(term=self.term).exists())
+        self.assertFalse(AttendanceRecord.objects.filter(session__class_obj__term=self.term).exists())
+        self.assertEqual(AttendanceRecord.objects.using(ARCHIVE_DB).count(), 2)
+        # The current term stays in the hot database
+        self.assertEqual(Score.objects.get().term, self.next_term)
+        self.assertTrue(Enrollment.objects.filter(class_obj=self.next_class).exists())
+        self.assertTrue(Term.objects.get(pk=self.term.pk).archived)
+
+    def test_moving_is_not_a_change(self):
+        version = User.objects.get(pk=self.student.pk).data_version
+        changes = Change.objects.count()
+        call_command('archive_terms', stdout=StringIO())
+        self.assertEqual(User.objects.get(pk=self.student.pk).data_version, version)
+        self.assertEqual(Change.objects.count(), changes)
+
+    def test_transcript_reads_from_the_archive(self):
+        before = self.pages()
+        call_command('archive_terms', stdout=StringIO())
+        self.assertEqual(self.pages(), before)
+
+    def test_rerun_moves_late_rows(self):
+        call_command('archive_terms', stdout=StringIO())
+        score = Score.objects.using(ARCHIVE_DB).get()
+        late = AttendanceRecord.objects.create(session=self.sessions[0], student=self.student, present=False)
+        call_command('archive_terms', stdout=StringIO())
+        self.assertEqual(AttendanceRecord.objects.using(ARCHIVE_DB).filter(pk=late.pk).count(), 1)
+        # It replaces the archived record of the same session
+        self.assertEqual(
+            AttendanceRecord.objects.using(ARCHIVE_DB).filter(session=self.sessions[0], student=self.student).count(), 1,
+        )
+        # Copied as they were, timestamps included
+        self.assertEqual(Score.objects.using(ARCHIVE_DB).get().updated_at, score.updated_at)
+
+    def test_dry_run(self):
+        out = StringIO()
+        call_command('archive_terms', self.term.slug, '--dry-run', stdout=out)
+        self.assertIn('Would move 1 score', out.getvalue())
+        self.assertFalse(Score.objects.using(ARCHIVE_DB).exists())
+        self.assertEqual(Score.objects.count(), 2)
@@ -0,0 +1,38 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from account_module.models import User, Term, Class, AttendanceSession, AttendanceRecord, Score, AcademicRecord
+from account_module.search import search_students
+
+
+class GenerateDatasetCommandTest(TestCase):
+    def generate(self, **options):
+        call_command('generate_dataset', stdout=StringIO(), **options)
+
+    def test_generates_requested_volumes(self):
+        self.generate(terms=2, classes_per_gender=2, students=40, teachers=3, sessions=12)
+        self.assertEqual(Term.objects.count(), 2)
+        self.assertEqual(Class.objects.count(), 8)
+        self.assertEqual(User.objects.filter(user_type='teacher').count(), 3)
+        self.assertEqual(User.objects.filter(user_type='student').count(), 40)
+        self.assertEqual(AttendanceSession.objects.count(), 8 * 12)
+        self.assertEqual(Score.objects.count(), 40)
+        self.assertEqual(AcademicRecord.objects.count(), 40)
+
+        # Every student sits in exactly one class of their term and gender, with a mark per session
+        for student in User.objects.filter(user_type='student'):
+            class_obj = student.enrolled_classes.get()
+            self.assertEqual(class_obj.term_id, student.current_term_id)
+            self.assertEqual(class_obj.gender, student.gender)
+        self.assertEqual(AttendanceRecord.objects.count(), 40 * 12)
+
+    def test_runs_twice_without_collisions(self):
+        self.generate(terms=1, classes_per_gender=1, students=5, teachers=1)
+        self.generate(terms=1, classes_per_gender=1, students=5, teachers=1)
+        self.assertEqual(User.objects.count(), 12)
+        self.assertEqual(Term.objects.count(), 2)
+
+    def test_generated_students_are_searchable(self):
+        self.generate(terms=1, classes_per_gender=1, students=5, teachers=1)
+        student = User.objects.filter(user_type='student').first()
+        self.assertIn(student.id, [row['id'] for row in search_students(student.national_id)])
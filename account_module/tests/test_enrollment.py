@@ -0,0 +1,77 @@
+from django.test import TestCase
+from django.urls import reverse
+from account_module.models import User, Term, Class, Enrollment, Change
+
+
+class EnrollmentTest(TestCase):
+    def setUp(self):
+        self.term1 = Term.objects.create(name="Term 1", order=1)
+        self.term2 = Term.objects.create(name="Term 2", order=2)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', password='testpass123',
+        )
+        self.class1 = Class.objects.create(name="Class 1", gender='female', teacher=self.teacher, term=self.term1)
+        self.class2 = Class.objects.create(name="Class 2", gender='female', teacher=self.teacher, term=self.term2)
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}', national_id=f'098765432{i}', user_type='student', password='testpass123',
+                current_term=self.term1,
+            )
+            for i in range(3)
+        ]
+
+    def test_adding_through_the_relation_fills_the_term(self):
+        self.class1.students.add(*self.students)
+        enrollment = Enrollment.objects.get(class_obj=self.class1, student=self.students[0])
+        self.assertEqual((enrollment.term, enrollment.status), (self.term1, Enrollment.ACTIVE))
+        self.assertIsNotNone(enrollment.enrolled_at)
+
+    def test_bulk_enroll_and_leave(self):
+        with self.assertNumQueries(6):  # lookup, insert in a savepoint, page versions, change log
+            enrolled = Enrollment.objects.enroll(self.class1, self.students)
+        self.assertEqual(len(enrolled), 3)
+
+        ended = Enrollment.objects.leave(self.class1, self.students[:2], status=Enrollment.DROPPED)
+        self.assertEqual(len(ended), 2)
+        self.assertEqual(Enrollment.objects.active().filter(class_obj=self.class1).count(), 1)
+        dropped = Enrollment.objects.get(class_obj=self.class1, student=self.students[0])
+        self.assertEqual(dropped.status, Enrollment.DROPPED)
+        self.assertIsNotNone(dropped.left_at)
+
+        # Enrolling again reactivates the same row
+        self.assertEqual(len(Enrollment.objects.enroll(self.class1, self.students)), 2)
+        self.assertEqual(Enrollment.objects.filter(class_obj=self.class1).count(), 3)
+        self.assertIsNone(Enrollment.objects.get(pk=dropped.pk).left_at)
+
+    def test_bulk_changes_are_logged(self):
+        Enrollment.objects.enroll(self.class1, self.students[:1])
+        Enrollment.objects.leave(self.class1, self.students[:1])
+        statuses = [
+            change.data['status']
+            for change in Change.objects.filter(table='enrollment', key=f'{self.class1.pk}:{self.students[0].pk}')
+        ]
+        self.assertEqual(statuses, [Enrollment.ACTIVE, Enrollment.COMPLETED])
+
+    def test_history_across_terms(self):
+        student = self.students[0]
+        Enrollment.objects.enroll(self.class1, [student])
+        Enrollment.objects.leave(self.class1, [student])
+        Enrollment.objects.enroll(self.class2, [student])
+        self.assertEqual(
+            list(student.enrollments.order_by('term__order').values_list('term__name', 'status')),
+            [('Term 1', Enrollment.COMPLETED), ('Term 2', Enrollment.ACTIVE)],
+        )
+
+    def test_finished_classes_stay_readable_but_leave_the_active_list(self):
+        student = self.students[0]
+        Enrollment.objects.enroll(self.class1, [student])
+        Enrollment.objects.leave(self.class1, [student])
+        self.client.force_login(student)
+        response = self.client.get(reverse('attendance_course', args=[student.slug]))
+        self.assertNotContains(response, self.class1.name)
+        response = self.client.get(reverse('attendance_info', args=[student.slug, self.class1.slug]))
+        self.assertEqual(response.status_code, 200)
+
+        Enrollment.objects.filter(student=student).update(status=Enrollment.DROPPED)
+        response = self.client.get(reverse('attendance_info', args=[student.slug, self.class1.slug]))
+        self.assertEqual(response.status_code, 404)
@@ -1,6 +1,7 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-from account_module.models import Term, Class, AcademicRecord, Score, AttendanceSession, AttendanceRecord
+from account_module.models import Term, Class, Enrollment, AcademicRecord, Score, AttendanceSession, AttendanceRecord
+from job_module.jobs import run_pending
 import uuid
 
 User = get_user_model()
@@ -347,7 +348,8 @@ class StudentPromotionTest(TestCase):
             name="Class A - Term 2 - Female",
             gender='female',
             teacher=self.teacher,
-            term=self.term2
+            term=self.term2,
+            parent=self.class1
         )
 
         # Create sessions for class2
@@ -366,13 +368,17 @@ class StudentPromotionTest(TestCase):
             final=30  # Total = 90
         )
 
+        # The promotion is queued by the grade and carried out by the job worker
+        self.assertEqual(self.student.current_term, self.term1)
+        self.assertEqual(run_pending(), (2, 0))  # with the grade notice
+
         # Check promotion happened
         self.student.refresh_from_db()
         self.assertEqual(self.student.current_term, self.term2)
 
-        # Check student was moved to the next class
-        self.assertIn(self.student, self.class2.students.all())
-        self.assertNotIn(self.student, self.class1.students.all())
+        # Check student was moved to the next class, keeping the finished one as history
+        self.assertEqual(self.class2.enrollments.get(student=self.student).status, Enrollment.ACTIVE)
+        self.assertEqual(self.class1.enrollments.get(student=self.student).status, Enrollment.COMPLETED)
 
         # Check sessions exist for the new class
         self.assertEqual(self.class2.attendance_sessions.count(), 12)
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from account_module.models import User, Term, Class, Enrollment, Change
+from account_module.placement import place_students, unplaced_students
+
+
+class PlacementTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(username='teacher1', national_id='1234567890', user_type='teacher')
+        self.female_a = Class.objects.create(
+            name="Class A", gender='female', teacher=self.teacher, term=self.term, capacity=4,
+        )
+        self.female_b = Class.objects.create(
+            name="Class B", gender='female', teacher=self.teacher, term=self.term, capacity=4,
+        )
+        self.male = Class.objects.create(name="Class C", gender='male', teacher=self.teacher, term=self.term, capacity=2)
+        self.count = 0
+
+    def students(self, count, gender):
+        students = []
+        for _ in range(count):
+            self.count += 1
+            students.append(User.objects.create_user(
+                username=f'student{self.count}', national_id=f'{self.count:010d}', user_type='student',
+                gender=gender, current_term=self.term,
+            ))
+        return students
+
+    def sizes(self):
+        return {
+            class_obj.name: class_obj.enrollments.filter(status=Enrollment.ACTIVE).count()
+            for class_obj in Class.objects.filter(term=self.term)
+        }
+
+    def test_balances_by_gender_within_capacity(self):
+        self.female_a.students.add(*self.students(2, 'female'))
+        self.students(4, 'female')
+        self.students(1, 'male')
+        placement = place_students(self.term)
+        self.assertEqual(placement.placed, 5)
+        self.assertEqual(self.sizes(), {'Class A': 3, 'Class B': 3, 'Class C': 1})
+        self.assertFalse(unplaced_students(self.term).exists())
+        self.assertEqual(Change.objects.filter(table='enrollment').count(), 7)
+
+    def test_full_classes_open_an_overflow_class(self):
+        self.students(3, 'male')
+        placement = place_students(self.term)
+        overflow = Class.objects.get(term=self.term, gender='male', name="Term 1 - Male 2")
+        self.assertEqual(placement.overflow_classes, [overflow])
+        self.assertEqual(self.sizes()['Term 1 - Male 2'], 1)
+        self.assertEqual(overflow.attendance_sessions.count(), 12)
+        self.assertEqual(overflow.teacher, self.teacher)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        # Classes, their sizes, enrollments, page versions and change log, in a savepoint
+        students = self.students(2, 'female')
+        with self.assertNumQueries(7):
+            place_students(self.term, students)
+        Class.objects.filter(gender='female').update(capacity=50)
+        students = self.students(40, 'female')
+        with self.assertNumQueries(7):
+            place_students(self.term, students)
+        self.assertEqual(self.sizes(), {'Class A': 21, 'Class B': 21, 'Class C': 0})
+
+    def test_dry_run_and_students_without_gender(self):
+        self.students(5, 'female')
+        self.students(1, None)
+        placement = place_students(self.term, dry_run=True)
+        self.assertEqual((placement.placed, len(placement.skipped)), (5, 1))
+        self.assertEqual(len(placement.overflow_classes), 0)
+        self.assertFalse(Enrollment.objects.exists())
+
+    def test_returning_student_reactivates_the_enrollment(self):
+        student = self.students(1, 'male')[0]
+        Enrollment.objects.enroll(self.male, [student])
+        Enrollment.objects.leave(self.male, [student], status=Enrollment.DROPPED)
+        place_students(self.term)
+        self.assertEqual(Enrollment.objects.get(student=student).status, Enrollment.ACTIVE)
+
+    def test_command(self):
+        self.students(5, 'male')
+        out = StringIO()
+        call_command('place_students', self.term.slug, dry_run=True, stdout=out)
+        self.assertIn('[dry run] 5 student(s) placed in Term 1, 1 overflow class(es).', out.getvalue())
+        self.assertIn('Term 1 - Male 2: 0 + 3 = 3/30 (new overflow class)', out.getvalue())
+        call_command('place_students', self.term.slug, stdout=out)
+        self.assertEqual(Class.objects.filter(term=self.term, gender='male').count(), 2)
@@ -0,0 +1,120 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from account_module.models import (
+    User, Term, Class, Enrollment, TermCalendar, Score, rollover_classes, rollover_term,
+)
+from job_module.jobs import run_pending
+
+
+class TermRolloverTest(TestCase):
+    def setUp(self):
+        self.term1 = Term.objects.create(name="Term 1", order=1)
+        self.term2 = Term.objects.create(name="Term 2", order=2)
+        self.default_teacher = User.objects.create_user(
+            username='teacher0', national_id='1111111111', user_type='teacher',
+        )
+        self.teacher = User.objects.create_user(username='teacher1', national_id='1234567890', user_type='teacher')
+        self.classes = [
+            Class.objects.create(name=f"Class {i}", gender=gender, teacher=self.teacher, term=self.term1)
+            for i, gender in enumerate(('male', 'female', 'female'))
+        ]
+
+    def active_classes(self, student):
+        return list(Class.objects.filter(enrollments__student=student, enrollments__status=Enrollment.ACTIVE))
+
+    def test_rollover_creates_linked_successors_with_sessions(self):
+        with self.assertNumQueries(11):  # independent of the number of classes
+            target, created = rollover_term(self.term1)
+        self.assertEqual(target, self.term2)
+        self.assertEqual(len(created), 3)
+        successor = Class.objects.get(parent=self.classes[1])
+        self.assertEqual(successor.name, "Class 1 - Term 2 - Female")
+        self.assertEqual((successor.term, successor.gender), (self.term2, 'female'))
+        # Spread over the teachers, none of whom teaches in Term 2 yet
+        self.assertEqual(
+            sorted(Class.objects.filter(term=self.term2).values_list('teacher__username', flat=True)),
+            ['1111111111', '1111111111', '1234567890'],
+        )
+        self.assertEqual(successor.slug, 'class-1-term-2-female')
+        self.assertEqual(successor.attendance_sessions.count(), 12)
+
+        # Running it again creates nothing
+        self.assertEqual(rollover_term(self.term1)[1], [])
+        self.assertEqual(Class.objects.filter(term=self.term2).count(), 3)
+
+    def test_carry_teachers_and_calendar(self):
+        TermCalendar.objects.create(term=self.term2, start_date=date(2024, 1, 6), weekdays='5', session_count=3)
+        rollover_term(self.term1, carry_teachers=True)
+        successor = Class.objects.get(parent=self.classes[0])
+        self.assertEqual(successor.teacher, self.teacher)
+        self.assertEqual(list(successor.attendance_sessions.values_list('date', flat=True)),
+                         [date(2024, 1, 6), date(2024, 1, 13), date(2024, 1, 20)])
+
+    def test_taken_slugs_get_a_suffix(self):
+        Class.objects.create(name="Class 0 - Term 2 - Male", gender='male', teacher=self.teacher, term=self.term1)
+        rollover_classes(self.classes[:1], self.term2)
+        successor = Class.objects.get(parent=self.classes[0])
+        self.assertTrue(successor.slug.startswith('class-0-term-2-male-'))
+
+    def test_dry_run(self):
+        _, classes = rollover_term(self.term1, dry_run=True)
+        self.assertEqual([class_obj.parent for class_obj in classes], self.classes)
+        self.assertFalse(Class.objects.filter(term=self.term2).exists())
+
+    def test_promotion_is_a_membership_move(self):
+        rollover_term(self.term1)
+        student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term1,
+        )
+        self.classes[1].students.add(student)
+        Score.objects.create(student=student, term=self.term1, quiz_1=20, quiz_2=20, final=40)
+        classes_before = Class.objects.count()
+        self.assertEqual(run_pending(), (2, 0))  # with the grade notice
+        self.assertEqual(Class.objects.count(), classes_before)
+        self.assertEqual(self.active_classes(student), [Class.objects.get(parent=self.classes[1])])
+
+    def test_promotion_without_rollover_creates_the_successor(self):
+        student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term1,
+        )
+        self.classes[0].students.add(student)
+        # A class with the successor's name but no link is not mistaken for it
+        Class.objects.create(name="Class 0 - Term 2 - Male", gender='male', teacher=self.teacher, term=self.term2)
+        Score.objects.create(student=student, term=self.term1, quiz_1=20, quiz_2=20, final=40)
+        run_pending()
+        successor = Class.objects.get(parent=self.classes[0])
+        self.assertEqual(self.active_classes(student), [successor])
+        self.assertEqual(successor.attendance_sessions.count(), 12)
+
+    def test_promotion_after_a_rollover_into_another_term(self):
+        term3 = Term.objects.create(name="Term 3", order=3)
+        rollover_term(self.term1, target_term=term3)
+        student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term1,
+        )
+        self.classes[0].students.add(student)
+        Score.objects.create(student=student, term=self.term1, quiz_1=20, quiz_2=20, final=40)
+        self.assertEqual(run_pending(), (2, 0))
+        successor = Class.objects.get(parent=self.classes[0], term=self.term2)
+        self.assertEqual(self.active_classes(student), [successor])
+        self.assertTrue(Class.objects.filter(parent=self.classes[0], term=term3).exists())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('rollover_term', self.term1.slug, dry_run=True, stdout=out)
+        self.assertIn('[dry run] 3 class(es) would be created in Term 2.', out.getvalue())
+        call_command('rollover_term', self.term1.slug, carry_teachers=True, stdout=out)
+        self.assertEqual(Class.objects.filter(term=self.term2, teacher=self.teacher).count(), 3)
+
+    def test_admin_action_queues_the_rollover(self):
+        admin = User.objects.create_superuser(username='admin', national_id='2222222222', password='x')
+        self.client.force_login(admin)
+        self.client.post(reverse('admin:account_module_term_changelist'), {
+            'action': 'rollover', '_selected_action': [self.term1.pk],
+        })
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(Class.objects.filter(term=self.term2).count(), 3)
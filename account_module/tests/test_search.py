@@ -0,0 +1,90 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from account_module.models import User
+from account_module.search import search_students, FTS_TABLE
+
+
+class StudentSearchTest(TestCase):
+    def setUp(self):
+        self.student = User.objects.create(
+            national_id='0987654321',
+            first_name='Sara',
+            last_name='Ahmadi',
+            parent_number='09121234567',
+            user_type='student',
+        )
+        self.other = User.objects.create(
+            national_id='1122334455',
+            first_name='Reza',
+            last_name='Karimi',
+            user_type='student',
+        )
+        self.teacher = User.objects.create(
+            national_id='5555555555',
+            first_name='Sara',
+            last_name='Teacher',
+            user_type='teacher',
+        )
+
+    def ids(self, query):
+        return [row['id'] for row in search_students(query)]
+
+    def test_search_by_name_prefix(self):
+        self.assertEqual(self.ids('ahm'), [self.student.id])
+        self.assertEqual(self.ids('sara ahm'), [self.student.id])
+
+    def test_search_by_national_id_and_parent_number(self):
+        self.assertEqual(self.ids('0987'), [self.student.id])
+        self.assertEqual(self.ids('0912'), [self.student.id])
+
+    def test_teachers_are_not_indexed(self):
+        self.assertEqual(self.ids('teacher'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.student.last_name = 'Hosseini'
+        self.student.save()
+        self.assertEqual(self.ids('ahm'), [])
+        self.assertEqual(self.ids('hoss'), [self.student.id])
+
+        self.student.delete()
+        self.assertEqual(self.ids('hoss'), [])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(self.ids('karimi'), [])
+        call_command('rebuild_student_search', stdout=StringIO())
+        self.assertEqual(self.ids('karimi'), [self.other.id])
+
+    def test_quotes_are_ignored(self):
+        self.assertEqual(self.ids('"reza'), [self.other.id])
+        self.assertEqual(self.ids('"'), [])
+
+
+class StudentSearchViewTest(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create(national_id='1111111111', user_type='teacher', is_staff=True)
+        User.objects.create(national_id='0987654321', first_name='Sara', last_name='Ahmadi', user_type='student')
+
+    def test_requires_staff(self):
+        response = self.client.get(reverse('student-search'), {'q': 'sara'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_returns_matches(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('student-search'), {'q': 'sara'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['last_name'] for row in response.json()['results']], ['Ahmadi'])
+
+    def test_limit_is_clamped(self):
+        for i in range(3):
+            User.objects.create(national_id=f'099999999{i}', first_name='Sara', last_name=f'B{i}', user_type='student')
+        self.client.force_login(self.staff)
+        for limit, expected in (('-1', 1), ('0', 1), ('2', 2), ('100', 4), ('abc', 4)):
+            with self.subTest(limit=limit):
+                response = self.client.get(reverse('student-search'), {'q': 'sara', 'limit': limit})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['results']), expected)
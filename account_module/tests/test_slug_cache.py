@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test import TestCase
+from account_module import slug_cache
+from account_module.models import User, Class, Term
+
+
+class SlugCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        slug_cache.users.local.clear()
+        slug_cache.classes.local.clear()
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', slug='teacher-slug',
+        )
+        self.class_obj = Class.objects.create(
+            name="Class A", gender='male', teacher=self.teacher, term=self.term, slug='class-slug',
+        )
+
+    def test_hits_need_no_query(self):
+        with self.assertNumQueries(1):
+            slug_cache.classes.resolve('class-slug')
+        with self.assertNumQueries(0):
+            class_obj = slug_cache.classes.get_instance('class-slug')
+        self.assertEqual(class_obj, self.class_obj)
+        self.assertEqual((class_obj.teacher_id, class_obj.term.name), (self.teacher.pk, 'Term 1'))
+
+        # The shared cache answers when the local copy is gone
+        slug_cache.classes.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(slug_cache.classes.resolve('class-slug')['id'], self.class_obj.pk)
+
+    def test_unknown_slug(self):
+        self.assertIsNone(slug_cache.users.resolve('missing'))
+        self.assertIsNone(slug_cache.users.get_instance(''))
+
+    def test_save_invalidates_the_entry(self):
+        slug_cache.users.resolve('teacher-slug')
+        self.teacher.first_name = 'John'
+        self.teacher.save()
+        self.assertEqual(slug_cache.users.resolve('teacher-slug')['first_name'], 'John')
+
+    def test_slug_change_invalidates_the_previous_slug(self):
+        slug_cache.classes.resolve('class-slug')
+        self.class_obj.slug = 'renamed-slug'
+        self.class_obj.save()
+        self.assertIsNone(slug_cache.classes.resolve('class-slug'))
+        self.assertEqual(slug_cache.classes.resolve('renamed-slug')['id'], self.class_obj.pk)
+
+    def test_delete_invalidates_the_entry(self):
+        slug_cache.classes.resolve('class-slug')
+        self.class_obj.delete()
+        self.assertIsNone(slug_cache.classes.resolve('class-slug'))
+
+    def test_term_rename_invalidates_its_classes(self):
+        slug_cache.classes.resolve('class-slug')
+        self.term.name = 'Spring'
+        self.term.save()
+        self.assertEqual(slug_cache.classes.resolve('class-slug')['term__name'], 'Spring')
+
+    def test_forget_after_bulk_update(self):
+        slug_cache.users.resolve('teacher-slug')
+        User.objects.filter(pk=self.teacher.pk).update(last_name='Doe')
+        slug_cache.users.forget(['teacher-slug'])
+        self.assertEqual(slug_cache.users.resolve('teacher-slug')['last_name'], 'Doe')
+
+    def test_local_cache_is_bounded(self):
+        with self.settings(SLUG_CACHE={'LOCAL_SIZE': 1}):
+            slug_cache.users.resolve('teacher-slug')
+            slug_cache.classes.resolve('class-slug')
+            student = User.objects.create_user(username='s1', national_id='0987654321', slug='student-slug')
+            slug_cache.users.resolve(student.slug)
+        self.assertEqual(len(slug_cache.users.local.entries), 1)
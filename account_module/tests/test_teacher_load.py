@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from account_module.models import User, Term, Class
+from account_module.teacher_load import TermLoads
+
+
+class TeacherLoadTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.other_term = Term.objects.create(name="Term 2", order=2)
+        self.teachers = [
+            User.objects.create_user(username=f'teacher{i}', national_id=f'123456789{i}', user_type='teacher')
+            for i in range(3)
+        ]
+
+    def create_class(self, name, term=None, teacher=None):
+        return Class.objects.create(name=name, gender='female', term=term or self.term, teacher=teacher)
+
+    def test_classes_go_to_the_least_loaded_teacher(self):
+        self.create_class("Busy 1", teacher=self.teachers[0])
+        self.create_class("Busy 2", teacher=self.teachers[0])
+        # Classes of other terms don't count
+        self.create_class("Elsewhere", term=self.other_term, teacher=self.teachers[1])
+        teachers = [self.create_class(f"Class {i}").teacher for i in range(4)]
+        self.assertEqual(teachers, [self.teachers[1], self.teachers[2], self.teachers[1], self.teachers[2]])
+
+    def test_students_break_ties(self):
+        student = User.objects.create_user(username='student1', national_id='0987654321', user_type='student')
+        self.create_class("A", teacher=self.teachers[0])
+        self.create_class("B", teacher=self.teachers[1]).students.add(student)
+        self.create_class("C", teacher=self.teachers[2])
+        self.assertEqual(self.create_class("D").teacher, self.teachers[0])
+
+    def test_batch_reads_the_loads_once(self):
+        self.create_class("Class 0", teacher=self.teachers[0])
+        loads = TermLoads(self.term.pk)
+        with self.assertNumQueries(1):
+            picks = [loads.assign() for _ in range(5)]
+        first, second, third = (teacher.pk for teacher in self.teachers)
+        self.assertEqual(picks, [second, third, first, second, third])
+
+    def test_inactive_teachers_are_skipped(self):
+        self.create_class("Class 0")
+        for teacher in self.teachers[:2]:
+            teacher.is_active = False
+            teacher.save()
+        self.assertEqual(self.create_class("Class 1").teacher, self.teachers[2])
+        self.assertEqual(self.create_class("Class 2").teacher, self.teachers[2])
+
+    def test_classes_written_elsewhere_count(self):
+        self.create_class("Class 0")
+        # Without signals, as another process or a bulk write would
+        Class.objects.bulk_create([
+            Class(name=f"Bulk {i}", slug=f'bulk-{i}', gender='female', term=self.term, teacher=self.teachers[1])
+            for i in range(3)
+        ])
+        teachers = {self.create_class(f"Class {i}").teacher for i in range(1, 3)}
+        self.assertNotIn(self.teachers[1], teachers)
+
+    def test_rolled_back_classes_dont_count(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(self.create_class("Class 0").teacher, self.teachers[0])
+            raise RuntimeError
+        self.assertEqual(self.create_class("Class 1").teacher, self.teachers[0])
+
+    def test_report(self):
+        self.create_class("Class 0", teacher=self.teachers[0])
+        out = StringIO()
+        call_command('teacher_load', self.term.slug, stdout=out)
+        self.assertIn('Classes per teacher: min 0, max 1, mean 0.3', out.getvalue())
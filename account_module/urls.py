@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import UserRegistrationView, TeacherGatewayView, StudentGatewayView
+from .views import UserRegistrationView, TeacherGatewayView, StudentGatewayView, StudentSearchView
 
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('teacher-gateway/', TeacherGatewayView.as_view(), name='teacher-gateway'),
     path('student-gateway/', StudentGatewayView.as_view(), name='student-gateway'),
+    path('student-search/', StudentSearchView.as_view(), name='student-search'),
 ]
\ No newline at end of file
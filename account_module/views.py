@@ -1,7 +1,9 @@
 from django.contrib.auth import authenticate, login
+from django.http import JsonResponse
 from django.urls import reverse
 from django.views import View
 from account_module.forms import GatewayForm, RegisterForm
+from account_module.search import search_students
 from django.shortcuts import render, redirect
 from django.contrib import messages
 
@@ -92,3 +94,23 @@ class TeacherGatewayView(View):
                 teachers_gateway_form.add_error(None, 'نام کاربری و رمز عبور اشتباه است یا اکانت شما فعال سازی نشده')
 
         return render(request, 'teacher_gateway.html', context={'teachers_gateway_form': teachers_gateway_form})
+
+
+class StudentSearchView(View):
+    """
+    Typeahead endpoint for office staff: `?q=` is matched as a prefix against student
+    names, national ID and parent number.
+    """
+    max_limit = 25
+
+    def get(self, request):
+        if not request.user.is_authenticated or not request.user.is_staff:
+            return JsonResponse({'detail': 'You are not allowed to search students.'}, status=403)
+        query = request.GET.get('q', '').strip()
+        try:
+            limit = int(request.GET.get('limit', 10))
+        except (TypeError, ValueError):
+            limit = 10
+        # SQLite reads LIMIT -1 as no limit at all
+        limit = max(1, min(limit, self.max_limit))
+        return JsonResponse({'results': search_students(query, limit=limit)})
@@ -0,0 +1,34 @@
+from django.contrib import admin, messages
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from . import models
+
+
+@admin.register(models.Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_after', 'finished_at', 'idempotency_key')
+    list_filter = ('status', 'name')
+    search_fields = ('^idempotency_key', '^name')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('created_at', 'finished_at', 'locked_by', 'locked_at', 'result', 'last_error')
+    ordering = ('-id',)
+    actions = ('retry',)
+
+    @admin.action(description='Retry selected failed jobs')
+    def retry(self, request, queryset):
+        count = skipped = 0
+        # One at a time: a job whose key is pending again (enqueued anew, or another
+        # selected job with the same key) can't be queued next to it
+        for pk in queryset.filter(status=models.Job.FAILED).values_list('pk', flat=True):
+            try:
+                with transaction.atomic():
+                    count += models.Job.objects.filter(pk=pk, status=models.Job.FAILED).update(
+                        status=models.Job.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None,
+                    )
+            except IntegrityError:
+                skipped += 1
+        self.message_user(request, f'{count} job(s) queued again.')
+        if skipped:
+            self.message_user(
+                request, f'{skipped} job(s) skipped: a job with the same key is already pending.', messages.WARNING,
+            )
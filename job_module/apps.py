@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class JobModuleConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'job_module'
+
+    def ready(self):
+        # Register the @job functions defined in each app's jobs.py
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('jobs')
@@ -0,0 +1,175 @@
+"""
+Database-backed job queue.
+
+Functions are registered with `@job('app.name')` and scheduled with `enqueue()`, which
+only inserts a `Job` row; because the row is written in the caller's transaction, a
+job enqueued by a request that rolls back is never run. `manage.py run_jobs` claims due
+jobs in batches, runs them, and retries failures with exponential backoff.
+
+A job runs in one transaction, so a failed attempt leaves nothing behind. Jobs that call
+outside services (such as sending messages) are registered with `atomic=False` and
+commit their own progress, so no lock is held while they wait and what went out stays
+recorded when a later step fails.
+"""
+import contextlib
+import logging
+import os
+import socket
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger('job_module')
+
+_registry = {}
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    func: object
+    max_attempts: int
+    retry_delay: float
+    atomic: bool
+
+
+class UnknownJob(LookupError):
+    pass
+
+
+def job(name, max_attempts=3, retry_delay=30, atomic=True):
+    """
+    Register the decorated function as job `name`. It is called with the job's payload as
+    keyword arguments, in a transaction unless `atomic` is False; its return value is
+    stored on the job if JSON-serializable.
+    """
+    def register(func):
+        _registry[name] = JobSpec(name, func, max_attempts, retry_delay, atomic)
+        return func
+    return register
+
+
+def get_spec(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownJob(f'No job registered as {name!r}.') from None
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    """
+    Schedule job `name`. When `key` is given and a job with that key is still queued or
+    running, that job is returned instead of creating a duplicate.
+    """
+    spec = get_spec(name)
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'max_attempts': spec.max_attempts,
+        'run_after': timezone.now() + timedelta(seconds=delay),
+    }
+    if key is None:
+        return Job.objects.create(**fields)
+    existing = Job.objects.filter(idempotency_key=key, status__in=Job.PENDING).first()
+    if existing is not None:
+        return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(idempotency_key=key, **fields)
+    except IntegrityError:
+        # Lost a race with another enqueue of the same key
+        return Job.objects.get(idempotency_key=key, status__in=Job.PENDING)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, limit):
+    """
+    Mark up to `limit` due jobs as running for `worker` and return them. Each job is
+    claimed with a conditional UPDATE, so two workers never run the same job, without
+    relying on SELECT ... FOR UPDATE SKIP LOCKED (which SQLite lacks).
+    """
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        .order_by('run_after', 'pk').values_list('pk', flat=True)[:limit]
+    )
+    claimed = [
+        pk for pk in candidates
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now,
+        )
+    ]
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_after', 'pk'))
+
+
+def requeue_stale(timeout):
+    """
+    Return jobs left running by a worker that died more than `timeout` seconds ago to the queue.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.QUEUED, locked_by='', locked_at=None,
+    )
+
+
+def run(job_obj):
+    """
+    Run a claimed job and record the outcome. Returns True if it succeeded.
+    """
+    job_obj.attempts += 1
+    spec = _registry.get(job_obj.name)
+    try:
+        if spec is None:
+            raise UnknownJob(f'No job registered as {job_obj.name!r}.')
+        with transaction.atomic() if spec.atomic else contextlib.nullcontext():
+            result = spec.func(**job_obj.payload)
+    except Exception:
+        job_obj.last_error = traceback.format_exc()
+        if job_obj.attempts < job_obj.max_attempts:
+            retry_delay = spec.retry_delay if spec is not None else 0
+            job_obj.status = Job.QUEUED
+            job_obj.run_after = timezone.now() + timedelta(seconds=retry_delay * 2 ** (job_obj.attempts - 1))
+            logger.warning('Job %s failed (attempt %d of %d); retrying at %s',
+                           job_obj, job_obj.attempts, job_obj.max_attempts, job_obj.run_after)
+        else:
+            job_obj.status = Job.FAILED
+            job_obj.finished_at = timezone.now()
+            logger.error('Job %s failed permanently after %d attempts', job_obj, job_obj.attempts)
+    else:
+        job_obj.status = Job.SUCCEEDED
+        job_obj.result = result if _is_jsonable(result) else repr(result)
+        job_obj.finished_at = timezone.now()
+    job_obj.locked_by = ''
+    job_obj.locked_at = None
+    job_obj.save()
+    return job_obj.status == Job.SUCCEEDED
+
+
+def _is_jsonable(value):
+    return value is None or isinstance(value, (bool, int, float, str, list, dict))
+
+
+def run_pending(worker=None, batch_size=50, limit=None):
+    """
+    Run due jobs until none are left (or `limit` have run). Returns (succeeded, failed).
+    """
+    worker = worker or worker_id()
+    succeeded = failed = 0
+    while limit is None or succeeded + failed < limit:
+        batch_limit = batch_size if limit is None else min(batch_size, limit - succeeded - failed)
+        batch = claim(worker, batch_limit)
+        if not batch:
+            break
+        for job_obj in batch:
+            if run(job_obj):
+                succeeded += 1
+            else:
+                failed += 1
+    return succeeded, failed
@@ -0,0 +1,44 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from job_module import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs, polling the database for new ones until stopped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no due jobs are left.')
+        parser.add_argument('--batch-size', type=int, default=50, help='Jobs claimed per database round trip.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Requeue jobs left running by a dead worker after this many seconds.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        worker = jobs.worker_id()
+        total_succeeded = total_failed = 0
+
+        while not self.stopping:
+            requeued = jobs.requeue_stale(options['stale_after'])
+            if requeued:
+                self.stderr.write(f'Requeued {requeued} stale job(s).')
+            # One batch at a time so a stop request is honoured between batches
+            succeeded, failed = jobs.run_pending(worker, options['batch_size'], limit=options['batch_size'])
+            total_succeeded += succeeded
+            total_failed += failed
+            close_old_connections()
+            if succeeded + failed == 0:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.stdout.write(f'{total_succeeded} job(s) succeeded, {total_failed} failed.')
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,50 @@
+from django.db import models
+from django.db.models import Q
+
+
+class Job(models.Model):
+    """
+    A unit of background work: the name of a registered @job function and the keyword
+    arguments to call it with. Claimed and run by `manage.py run_jobs`.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    )
+    PENDING = (QUEUED, RUNNING)
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    # While a job with this key is pending, enqueueing the same key returns that job
+    idempotency_key = models.CharField(max_length=200, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The worker's claim query: queued jobs that are due, oldest first
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['idempotency_key'], condition=Q(status__in=['queued', 'running']),
+                name='job_unique_pending_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name}#{self.pk} ({self.status})'
@@ -0,0 +1,179 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from account_module.models import User, Term, Class, Score
+from job_module import jobs
+from job_module.models import Job
+
+calls = []
+
+
+@jobs.job('job_module.tests.record')
+def record_call(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@jobs.job('job_module.tests.flaky', max_attempts=2, retry_delay=60)
+def flaky():
+    raise RuntimeError('boom')
+
+
+@jobs.job('job_module.tests.partial', max_attempts=1)
+def partial():
+    Term.objects.create(name="Written", order=1)
+    raise RuntimeError('boom')
+
+
+jobs.job('job_module.tests.partial_unwrapped', max_attempts=1, atomic=False)(partial)
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        job = jobs.enqueue('job_module.tests.record', {'value': 3})
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(calls, [])
+
+        self.assertEqual(jobs.run_pending(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(calls, [3])
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {'value': 3})
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_idempotency_key_deduplicates_pending_jobs(self):
+        first = jobs.enqueue('job_module.tests.record', {'value': 1}, key='same')
+        second = jobs.enqueue('job_module.tests.record', {'value': 2}, key='same')
+        self.assertEqual(first.pk, second.pk)
+        jobs.run_pending()
+        self.assertEqual(calls, [1])
+
+        # Once the job has finished the key can be used again
+        third = jobs.enqueue('job_module.tests.record', {'value': 3}, key='same')
+        self.assertNotEqual(third.pk, first.pk)
+
+    def test_failed_jobs_leave_nothing_unless_not_atomic(self):
+        jobs.enqueue('job_module.tests.partial')
+        self.assertEqual(jobs.run_pending(), (0, 1))
+        self.assertFalse(Term.objects.exists())
+        jobs.enqueue('job_module.tests.partial_unwrapped')
+        self.assertEqual(jobs.run_pending(), (0, 1))
+        self.assertTrue(Term.objects.exists())
+
+    def test_jobs_are_not_run_before_they_are_due(self):
+        jobs.enqueue('job_module.tests.record', {'value': 1}, delay=60)
+        self.assertEqual(jobs.run_pending(), (0, 0))
+
+    def test_claimed_jobs_are_not_claimed_again(self):
+        jobs.enqueue('job_module.tests.record', {'value': 1})
+        self.assertEqual(len(jobs.claim('worker-a', 10)), 1)
+        self.assertEqual(jobs.claim('worker-b', 10), [])
+
+    def test_failures_are_retried_with_backoff_then_marked_failed(self):
+        job = jobs.enqueue('job_module.tests.flaky')
+        self.assertEqual(jobs.run_pending(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=50))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_unknown_job(self):
+        with self.assertRaises(jobs.UnknownJob):
+            jobs.enqueue('job_module.tests.missing')
+
+    def test_stale_jobs_are_requeued(self):
+        job = jobs.enqueue('job_module.tests.record', {'value': 1})
+        jobs.claim('dead-worker', 1)
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(600), 1)
+        self.assertEqual(jobs.run_pending(), (1, 0))
+
+    def test_worker_command(self):
+        for value in range(5):
+            jobs.enqueue('job_module.tests.record', {'value': value})
+        out = StringIO()
+        call_command('run_jobs', once=True, batch_size=2, stdout=out, stderr=StringIO())
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+        self.assertIn('5 job(s) succeeded, 0 failed.', out.getvalue())
+
+    def test_admin_retry_action(self):
+        job = jobs.enqueue('job_module.tests.flaky')
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, attempts=2)
+        admin = User.objects.create_superuser(username='admin', national_id='1111111111', password='x')
+        self.client.force_login(admin)
+        response = self.client.post(
+            reverse('admin:job_module_job_changelist'), {'action': 'retry', '_selected_action': [job.pk]},
+        )
+        self.assertEqual(response.status_code, 302)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 0))
+
+    def test_admin_retry_skips_keys_already_pending(self):
+        failed = []
+        for _ in range(2):
+            job = jobs.enqueue('job_module.tests.flaky', key='same')
+            Job.objects.filter(pk=job.pk).update(status=Job.FAILED)
+            failed.append(job)
+        admin = User.objects.create_superuser(username='admin', national_id='1111111111', password='x')
+        self.client.force_login(admin)
+        response = self.client.post(
+            reverse('admin:job_module_job_changelist'),
+            {'action': 'retry', '_selected_action': [job.pk for job in failed]}, follow=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Job.objects.filter(idempotency_key='same', status=Job.QUEUED).count(), 1)
+        self.assertEqual(Job.objects.filter(idempotency_key='same', status=Job.FAILED).count(), 1)
+        self.assertContains(response, '1 job(s) skipped')
+
+
+class PromotionJobTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.next_term = Term.objects.create(name="Term 2", order=2)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', password='testpass123',
+        )
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term,
+        )
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.class_obj.students.add(self.student)
+
+    def test_grade_submission_queues_promotion(self):
+        self.client.force_login(self.teacher)
+        url = reverse('score_taking', args=[self.teacher.slug, self.class_obj.slug, self.student.slug])
+        response = self.client.post(url, {'quiz_1': 20, 'quiz_2': 20, 'final': 40})
+        self.assertEqual(response.status_code, 302)
+
+        # The request only queued the promotion
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.current_term, self.term)
+        job = Job.objects.get(name='account_module.promote_student')
+        self.assertEqual(job.idempotency_key, f'promote-student:{self.student.pk}:{self.term.pk}')
+
+        # Saving the passing grade again does not queue a second promotion
+        score = Score.objects.get(student=self.student)
+        score.final = 45
+        score.save()
+        self.assertEqual(Job.objects.filter(name='account_module.promote_student').count(), 1)
+
+        # The promotion and the two grade notices
+        self.assertEqual(jobs.run_pending(), (3, 0))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.current_term, self.next_term)
+        self.assertEqual(Class.objects.get(term=self.next_term).attendance_sessions.count(), 12)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class MonitoringModuleConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring_module'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import profiling, signals, slow_queries  # noqa: F401
+        connection_created.connect(profiling.install, dispatch_uid='monitoring_module.profiling')
+        connection_created.connect(slow_queries.install, dispatch_uid='monitoring_module.slow_queries')
@@ -0,0 +1,252 @@
+"""
+Online database backups.
+
+`manage.py backup_db` snapshots databases while the site keeps running:
+
+* SQLite through its online backup API, BACKUPS['PAGES'] pages per step with
+  BACKUPS['SLEEP'] seconds between steps. A step holds the source's read lock only
+  while it copies its pages, so attendance submissions commit in between instead of
+  waiting for the whole copy. A write from another connection makes SQLite restart the
+  copy; after each restart the step grows fourfold, so the lock is never held for more
+  than PAGES * 4 ** MAX_RESTARTS pages, and the backup fails after MAX_RESTARTS restarts.
+  The copy is checked with `PRAGMA quick_check` before it is kept.
+* PostgreSQL by streaming `pg_dump`, which reads from one MVCC snapshot and blocks no one.
+
+Snapshots are gzipped into BACKUPS['DIR'] as `<alias>-<UTC time>.<ext>.gz`, with a
+`sha256sum`-style checksum file next to each (`sha256sum -c` verifies it), written under a
+temporary name and renamed, so a snapshot on disk is always complete. Only the newest
+BACKUPS['KEEP'] snapshots of each database are kept.
+"""
+import gzip
+import hashlib
+import os
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from . import events
+
+DEFAULT_BACKUP_SETTINGS = {
+    'DIR': None,
+    'PAGES': 256,
+    'SLEEP': 0.05,
+    # Snapshots kept per database; 0 keeps them all
+    'KEEP': 7,
+    # Restarts tolerated before the backup fails
+    'MAX_RESTARTS': 3,
+}
+CHUNK_SIZE = 1024 * 1024
+
+
+class BackupError(Exception):
+    pass
+
+
+class CopyRestarted(Exception):
+    pass
+
+
+def backup_settings():
+    options = {**DEFAULT_BACKUP_SETTINGS, **getattr(settings, 'BACKUPS', {})}
+    if options['DIR'] is None:
+        options['DIR'] = settings.BASE_DIR / 'backups'
+    return options
+
+
+def backup_name(alias, extension, now=None):
+    now = now or datetime.now(timezone.utc)
+    return f'{alias}-{now:%Y%m%dT%H%M%S%fZ}.{extension}.gz'
+
+
+def snapshots(directory, alias):
+    # Oldest first; the names sort by time
+    return sorted(Path(directory).glob(f'{alias}-[0-9]*.gz'))
+
+
+def copy_sqlite(source_path, target_path, pages, sleep, max_restarts):
+    """
+    Copy a live SQLite database with the online backup API. Returns the number of restarts;
+    raises BackupError once writes have restarted the copy more than `max_restarts` times.
+    """
+    source = sqlite3.connect(f'{Path(source_path).resolve().as_uri()}?mode=ro', uri=True)
+    restarts = 0
+    try:
+        while True:
+            # Bigger steps leave writers fewer chances to restart the copy
+            step = pages * 4 ** restarts
+            remaining = [None]
+
+            def progress(status, left, total):
+                if remaining[0] is not None and left > remaining[0]:
+                    raise CopyRestarted
+                remaining[0] = left
+                if left:
+                    # Let writers in between steps
+                    time.sleep(sleep)
+
+            target = sqlite3.connect(target_path)
+            try:
+                source.backup(target, pages=step, progress=progress)
+            except CopyRestarted:
+                restarts += 1
+                if restarts > max_restarts:
+                    raise BackupError(
+                        f'Writes restarted the copy {restarts} times; retry when the database is quieter '
+                        f'or raise BACKUPS["PAGES"].'
+                    )
+                continue
+            finally:
+                target.close()
+            return restarts
+    finally:
+        source.close()
+
+
+def check_sqlite(path):
+    connection = sqlite3.connect(path)
+    try:
+        result = connection.execute('PRAGMA quick_check').fetchone()[0]
+    finally:
+        connection.close()
+    if result != 'ok':
+        raise BackupError(f'The copy failed its integrity check: {result}')
+
+
+def exists(database):
+    """
+    Whether there is anything to back up: SQLite databases may be in memory or not created yet.
+    """
+    if vendor(database) != 'sqlite':
+        return True
+    path = str(database['NAME'] or '')
+    return path != ':memory:' and 'mode=memory' not in path and Path(path).is_file()
+
+
+def sqlite_chunks(database, options):
+    if not exists(database):
+        raise BackupError(f'{database["NAME"]} is not a database file.')
+    path = database['NAME']
+    with tempfile.TemporaryDirectory(dir=options['DIR']) as directory:
+        copy = Path(directory) / 'copy.sqlite3'
+        copy_sqlite(path, copy, options['PAGES'], options['SLEEP'], options['MAX_RESTARTS'])
+        check_sqlite(copy)
+        with copy.open('rb') as file:
+            while chunk := file.read(CHUNK_SIZE):
+                yield chunk
+
+
+def postgresql_chunks(database, options):
+    command = ['pg_dump', '--no-owner', '--no-privileges', '--dbname', database['NAME']]
+    if database.get('HOST'):
+        command += ['--host', database['HOST']]
+    if database.get('PORT'):
+        command += ['--port', str(database['PORT'])]
+    if database.get('USER'):
+        command += ['--username', database['USER']]
+    environment = {**os.environ, 'PGPASSWORD': database.get('PASSWORD') or ''}
+    # A file rather than a pipe, so that a chatty pg_dump can't block on it
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, env=environment)
+        except OSError as error:
+            raise BackupError(f'Could not run pg_dump: {error}')
+        try:
+            while chunk := process.stdout.read(CHUNK_SIZE):
+                yield chunk
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            raise BackupError(f'pg_dump failed: {stderr.read().decode(errors="replace").strip()}')
+
+
+BACKENDS = {
+    'sqlite': ('sqlite3', sqlite_chunks),
+    'postgresql': ('sql', postgresql_chunks),
+}
+
+
+def vendor(database):
+    return next((name for name in BACKENDS if name in database['ENGINE']), None)
+
+
+def back_up(alias, database, options=None):
+    """
+    Snapshot a database (a DATABASES entry) and rotate its older snapshots. Returns the
+    path of the snapshot, its compressed size and its SHA-256.
+    """
+    options = options or backup_settings()
+    name = vendor(database)
+    if name is None:
+        raise BackupError(f'No backup method for {database["ENGINE"]}.')
+    extension, chunks = BACKENDS[name]
+    directory = Path(options['DIR'])
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / backup_name(alias, extension)
+    partial = target.with_name(target.name + '.partial')
+
+    digest = hashlib.sha256()
+    try:
+        with partial.open('wb') as raw:
+            with gzip.GzipFile(filename=target.name[:-3], mode='wb', fileobj=HashingWriter(raw, digest)) as file:
+                for chunk in chunks(database, options):
+                    file.write(chunk)
+            raw.flush()
+            os.fsync(raw.fileno())
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    partial.rename(target)
+    sha256 = digest.hexdigest()
+    Path(f'{target}.sha256').write_text(f'{sha256}  {target.name}\n')
+
+    size = target.stat().st_size
+    rotated = rotate(directory, alias, options['KEEP'])
+    events.record('backup.created', database=alias, path=str(target), bytes=size, sha256=sha256, rotated=rotated)
+    return {'path': target, 'bytes': size, 'sha256': sha256, 'rotated': rotated}
+
+
+def rotate(directory, alias, keep):
+    """
+    Delete all but the newest `keep` snapshots of a database. Returns how many went.
+    """
+    old = snapshots(directory, alias)[:-keep] if keep > 0 else []
+    for path in old:
+        path.unlink()
+        Path(f'{path}.sha256').unlink(missing_ok=True)
+    return len(old)
+
+
+def verify(path):
+    """
+    Whether a snapshot still matches its checksum file.
+    """
+    path = Path(path)
+    checksum = Path(f'{path}.sha256')
+    if not checksum.exists():
+        return False
+    expected = checksum.read_text().split()[0]
+    digest = hashlib.sha256()
+    with path.open('rb') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest() == expected
+
+
+class HashingWriter:
+    # File object that hashes what goes through it, so the checksum needs no second read
+    def __init__(self, file, digest):
+        self.file = file
+        self.digest = digest
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
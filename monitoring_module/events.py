@@ -0,0 +1,86 @@
+"""
+Structured event (audit) log.
+
+Domain code calls `record('score.changed', student=..., ...)`. Events describe
+committed work, so one recorded inside a transaction is logged when it commits and
+dropped if it rolls back. The event goes to the
+`monitoring_module.events` logger, whose `QueuedJsonLinesHandler` only puts the record
+on an in-memory queue; a `QueueListener` thread formats it as one compact JSON line and
+writes it to a size-rotated file. Request threads never wait on the disk.
+"""
+import atexit
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from django.db import transaction
+from .profiling import current_request_stats
+
+logger = logging.getLogger('monitoring_module.events')
+
+
+def record(event, **data):
+    """
+    Log `event` with `data`, which must be JSON-serializable, once the current
+    transaction commits (right away outside one).
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    # Read now: the transaction may commit after the request's stats are gone
+    extra = {'event': event, 'data': data, 'view': getattr(current_request_stats(), 'view', None)}
+    transaction.on_commit(lambda: logger.info(event, extra=extra))
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'event': getattr(record, 'event', None) or record.getMessage(),
+        }
+        if getattr(record, 'view', None):
+            entry['view'] = record.view
+        entry.update(getattr(record, 'data', None) or {})
+        if record.levelno != logging.INFO:
+            entry['level'] = record.levelname
+        return json.dumps(entry, separators=(',', ':'), default=str)
+
+
+class QueuedJsonLinesHandler(QueueHandler):
+    """
+    Hands records to a listener thread that writes them to `filename`, rotating it
+    after `max_bytes` and keeping `backup_count` old files. With `plain`, each message is
+    written as is, for loggers whose messages are JSON lines already.
+
+    Meant to be built from LOGGING through the `()` factory key.
+    """
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=5, plain=False):
+        super().__init__(queue.SimpleQueue())
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        self.sink = RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True,
+        )
+        self.sink.setFormatter(logging.Formatter('%(message)s') if plain else JsonLinesFormatter())
+        self.listener = QueueListener(self.queue, self.sink)
+        self.listener.start()
+        self.running = True
+        atexit.register(self.close)
+
+    def flush(self):
+        """
+        Block until every queued record has been written.
+        """
+        if self.running:
+            # stop() drains the queue before joining the thread
+            self.listener.stop()
+            self.listener.start()
+        self.sink.flush()
+
+    def close(self):
+        if self.running:
+            self.running = False
+            self.listener.stop()
+        self.sink.close()
+        super().close()
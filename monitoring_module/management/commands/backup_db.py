@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from monitoring_module.backups import BackupError, back_up, backup_settings, exists, snapshots, verify
+
+
+class Command(BaseCommand):
+    help = 'Snapshot databases without blocking writers into gzipped, checksummed files, keeping the newest few.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('databases', nargs='*', help='Aliases of the databases to back up; all by default.')
+        parser.add_argument('--dir', help='Directory of the snapshots (defaults to BACKUPS["DIR"]).')
+        parser.add_argument('--keep', type=int, help='Snapshots kept per database (defaults to BACKUPS["KEEP"]).')
+        parser.add_argument('--pages', type=int, help='SQLite pages copied per step (defaults to BACKUPS["PAGES"]).')
+        parser.add_argument('--sleep', type=float, help='Seconds between SQLite steps (defaults to BACKUPS["SLEEP"]).')
+        parser.add_argument('--verify', action='store_true', help='Check the existing snapshots against their checksums.')
+
+    def handle(self, *args, **options):
+        settings = backup_settings()
+        for key in ('dir', 'keep', 'pages', 'sleep'):
+            if options[key] is not None:
+                settings[key.upper()] = options[key]
+        if settings['PAGES'] < 1:
+            raise CommandError('--pages must be positive.')
+        aliases = options['databases'] or list(connections)
+        unknown = set(aliases) - set(connections)
+        if unknown:
+            raise CommandError(f'No database {", ".join(sorted(unknown))}.')
+
+        if options['verify']:
+            return self.verify(aliases, settings['DIR'])
+
+        failed = []
+        for alias in aliases:
+            if not options['databases'] and not exists(connections[alias].settings_dict):
+                self.stdout.write(f'{alias}: no database file, skipped.')
+                continue
+            try:
+                result = back_up(alias, connections[alias].settings_dict, settings)
+            except BackupError as error:
+                self.stderr.write(self.style.ERROR(f'{alias}: {error}'))
+                failed.append(alias)
+                continue
+            self.stdout.write(
+                f'{alias}: {result["path"]} ({result["bytes"] / 1024:.0f} KiB, sha256 {result["sha256"][:12]}), '
+                f'{result["rotated"]} old snapshot(s) removed.'
+            )
+        if failed:
+            raise CommandError(f'Backup of {", ".join(failed)} failed.')
+
+    def verify(self, aliases, directory):
+        corrupt = []
+        for alias in aliases:
+            for path in snapshots(directory, alias):
+                if verify(path):
+                    self.stdout.write(f'{path.name}: OK')
+                else:
+                    self.stdout.write(self.style.ERROR(f'{path.name}: checksum mismatch'))
+                    corrupt.append(path.name)
+        if corrupt:
+            raise CommandError(f'{len(corrupt)} snapshot(s) do not match their checksums.')
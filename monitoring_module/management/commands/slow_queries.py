@@ -0,0 +1,90 @@
+import json
+import re
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from monitoring_module.slow_queries import slow_query_settings
+
+# SQLite reports "SCAN account_module_score" for a full table scan; an index would turn it into SEARCH
+_FULL_SCAN = re.compile(r'^\s*SCAN (\w+)\b(?! USING (?:COVERING )?INDEX)', re.MULTILINE)
+_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def full_scans(plan):
+    if not plan:
+        return []
+    return sorted(set(_FULL_SCAN.findall(plan)) | set(_SEQ_SCAN.findall(plan)))
+
+
+class Command(BaseCommand):
+    help = 'Summarize the slow-query log by fingerprint, worst total time first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Log file to read (defaults to SLOW_QUERY_LOG["LOG_FILE"]).')
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON.')
+
+    def handle(self, *args, **options):
+        path = options['file'] or slow_query_settings()['LOG_FILE']
+        if not path or not Path(path).exists():
+            raise CommandError(f'No slow-query log found at {path}.')
+
+        summary = self.summarize(path)[:options['top']]
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        if not summary:
+            self.stdout.write('No slow queries recorded.')
+            return
+        for rank, item in enumerate(summary, start=1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'#{rank} {item["fingerprint"]}: {item["count"]} x, total {item["total_ms"]:.1f} ms, '
+                f'max {item["max_ms"]:.1f} ms, mean {item["mean_ms"]:.1f} ms'
+            ))
+            self.stdout.write(f'  SQL:     {item["sql"][:300]}')
+            self.stdout.write(f'  Views:   {", ".join(item["views"]) or "-"}')
+            self.stdout.write(f'  Origins: {", ".join(item["origins"]) or "-"}')
+            if item['plan']:
+                self.stdout.write('  Plan:    ' + item['plan'].replace('\n', '\n           '))
+            if item['full_scans']:
+                self.stdout.write(self.style.WARNING(
+                    f'  Full table scan on {", ".join(item["full_scans"])}: consider an index.'
+                ))
+
+    @staticmethod
+    def summarize(path):
+        groups = {}
+        with open(path, encoding='utf-8') as log_file:
+            for line in log_file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                group = groups.setdefault(entry['fingerprint'], {
+                    'fingerprint': entry['fingerprint'],
+                    'sql': entry['shape'],
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'views': set(),
+                    'origins': set(),
+                    'plan': None,
+                })
+                group['count'] += 1
+                group['total_ms'] += entry['duration_ms']
+                group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+                if entry.get('view'):
+                    group['views'].add(entry['view'])
+                if entry.get('origin'):
+                    group['origins'].add(entry['origin'][0])
+                # Keep the most recent plan, as indexes may have been added since
+                if entry.get('plan'):
+                    group['plan'] = entry['plan']
+
+        summary = []
+        for group in groups.values():
+            group['mean_ms'] = group['total_ms'] / group['count']
+            group['views'] = sorted(group['views'])
+            group['origins'] = sorted(group['origins'])
+            group['full_scans'] = full_scans(group['plan'])
+            summary.append(group)
+        return sorted(summary, key=lambda item: item['total_ms'], reverse=True)
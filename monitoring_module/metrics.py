@@ -0,0 +1,259 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Each worker process writes its samples into its own memory-mapped file in
+METRICS['DIR'] (one file per pid); increments are plain writes into the mapping,
+so recording a sample costs no system call. The /metrics/ endpoint reads every
+file in the directory and sums the samples, so the output covers all workers no
+matter which one serves the scrape. Without a directory, samples are kept in
+memory and only cover the current process.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_HEADER = struct.Struct('i')
+_LENGTH = struct.Struct('i')
+_VALUE = struct.Struct('d')
+
+
+class MmapValues:
+    """
+    Append-only key -> float store in a memory-mapped file.
+
+    Layout: a 4-byte "used bytes" header, then entries of
+    [4-byte key length][key, padded to 8 bytes][8-byte double].
+    """
+    initial_size = 1 << 16
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = open(self.path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(self.initial_size)
+        self.capacity = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), self.capacity)
+        self.used = _HEADER.unpack_from(self.map, 0)[0] or 8
+        self.positions = {key: position for key, _, position in self._entries(self.map, self.used)}
+
+    @staticmethod
+    def _entries(buffer, used):
+        offset = 8
+        while offset < used:
+            length = _LENGTH.unpack_from(buffer, offset)[0]
+            key_end = offset + _LENGTH.size + length
+            key = bytes(buffer[offset + _LENGTH.size:key_end]).decode()
+            position = key_end + (-(_LENGTH.size + length) % 8)
+            yield key, _VALUE.unpack_from(buffer, position)[0], position
+            offset = position + _VALUE.size
+
+    def _position(self, key):
+        position = self.positions.get(key)
+        if position is not None:
+            return position
+        encoded = key.encode()
+        padding = -(_LENGTH.size + len(encoded)) % 8
+        size = _LENGTH.size + len(encoded) + padding + _VALUE.size
+        while self.used + size > self.capacity:
+            self.capacity *= 2
+            self.file.truncate(self.capacity)
+            self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), self.capacity)
+        _LENGTH.pack_into(self.map, self.used, len(encoded))
+        self.map[self.used + _LENGTH.size:self.used + _LENGTH.size + len(encoded)] = encoded
+        position = self.used + _LENGTH.size + len(encoded) + padding
+        _VALUE.pack_into(self.map, position, 0.0)
+        self.used += size
+        # Publish the entry only once it is fully written, so readers never see half an entry
+        _HEADER.pack_into(self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def inc(self, key, amount):
+        position = self._position(key)
+        _VALUE.pack_into(self.map, position, _VALUE.unpack_from(self.map, position)[0] + amount)
+
+    def items(self):
+        return [(key, value) for key, value, _ in self._entries(self.map, self.used)]
+
+    @classmethod
+    def read(cls, path):
+        with open(path, 'rb') as metrics_file:
+            data = metrics_file.read()
+        if len(data) < 8:
+            return []
+        return [(key, value) for key, value, _ in cls._entries(data, _HEADER.unpack_from(data, 0)[0] or 8)]
+
+
+class MemoryValues:
+    def __init__(self):
+        self.values = {}
+
+    def inc(self, key, amount):
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def items(self):
+        return list(self.values.items())
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self._store = None
+        self._pid = None
+
+    @staticmethod
+    def directory():
+        directory = getattr(settings, 'METRICS', {}).get('DIR')
+        return Path(directory) if directory else None
+
+    def store(self):
+        # Reopen after a fork so that each worker writes its own file
+        if self._store is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            directory = self.directory()
+            if directory is None:
+                self._store = MemoryValues()
+            else:
+                directory.mkdir(parents=True, exist_ok=True)
+                self._store = MmapValues(directory / f'metrics-{self._pid}.db')
+        return self._store
+
+    def reset(self):
+        with self.lock:
+            self._store = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def inc(self, name, suffix, labels, amount):
+        key = json.dumps([name, suffix, sorted(labels.items())])
+        with self.lock:
+            self.store().inc(key, amount)
+
+    def collect(self):
+        """
+        Sum the samples of every process, keyed by (metric name, suffix, labels).
+        """
+        directory = self.directory()
+        if directory is None:
+            with self.lock:
+                items = self.store().items()
+        else:
+            items = []
+            for path in sorted(directory.glob('metrics-*.db')):
+                items.extend(MmapValues.read(path))
+        totals = {}
+        for key, value in items:
+            name, suffix, labels = json.loads(key)
+            sample = (name, suffix, tuple(tuple(label) for label in labels))
+            totals[sample] = totals.get(sample, 0.0) + value
+        return totals
+
+    def exposition(self):
+        totals = self.collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            samples = sorted(
+                (sample for sample in totals.items() if sample[0][0] == metric.name),
+                key=metric.sort_key,
+            )
+            for (name, suffix, labels), value in samples:
+                lines.append(f'{name}{suffix}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, registry):
+        self.name = name
+        self.documentation = documentation
+        self.registry = registry
+        registry.register(self)
+
+    def inc(self, amount=1, **labels):
+        self.registry.inc(self.name, '_total', labels, amount)
+
+    @staticmethod
+    def sort_key(sample):
+        return sample[0][2]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, registry, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.registry = registry
+        registry.register(self)
+
+    def observe(self, value, **labels):
+        # Buckets are stored cumulatively, as they are exposed; untouched buckets still get a
+        # zero sample so every series exposes the full set of bounds
+        for bound in self.buckets:
+            bucket_labels = {**labels, 'le': '+Inf' if bound == math.inf else repr(bound)}
+            self.registry.inc(self.name, '_bucket', bucket_labels, 1 if value <= bound else 0)
+        self.registry.inc(self.name, '_count', labels, 1)
+        self.registry.inc(self.name, '_sum', labels, value)
+
+    @staticmethod
+    def sort_key(sample):
+        (name, suffix, labels), _ = sample
+        series = tuple(label for label in labels if label[0] != 'le')
+        bound = dict(labels).get('le')
+        order = {'_bucket': 0, '_sum': 1, '_count': 2}[suffix]
+        return series, order, float(bound or 0)
+
+
+registry = Registry()
+
+request_latency = Histogram(
+    'http_request_duration_seconds', 'Request latency by URL name.', registry,
+)
+requests_total = Counter(
+    'http_requests', 'Responses by URL name, method and status code.', registry,
+)
+db_queries_total = Counter(
+    'db_queries', 'Database queries issued while serving requests, by URL name.', registry,
+)
+cache_requests_total = Counter(
+    'cache_requests', 'Cache lookups by cache name and result (hit or miss).', registry,
+)
+login_attempts_total = Counter(
+    'login_attempts', 'Login attempts by gateway and result.', registry,
+)
+
+
+def record_cache_lookup(cache, hit):
+    cache_requests_total.inc(cache=cache, result='hit' if hit else 'miss')
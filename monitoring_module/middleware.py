@@ -0,0 +1,184 @@
+import cProfile
+import json
+import logging
+import random
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from . import metrics, profiling
+
+logger = logging.getLogger('monitoring_module.requests')
+
+
+class RequestProfilingMiddleware:
+    """
+    Records wall time, SQL count/time, duplicate query fingerprints and template render
+    time for every request. The numbers are returned in a `Server-Timing` header and
+    logged as one JSON line per request.
+
+    Requests sent with the profiling header by a staff user (or with the configured
+    token), and a random sample of all requests, additionally get a cProfile dump
+    written to REQUEST_PROFILING['DUMP_DIR'].
+
+    Must be placed after AuthenticationMiddleware so that `request.user` is available.
+    Works under both WSGI and ASGI, so async views are not pushed into a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = profiling.RequestStats()
+        token = profiling.activate(stats)
+        profiler = cProfile.Profile() if self.should_profile(request) else None
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            profiling.deactivate(token)
+        return self.finish(request, response, stats, profiler)
+
+    async def __acall__(self, request):
+        stats = profiling.RequestStats()
+        token = profiling.activate(stats)
+        # The profiler sees the event loop thread only; queries run in sync_to_async
+        # threads show up as time spent awaiting them
+        profiler = cProfile.Profile() if await self.ashould_profile(request) else None
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            profiling.deactivate(token)
+        return self.finish(request, response, stats, profiler)
+
+    def finish(self, request, response, stats, profiler):
+        if profiler is not None:
+            response['X-Profile-Dump'] = self.dump(profiler, request)
+        response['Server-Timing'] = self.server_timing(stats)
+        self.log(request, response, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = profiling.current_request_stats()
+        if stats is not None:
+            # e.g. "TakeAttendanceView.post", so slow queries can be traced back to a handler
+            view_class = getattr(view_func, 'view_class', None)
+            if view_class is not None:
+                stats.view = f'{view_class.__name__}.{request.method.lower()}'
+            else:
+                stats.view = getattr(view_func, '__qualname__', repr(view_func))
+
+    def should_profile(self, request, user=None):
+        config = profiling.profiling_settings()
+        if not config['DUMP_DIR']:
+            return False
+        header = request.headers.get(config['HEADER'])
+        if header:
+            if config['TOKEN'] and header == config['TOKEN']:
+                return True
+            user = user or getattr(request, 'user', None)
+            if user is not None and user.is_authenticated and user.is_staff:
+                return True
+        return random.random() < config['SAMPLE_RATE']
+
+    async def ashould_profile(self, request):
+        # Only load the user (a database query) when the header asks for a profile
+        config = profiling.profiling_settings()
+        user = None
+        if config['DUMP_DIR'] and request.headers.get(config['HEADER']) and hasattr(request, 'auser'):
+            user = await request.auser()
+        return self.should_profile(request, user)
+
+    def dump(self, profiler, request):
+        dump_dir = Path(profiling.profiling_settings()['DUMP_DIR'])
+        dump_dir.mkdir(parents=True, exist_ok=True)
+        view = request.resolver_match.view_name if request.resolver_match else 'unresolved'
+        filename = f'{time.strftime("%Y%m%d-%H%M%S")}-{view.replace(":", "-")}-{uuid.uuid4().hex[:8]}.prof'
+        profiler.dump_stats(dump_dir / filename)
+        return filename
+
+    @staticmethod
+    def server_timing(stats):
+        return ', '.join([
+            f'total;dur={stats.elapsed * 1000:.1f}',
+            f'db;dur={stats.query_time * 1000:.1f};desc="{stats.query_count} queries"',
+            f'tpl;dur={stats.template_time * 1000:.1f}',
+        ])
+
+    @staticmethod
+    def log(request, response, stats):
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        duplicates = stats.duplicates()
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': request.resolver_match.view_name if request.resolver_match else None,
+            'status': response.status_code,
+            'total_ms': round(stats.elapsed * 1000, 2),
+            'db_queries': stats.query_count,
+            'db_ms': round(stats.query_time * 1000, 2),
+            'template_ms': round(stats.template_time * 1000, 2),
+            'duplicate_queries': [
+                {'fingerprint': key, 'count': count, 'sql': stats.shapes[key][:200]}
+                for key, count in duplicates
+            ],
+        }))
+
+
+class MetricsMiddleware:
+    """
+    Feeds request latency, status and DB query counts into the metrics registry.
+
+    Placed directly after RequestProfilingMiddleware so it can read the query count
+    that middleware collects for the current request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def record(request, response, elapsed):
+        view = request.resolver_match.url_name if request.resolver_match else None
+        view = view or 'unresolved'
+        metrics.request_latency.observe(elapsed, view=view, method=request.method)
+        metrics.requests_total.inc(view=view, method=request.method, status=str(response.status_code))
+        stats = profiling.current_request_stats()
+        if stats is not None and stats.query_count:
+            metrics.db_queries_total.inc(stats.query_count, view=view)
@@ -0,0 +1,107 @@
+import hashlib
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_request_stats = ContextVar('request_stats', default=None)
+
+DEFAULT_PROFILING_SETTINGS = {
+    # Requests carrying this header are profiled if the user is staff or the value matches TOKEN
+    'HEADER': 'X-Profile',
+    'TOKEN': None,
+    # Fraction of all requests profiled regardless of the header (0 disables sampling)
+    'SAMPLE_RATE': 0.0,
+    'DUMP_DIR': None,
+}
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def profiling_settings():
+    return {**DEFAULT_PROFILING_SETTINGS, **getattr(settings, 'REQUEST_PROFILING', {})}
+
+
+def fingerprint(sql):
+    """
+    Reduce a query to its shape: literals become `?` and `IN (%s, %s, ...)` lists collapse,
+    so the same statement issued for different rows gets the same fingerprint.
+    """
+    shape = _LITERAL.sub('?', _IN_LIST.sub('(...)', sql))
+    return hashlib.sha1(shape.encode()).hexdigest()[:12], shape
+
+
+class RequestStats:
+    """
+    Per-request counters filled in by the SQL wrapper and the timed template backend.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.query_count = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.fingerprints = Counter()
+        self.shapes = {}
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.query_time += duration
+        key, shape = fingerprint(sql)
+        self.fingerprints[key] += 1
+        self.shapes.setdefault(key, shape)
+
+    def duplicates(self):
+        """
+        Fingerprints issued more than once in this request, most repeated first.
+        """
+        return [(key, count) for key, count in self.fingerprints.most_common() if count > 1]
+
+    def __call__(self, execute, sql, params, many, context):
+        # Used as a connection.execute_wrapper
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, time.perf_counter() - started)
+
+
+def current_request_stats():
+    return _request_stats.get()
+
+
+def record_request_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection: counts the query against the request
+    being served, if any. Reading the stats from a context variable rather than wrapping
+    connections per request means queries run by async views in sync_to_async threads
+    are counted too.
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install(sender, connection, **kwargs):
+    """
+    connection_created receiver: add the request-stats wrapper to a new connection once.
+    """
+    if record_request_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_request_query)
+
+
+def activate(stats):
+    return _request_stats.set(stats)
+
+
+def deactivate(token):
+    _request_stats.reset(token)
@@ -0,0 +1,26 @@
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from . import metrics
+
+
+def _gateway(request):
+    match = getattr(request, 'resolver_match', None) if request is not None else None
+    return match.url_name if match and match.url_name else 'other'
+
+
+@receiver(user_logged_in)
+def count_login_success(sender, request, user, **kwargs):
+    metrics.login_attempts_total.inc(gateway=_gateway(request), result='success')
+
+
+@receiver(user_login_failed)
+def count_login_failure(sender, credentials, request=None, **kwargs):
+    metrics.login_attempts_total.inc(gateway=_gateway(request), result='failure')
+
+
+@receiver(setting_changed)
+def reopen_metrics_store(sender, setting, **kwargs):
+    # The store follows METRICS['DIR'] when it is overridden, as in tests and benchmarks
+    if setting == 'METRICS':
+        metrics.registry.reset()
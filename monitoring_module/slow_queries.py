@@ -0,0 +1,185 @@
+"""
+Slow-query log.
+
+A `SlowQueryLogger` execute wrapper is installed on every database connection as it is
+created. Queries slower than SLOW_QUERY_LOG['THRESHOLD_MS'] are tagged with the view
+being served and the innermost project functions on the stack, then handed to a
+background thread which runs EXPLAIN on its own connection and appends the entry to a
+JSON-lines file. The request never waits for the EXPLAIN or the file write.
+
+`manage.py slow_queries` summarizes the file by query fingerprint.
+"""
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from .profiling import current_request_stats, fingerprint
+
+logger = logging.getLogger('monitoring_module.slow_queries')
+
+DEFAULT_SLOW_QUERY_SETTINGS = {
+    'THRESHOLD_MS': 100,
+    'EXPLAIN': True,
+    'LOG_FILE': None,
+    # Number of project frames kept as the query's origin
+    'STACK_DEPTH': 3,
+}
+
+_local = threading.local()
+
+
+def slow_query_settings():
+    return {**DEFAULT_SLOW_QUERY_SETTINGS, **getattr(settings, 'SLOW_QUERY_LOG', {})}
+
+
+def query_origin(depth):
+    """
+    Innermost functions on the stack that belong to this project (not Django, not this
+    module, not the manage.py entry point), e.g. ['account_module.models:User.promote_to_next_term', ...].
+    """
+    base_dir = str(settings.BASE_DIR)
+    origin = []
+    frame = sys._getframe(2)
+    while frame is not None and len(origin) < depth:
+        filename = frame.f_code.co_filename
+        module = frame.f_globals.get('__name__', '')
+        if (filename.startswith(base_dir) and 'site-packages' not in filename
+                and module != '__main__' and not module.startswith('monitoring_module.')):
+            origin.append(f'{module}:{frame.f_code.co_qualname}')
+        frame = frame.f_back
+    return origin
+
+
+class SlowQueryLogger:
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            config = slow_query_settings()
+            if duration_ms >= config['THRESHOLD_MS'] and not getattr(_local, 'explaining', False):
+                stats = current_request_stats()
+                capture.submit(config, {
+                    'alias': self.alias,
+                    'sql': sql,
+                    'params': None if many else _jsonable(params),
+                    'many': many,
+                    'duration_ms': round(duration_ms, 3),
+                    'view': getattr(stats, 'view', None),
+                    'origin': query_origin(config['STACK_DEPTH']),
+                    'logged_at': time.time(),
+                })
+
+
+def _jsonable(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _jsonable_value(value) for key, value in params.items()}
+    return [_jsonable_value(value) for value in params]
+
+
+def _jsonable_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN '
+    else:
+        return None
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    finally:
+        _local.explaining = False
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail)
+        return '\n'.join(row[-1] for row in rows)
+    return '\n'.join(row[0] for row in rows)
+
+
+class ExplainCapture:
+    """
+    Background thread that EXPLAINs slow queries and appends them to the log file.
+    """
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=1000)
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, config, entry):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='slow-query-explain', daemon=True)
+                self.thread.start()
+        try:
+            # Settings are read here rather than in the thread, which may run after they change
+            self.queue.put_nowait((config, entry))
+        except queue.Full:
+            logger.warning('Slow query log queue is full; dropping entry for %s', entry['sql'][:100])
+
+    def run(self):
+        while True:
+            config, entry = self.queue.get()
+            try:
+                self.process(config, entry)
+            except Exception:
+                logger.exception('Could not record slow query')
+            finally:
+                self.queue.task_done()
+
+    def process(self, config, entry):
+        key, shape = fingerprint(entry['sql'])
+        entry['fingerprint'] = key
+        entry['shape'] = shape
+        entry['plan'] = None
+        is_select = entry['sql'].lstrip().upper().startswith(('SELECT', 'WITH'))
+        if config['EXPLAIN'] and is_select and not entry['many']:
+            try:
+                entry['plan'] = explain(entry['alias'], entry['sql'], entry['params'])
+            except Exception as error:
+                entry['plan'] = f'EXPLAIN failed: {error}'
+            finally:
+                connections[entry['alias']].close()
+        logger.warning('Slow query (%.1f ms) from %s: %s', entry['duration_ms'],
+                       entry['view'] or ', '.join(entry['origin']) or 'unknown', shape[:200])
+        if config['LOG_FILE']:
+            path = Path(config['LOG_FILE'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as log_file:
+                log_file.write(json.dumps(entry) + '\n')
+
+    def flush(self):
+        """
+        Block until every submitted entry has been processed.
+        """
+        self.queue.join()
+
+
+capture = ExplainCapture()
+
+
+def install(sender, connection, **kwargs):
+    """
+    connection_created receiver: add the slow-query wrapper to a new connection once.
+    """
+    if not any(isinstance(wrapper, SlowQueryLogger) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryLogger(connection.alias))
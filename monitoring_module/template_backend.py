@@ -0,0 +1,41 @@
+import time
+
+from django.template.backends.django import DjangoTemplates
+from .profiling import current_request_stats
+
+
+class TimedTemplate:
+    """
+    Wraps a backend template so that the time spent rendering it is added to the
+    stats of the request being profiled (if any).
+    """
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = current_request_stats()
+        if stats is None:
+            return self.template.render(context, request)
+        # Nested renders (e.g. render_to_string inside a tag) are already inside the outer timing
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if stats.template_depth == 0:
+                stats.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Drop-in replacement for the Django template backend that records render time.
+    """
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,123 @@
+import gzip
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+from monitoring_module.backups import DEFAULT_BACKUP_SETTINGS, BackupError, back_up, snapshots, verify
+
+
+class BackupTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = Path(self.directory.name)
+        self.path = self.root / 'live.sqlite3'
+        connection = sqlite3.connect(self.path)
+        connection.execute('CREATE TABLE record (id INTEGER PRIMARY KEY, payload BLOB)')
+        connection.executemany('INSERT INTO record (payload) VALUES (?)', [(os.urandom(1000),) for _ in range(2000)])
+        connection.commit()
+        connection.close()
+        self.database = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(self.path)}
+        self.options = {**DEFAULT_BACKUP_SETTINGS, 'DIR': self.root / 'backups', 'PAGES': 16, 'SLEEP': 0.005}
+
+    def restore(self, snapshot):
+        copy = self.root / 'restored.sqlite3'
+        copy.write_bytes(gzip.decompress(snapshot.read_bytes()))
+        connection = sqlite3.connect(copy)
+        try:
+            return connection.execute('SELECT COUNT(*) FROM record').fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_snapshot_is_compressed_and_checksummed(self):
+        result = back_up('live', self.database, self.options)
+        self.assertTrue(result['path'].name.startswith('live-'))
+        self.assertTrue(result['path'].name.endswith('.sqlite3.gz'))
+        self.assertEqual(self.restore(result['path']), 2000)
+        checksum = Path(f'{result["path"]}.sha256').read_text()
+        self.assertEqual(checksum, f'{result["sha256"]}  {result["path"].name}\n')
+        self.assertTrue(verify(result['path']))
+
+        data = bytearray(result['path'].read_bytes())
+        data[-1] ^= 0xFF
+        result['path'].write_bytes(data)
+        self.assertFalse(verify(result['path']))
+
+    def test_old_snapshots_are_rotated(self):
+        paths = [back_up('live', self.database, {**self.options, 'KEEP': 2})['path'] for _ in range(3)]
+        self.assertEqual(snapshots(self.options['DIR'], 'live'), paths[1:])
+        self.assertFalse(Path(f'{paths[0]}.sha256').exists())
+
+    @contextmanager
+    def writing(self, errors, written):
+        stop = threading.Event()
+
+        def write():
+            connection = sqlite3.connect(self.path, timeout=1)
+            while not stop.is_set():
+                try:
+                    connection.execute('INSERT INTO record (payload) VALUES (?)', (b'late',))
+                    connection.commit()
+                    written.append(1)
+                except sqlite3.Error as error:
+                    errors.append(error)
+                time.sleep(0.005)
+            connection.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            writer.join()
+
+    def test_writers_are_not_blocked(self):
+        errors, written = [], []
+        with self.writing(errors, written):
+            result = back_up('live', self.database, self.options)
+        self.assertEqual(errors, [])
+        self.assertTrue(written)
+        # A consistent copy from some point during the writes
+        self.assertGreaterEqual(self.restore(result['path']), 2000)
+
+    def test_copy_gives_up_after_its_restarts(self):
+        errors, written = [], []
+        # Steps far apart, so writes land between them
+        with self.writing(errors, written), self.assertRaises(BackupError):
+            back_up('live', self.database, {**self.options, 'SLEEP': 0.05, 'MAX_RESTARTS': 0})
+        self.assertEqual(errors, [])
+        self.assertEqual(snapshots(self.options['DIR'], 'live'), [])
+
+
+class BackupCommandTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_in_memory_databases_are_skipped(self):
+        out = StringIO()
+        call_command('backup_db', '--dir', self.directory.name, stdout=out)
+        self.assertIn('default: no database file, skipped.', out.getvalue())
+        # Unless asked for by name
+        with self.assertRaises(CommandError):
+            call_command('backup_db', 'default', '--dir', self.directory.name, stdout=out, stderr=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('backup_db', 'nonexistent', stdout=out)
+
+    def test_verify(self):
+        snapshot = Path(self.directory.name) / 'default-20260101T000000000000Z.sqlite3.gz'
+        snapshot.write_bytes(b'snapshot')
+        Path(f'{snapshot}.sha256').write_text(f'{"0" * 64}  {snapshot.name}\n')
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('backup_db', 'default', '--verify', '--dir', self.directory.name, stdout=out)
+        self.assertIn('checksum mismatch', out.getvalue())
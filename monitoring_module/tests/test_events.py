@@ -0,0 +1,127 @@
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+from django.db import transaction
+from django.test import TestCase
+from account_module.models import User, Term, Class, Score
+from job_module.jobs import run_pending
+from monitoring_module.events import QueuedJsonLinesHandler, record
+
+
+class QueuedJsonLinesHandlerTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'events.jsonl'
+        self.logger = logging.getLogger('monitoring_module.tests.events')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+        self.directory.cleanup()
+
+    def attach(self, **kwargs):
+        handler = QueuedJsonLinesHandler(self.path, **kwargs)
+        self.logger.addHandler(handler)
+        return handler
+
+    def test_events_are_written_as_compact_json_lines(self):
+        handler = self.attach()
+        self.logger.info('score.changed', extra={'event': 'score.changed', 'data': {'student': 7, 'total': 81.5}})
+        handler.flush()
+        line = self.path.read_text().strip()
+        self.assertNotIn(' ', line)
+        entry = json.loads(line)
+        self.assertEqual(entry['event'], 'score.changed')
+        self.assertEqual(entry['student'], 7)
+        self.assertEqual(entry['total'], 81.5)
+        self.assertIn('ts', entry)
+
+    def test_file_is_rotated(self):
+        handler = self.attach(max_bytes=500, backup_count=2)
+        for number in range(50):
+            self.logger.info('class.created', extra={'event': 'class.created', 'data': {'class_id': number}})
+        handler.flush()
+        self.assertTrue(Path(f'{self.path}.1').exists())
+        self.assertTrue(Path(f'{self.path}.2').exists())
+        self.assertFalse(Path(f'{self.path}.3').exists())
+        self.assertLessEqual(self.path.stat().st_size, 500)
+
+
+class DomainEventsTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.next_term = Term.objects.create(name="Term 2", order=2)
+        self.teacher = User.objects.create_user(username='teacher1', national_id='1234567890', user_type='teacher')
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term,
+        )
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.class_obj.students.add(self.student)
+
+    def events(self, logs):
+        return [(entry.event, entry.data) for entry in logs.records]
+
+    def test_record(self):
+        with self.assertLogs('monitoring_module.events', level='INFO') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            record('something.happened', answer=42)
+        self.assertEqual(self.events(logs), [('something.happened', {'answer': 42})])
+
+    def test_events_wait_for_the_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNoLogs('monitoring_module.events', level='INFO'):
+                record('something.happened')
+        with self.assertLogs('monitoring_module.events', level='INFO') as logs:
+            for callback in callbacks:
+                callback()
+        self.assertEqual(self.events(logs), [('something.happened', {})])
+
+        # Rolled back
+        with self.assertNoLogs('monitoring_module.events', level='INFO'), \
+                self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Class.objects.create(name="Class B", gender='female', teacher=self.teacher, term=self.term)
+                raise RuntimeError
+
+    def test_grade_change_is_recorded_with_old_and_new_values(self):
+        score = Score.objects.create(student=self.student, term=self.term, quiz_1=10, final=20)
+        score = Score.objects.get(pk=score.pk)
+        score.final = 25
+        with self.assertLogs('monitoring_module.events', level='INFO') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            score.save()
+        (event, data), = self.events(logs)
+        self.assertEqual(event, 'score.changed')
+        self.assertEqual(data['changes'], {'final': [20, 25]})
+        self.assertEqual(data['total'], 35)
+        self.assertFalse(data['passed'])
+
+    def test_unchanged_score_is_not_recorded(self):
+        score = Score.objects.create(student=self.student, term=self.term, quiz_1=10, final=20)
+        with self.assertNoLogs('monitoring_module.events', level='INFO'), \
+                self.captureOnCommitCallbacks(execute=True):
+            Score.objects.get(pk=score.pk).save()
+
+    def test_promotion_and_class_creation_are_recorded(self):
+        with self.assertLogs('monitoring_module.events', level='INFO') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            Score.objects.create(student=self.student, term=self.term, quiz_1=20, quiz_2=20, final=40)
+            run_pending()
+        events = dict(self.events(logs))
+        self.assertEqual(events['class.created']['term'], self.next_term.pk)
+        self.assertEqual(events['class.sessions_created']['count'], 12)
+        self.assertEqual(events['student.promoted']['from_class'], self.class_obj.pk)
+        self.assertEqual(events['student.promoted']['to_term'], self.next_term.pk)
+        self.assertTrue(events['score.created']['passed'])
+
+    def test_skipped_promotion_is_recorded_with_reason(self):
+        with self.assertLogs('monitoring_module.events', level='INFO') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(self.teacher.promote_to_next_term())
+        self.assertEqual(self.events(logs), [('student.promotion_skipped', {'student': self.teacher.pk,
+                                                                             'reason': 'not_a_student'})])
@@ -0,0 +1,89 @@
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from account_module.models import User
+from monitoring_module.metrics import MmapValues, Registry, Counter, Histogram
+
+
+class MmapValuesTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'metrics-1.db'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_values_survive_reopening(self):
+        values = MmapValues(self.path)
+        values.inc('a', 1)
+        values.inc('a', 2.5)
+        values.inc('b', 1)
+        self.assertEqual(dict(MmapValues(self.path).items()), {'a': 3.5, 'b': 1})
+        self.assertEqual(dict(MmapValues.read(self.path)), {'a': 3.5, 'b': 1})
+
+    def test_file_grows_when_full(self):
+        values = MmapValues(self.path)
+        keys = [f'metric-with-a-long-name-{i}' * 4 for i in range(1000)]
+        for key in keys:
+            values.inc(key, 1)
+        self.assertGreater(values.capacity, MmapValues.initial_size)
+        self.assertEqual(len(MmapValues.read(self.path)), 1000)
+
+
+class RegistryAggregationTest(TestCase):
+    def test_samples_from_every_process_file_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS={'DIR': directory}):
+                test_registry = Registry()
+                hits = Counter('hits', 'Hits.', test_registry)
+                latency = Histogram('latency_seconds', 'Latency.', test_registry, buckets=(0.1, 1.0))
+                hits.inc(view='a')
+                latency.observe(0.5, view='a')
+
+                # Another worker process wrote its own file
+                other = MmapValues(Path(directory) / 'metrics-99999.db')
+                other.inc('["hits", "_total", [["view", "a"]]]', 2)
+
+                output = test_registry.exposition()
+        self.assertIn('hits_total{view="a"} 3', output)
+        self.assertIn('latency_seconds_bucket{le="0.1",view="a"} 0', output)
+        self.assertIn('latency_seconds_bucket{le="1.0",view="a"} 1', output)
+        self.assertIn('latency_seconds_bucket{le="+Inf",view="a"} 1', output)
+        self.assertIn('latency_seconds_count{view="a"} 1', output)
+        self.assertIn('latency_seconds_sum{view="a"} 0.5', output)
+        self.assertIn('# TYPE latency_seconds histogram', output)
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(METRICS={'DIR': self.directory.name, 'TOKEN': 'scrape-token'})
+        self.settings_override.enable()
+        self.staff = User.objects.create_user(
+            username='staff1', national_id='1111111111', user_type='teacher', password='testpass123', is_staff=True,
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def test_requires_staff_or_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+
+    def test_request_and_login_metrics(self):
+        self.client.get(reverse('teacher-gateway'))
+        self.client.post(reverse('teacher-gateway'), {'username': '1111111111', 'password': 'wrong'})
+        self.client.post(reverse('teacher-gateway'), {'username': '1111111111', 'password': 'testpass123'})
+
+        output = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('http_request_duration_seconds_count{method="GET",view="teacher-gateway"} 1', output)
+        self.assertIn('http_requests_total{method="POST",status="302",view="teacher-gateway"} 1', output)
+        self.assertIn('login_attempts_total{gateway="teacher-gateway",result="failure"} 1', output)
+        self.assertIn('login_attempts_total{gateway="teacher-gateway",result="success"} 1', output)
+        self.assertIn('db_queries_total{view="teacher-gateway"}', output)
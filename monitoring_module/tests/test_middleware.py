@@ -0,0 +1,88 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from account_module.models import User, Term, Class, AttendanceSession
+from monitoring_module.profiling import fingerprint, RequestStats
+
+
+class FingerprintTest(TestCase):
+    def test_literals_and_in_lists_are_normalized(self):
+        first, _ = fingerprint('SELECT * FROM t WHERE id IN (%s, %s) AND name = \'a\' LIMIT 21')
+        second, _ = fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'b\' LIMIT 5')
+        self.assertEqual(first, second)
+
+    def test_different_statements_differ(self):
+        self.assertNotEqual(fingerprint('SELECT a FROM t')[0], fingerprint('SELECT b FROM t')[0])
+
+    def test_duplicates_are_counted(self):
+        stats = RequestStats()
+        for student_id in range(3):
+            stats.record_query(f'SELECT * FROM record WHERE student_id = {student_id}', 0.001)
+        stats.record_query('SELECT * FROM session', 0.001)
+        key, _ = fingerprint('SELECT * FROM record WHERE student_id = 1')
+        self.assertEqual(stats.duplicates(), [(key, 3)])
+        self.assertEqual(stats.query_count, 4)
+
+
+class RequestProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1',
+            national_id='1234567890',
+            user_type='teacher',
+            password='testpass123',
+        )
+        self.class_obj = Class.objects.create(name="Class A", gender='male', teacher=self.teacher, term=self.term)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+        self.url = reverse('attendance_sessions', args=[self.teacher.slug, self.class_obj.slug])
+        self.client.force_login(self.teacher)
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+        timing = dict(
+            part.split(';', 1)[0:2] for part in response['Server-Timing'].split(', ')
+        )
+        self.assertEqual(set(timing), {'total', 'db', 'tpl'})
+        self.assertIn('queries', response['Server-Timing'])
+        self.assertNotIn('X-Profile-Dump', response)
+
+    def test_structured_log_line(self):
+        with self.assertLogs('monitoring_module.requests', level='INFO') as logs:
+            self.client.get(self.url)
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry['view'], 'attendance_sessions')
+        self.assertEqual(entry['status'], 200)
+        self.assertGreater(entry['db_queries'], 0)
+        self.assertGreater(entry['template_ms'], 0)
+
+    def test_profile_dump_for_staff_with_header(self):
+        self.teacher.is_staff = True
+        self.teacher.save()
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(REQUEST_PROFILING={'DUMP_DIR': dump_dir}):
+                response = self.client.get(self.url, HTTP_X_PROFILE='1')
+            self.assertTrue((Path(dump_dir) / response['X-Profile-Dump']).exists())
+
+    def test_header_ignored_for_non_staff(self):
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(REQUEST_PROFILING={'DUMP_DIR': dump_dir}):
+                response = self.client.get(self.url, HTTP_X_PROFILE='1')
+            self.assertNotIn('X-Profile-Dump', response)
+            self.assertEqual(list(Path(dump_dir).iterdir()), [])
+
+    def test_profile_dump_with_token(self):
+        self.client.logout()
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(REQUEST_PROFILING={'DUMP_DIR': dump_dir, 'TOKEN': 'secret'}):
+                response = self.client.get(reverse('teacher-gateway'), HTTP_X_PROFILE='secret')
+            self.assertIn('X-Profile-Dump', response)
+
+    def test_sampling(self):
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(REQUEST_PROFILING={'DUMP_DIR': dump_dir, 'SAMPLE_RATE': 1.0}):
+                response = self.client.get(self.url)
+            self.assertIn('X-Profile-Dump', response)
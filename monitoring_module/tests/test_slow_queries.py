@@ -0,0 +1,97 @@
+import json
+import tempfile
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from account_module.models import User, Term, Class, AttendanceSession, Score
+from job_module.jobs import run_pending
+from monitoring_module.management.commands.slow_queries import full_scans
+from monitoring_module.slow_queries import capture
+
+
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = Path(self.directory.name) / 'slow.jsonl'
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.next_term = Term.objects.create(name="Term 2", order=2)
+        self.teacher = User.objects.create_user(username='teacher1', national_id='1234567890', user_type='teacher')
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term,
+        )
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.class_obj.students.add(self.student)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def entries(self):
+        capture.flush()
+        if not self.log_file.exists():
+            return []
+        return [json.loads(line) for line in self.log_file.read_text().splitlines()]
+
+    @contextmanager
+    def log_everything(self):
+        # Every query is also a warning; they are processed in the background, so wait for them
+        with self.assertLogs('monitoring_module.slow_queries', level='WARNING'), \
+                override_settings(SLOW_QUERY_LOG={'THRESHOLD_MS': 0, 'LOG_FILE': str(self.log_file)}):
+            yield
+            capture.flush()
+
+    def test_queries_under_threshold_are_not_logged(self):
+        with override_settings(SLOW_QUERY_LOG={'THRESHOLD_MS': 10000, 'LOG_FILE': str(self.log_file)}):
+            list(User.objects.all())
+        self.assertEqual(self.entries(), [])
+
+    def test_entries_carry_view_and_plan(self):
+        self.client.force_login(self.teacher)
+        url = reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.pk])
+        with self.log_everything():
+            self.client.post(url, {f'student_{self.student.pk}': 'on'})
+        entries = self.entries()
+        self.assertIn('TakeAttendanceView.post', {entry['view'] for entry in entries})
+
+        selects = [entry for entry in entries if entry['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        self.assertTrue(all(entry['plan'] for entry in selects))
+
+    def test_entries_carry_model_method_origin(self):
+        with self.log_everything():
+            Score.objects.create(student=self.student, term=self.term, quiz_1=20, quiz_2=20, final=40)
+            run_pending()
+        origins = {origin for entry in self.entries() for origin in entry['origin']}
+        self.assertIn('account_module.models:User.promote_to_next_term', origins)
+        self.assertIn('account_module.models:Score.save', origins)
+
+    def test_summary_command(self):
+        with self.log_everything():
+            for _ in range(3):
+                list(Score.objects.filter(quiz_1=10))
+        capture.flush()
+        out = StringIO()
+        call_command('slow_queries', file=str(self.log_file), json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+        score_scan = next(item for item in summary if 'account_module_score' in item['sql'])
+        self.assertEqual(score_scan['count'], 3)
+        self.assertEqual(score_scan['full_scans'], ['account_module_score'])
+
+        out = StringIO()
+        call_command('slow_queries', file=str(self.log_file), stdout=out)
+        self.assertIn('consider an index', out.getvalue())
+
+
+class FullScanDetectionTest(TestCase):
+    def test_sqlite_plans(self):
+        self.assertEqual(full_scans('SCAN account_module_score'), ['account_module_score'])
+        self.assertEqual(full_scans('SEARCH account_module_score USING INDEX idx (student_id=?)'), [])
+        self.assertEqual(full_scans('SCAN account_module_user USING COVERING INDEX idx'), [])
+
+    def test_postgres_plans(self):
+        self.assertEqual(full_scans('Seq Scan on account_module_score  (cost=0.00..1.01 rows=1)'),
+                         ['account_module_score'])
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from .metrics import registry
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint. Requires a staff session or `Authorization: Bearer <METRICS['TOKEN']>`.
+    """
+
+    def is_authorized(self, request):
+        token = getattr(settings, 'METRICS', {}).get('TOKEN')
+        header = request.headers.get('Authorization', '')
+        if token and header.startswith('Bearer ') and constant_time_compare(header[len('Bearer '):], token):
+            return True
+        return request.user.is_authenticated and request.user.is_staff
+
+    def get(self, request):
+        if not self.is_authorized(request):
+            return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+        return HttpResponse(registry.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,26 @@
+from django.contrib import admin
+from django.utils import timezone
+from job_module.jobs import enqueue
+from . import models
+
+
+@admin.register(models.Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'channel', 'address', 'status', 'attempts', 'send_after', 'sent_at')
+    list_filter = ('status', 'channel', 'kind')
+    list_select_related = ('student',)
+    search_fields = ('^address', '^dedup_key')
+    autocomplete_fields = ('student',)
+    date_hierarchy = 'created_at'
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at', 'last_error')
+    ordering = ('-id',)
+    actions = ('retry',)
+
+    @admin.action(description='Retry selected failed notifications')
+    def retry(self, request, queryset):
+        failed = queryset.filter(status=models.Notification.FAILED)
+        channels = set(failed.values_list('channel', flat=True))
+        count = failed.update(status=models.Notification.QUEUED, attempts=0, send_after=timezone.now())
+        for channel in sorted(channels):
+            enqueue('notification_module.dispatch', {'channel': channel})
+        self.message_user(request, f'{count} notification(s) queued again.')
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class NotificationModuleConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notification_module'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,231 @@
+"""
+Parent notifications for absences and grades.
+
+Requests never send anything. Saving attendance or a grade enqueues a job
+(`notify_absences`, `notify_grade`) that turns the event into `Notification` rows, one
+per channel the student's family can be reached on: SMS to `parent_number`, email to the
+account's address. Each row has a dedup key derived from the event, so an event queued
+twice (a resubmitted attendance sheet, a retried job) notifies nobody twice.
+
+The `dispatch` job then sends the due rows of a channel in batches of the provider's
+BATCH_SIZE, at most RATE_PER_MINUTE per minute. Each row is claimed (marked as sending)
+with a conditional UPDATE before it goes to the provider, so concurrent dispatches of a
+channel never send the same row. Failed messages are retried with exponential backoff up
+to MAX_ATTEMPTS. What cannot go out now (rate limit, backoff) is picked up by a follow-up
+dispatch scheduled for when it is due. Rows left sending by a dispatcher that died are
+queued again after SEND_TIMEOUT seconds, and may then go out twice.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from account_module.models import AttendanceRecord, Enrollment, Score
+from job_module.jobs import enqueue
+from monitoring_module import events
+from .models import Notification
+
+DEFAULT_PROVIDER_SETTINGS = {
+    'BACKEND': 'notification_module.providers.LoopbackProvider',
+    'BATCH_SIZE': 100,
+    'RATE_PER_MINUTE': 600,
+}
+DEFAULT_NOTIFICATION_SETTINGS = {
+    'PROVIDERS': {},
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,
+    'SEND_TIMEOUT': 600,
+}
+
+
+def notification_settings():
+    return {**DEFAULT_NOTIFICATION_SETTINGS, **getattr(settings, 'NOTIFICATIONS', {})}
+
+
+def provider_settings(channel):
+    return {**DEFAULT_PROVIDER_SETTINGS, **notification_settings()['PROVIDERS'].get(channel, {})}
+
+
+def get_provider(channel):
+    options = provider_settings(channel)
+    return import_string(options['BACKEND'])(channel, options)
+
+
+def addresses(student):
+    # (channel, address) pairs the student's family can be reached on
+    pairs = []
+    if student.parent_number:
+        pairs.append((Notification.SMS, student.parent_number))
+    if student.email:
+        pairs.append((Notification.EMAIL, student.email))
+    return pairs
+
+
+def queue(notifications):
+    """
+    Save new notifications, skipping those whose event was already queued, and schedule
+    their dispatch. Returns the number of channels scheduled.
+    """
+    if not notifications:
+        return 0
+    Notification.objects.bulk_create(notifications, batch_size=500, ignore_conflicts=True)
+    channels = sorted({notification.channel for notification in notifications})
+    for channel in channels:
+        enqueue('notification_module.dispatch', {'channel': channel})
+    return len(channels)
+
+
+def queue_absences(session_id):
+    """
+    Notify the families of the students marked absent in an attendance session.
+    """
+    # The attendance page also writes records for students of the term outside the class;
+    # only the class's members are notified
+    members = Enrollment.objects.members().filter(
+        class_obj_id=OuterRef('session__class_obj_id'), student_id=OuterRef('student_id'),
+    )
+    records = AttendanceRecord.objects.filter(session_id=session_id, present=False).filter(
+        Exists(members),
+    ).select_related('student', 'session__class_obj')
+    notifications = []
+    for record in records:
+        student, session = record.student, record.session
+        when = session.date.isoformat() if session.date else f'session {session.session_number}'
+        for channel, address in addresses(student):
+            notifications.append(Notification(
+                student=student, kind=Notification.ABSENCE, channel=channel, address=address,
+                subject=f'Absence: {student.full_name()}',
+                body=f'{student.full_name()} was absent from {session.class_obj.name} ({when}).',
+                dedup_key=f'absence:{session.pk}:{student.pk}:{channel}',
+            ))
+    queue(notifications)
+    return len(notifications)
+
+
+def queue_grade(score_id):
+    """
+    Notify a student's family of their total for the term. A changed total is a new event.
+    """
+    score = Score.objects.select_related('student', 'term').filter(pk=score_id).first()
+    if score is None:
+        return 0
+    student, total = score.student, score.total_score
+    notifications = [
+        Notification(
+            student=student, kind=Notification.GRADE, channel=channel, address=address,
+            subject=f'Grade: {student.full_name()}',
+            body=f'{student.full_name()} scored {total:g} out of 100 in {score.term.name}.',
+            dedup_key=f'grade:{score.pk}:{total:g}:{channel}',
+        )
+        for channel, address in addresses(student)
+    ]
+    queue(notifications)
+    return len(notifications)
+
+
+def claim(channel, now, limit):
+    """
+    Mark up to `limit` due notifications of a channel as sending and return them. Like
+    job_module.jobs.claim(), each row is claimed with a conditional UPDATE, so a row
+    selected by two dispatches at once is sent by one of them.
+    """
+    candidates = list(
+        Notification.objects.filter(channel=channel, status=Notification.QUEUED, send_after__lte=now)
+        .order_by('send_after', 'pk').values_list('pk', flat=True)[:limit]
+    )
+    claimed = [
+        pk for pk in candidates
+        if Notification.objects.filter(pk=pk, status=Notification.QUEUED).update(
+            status=Notification.SENDING, claimed_at=now,
+        )
+    ]
+    return list(Notification.objects.filter(pk__in=claimed).order_by('send_after', 'pk'))
+
+
+def requeue_stale(channel, timeout):
+    """
+    Queue again the notifications of a channel claimed more than `timeout` seconds ago by
+    a dispatch that never finished.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Notification.objects.filter(channel=channel, status=Notification.SENDING, claimed_at__lt=cutoff).update(
+        status=Notification.QUEUED, claimed_at=None,
+    )
+
+
+def dispatch(channel):
+    """
+    Send the due notifications of a channel within its rate limit. Returns the numbers
+    sent and failed.
+
+    Call it outside any transaction (its job is not atomic): each claim and each batch's
+    results are committed on their own, and the provider is called with no transaction
+    open, so writers are not blocked while messages go out and a failure later in the
+    run does not return sent messages to the queue.
+    """
+    options = provider_settings(channel)
+    config = notification_settings()
+    provider = get_provider(channel)
+    requeue_stale(channel, config['SEND_TIMEOUT'])
+    now = timezone.now()
+    # What concurrent dispatches are sending counts against the limit too
+    recent = (
+        Notification.objects.filter(channel=channel, sent_at__gt=now - timedelta(minutes=1)).count()
+        + Notification.objects.filter(channel=channel, status=Notification.SENDING).count()
+    )
+    budget = max(options['RATE_PER_MINUTE'] - recent, 0)
+    sent = failed = 0
+
+    while budget > 0:
+        batch = claim(channel, now, min(options['BATCH_SIZE'], budget))
+        if not batch:
+            break
+        budget -= len(batch)
+        try:
+            results = provider.send_batch(batch)
+        except Exception as error:
+            results = {notification.pk: repr(error) for notification in batch}
+
+        sent_at = timezone.now()
+        for notification in batch:
+            notification.attempts += 1
+            notification.claimed_at = None
+            error = results.get(notification.pk, 'No result from the provider.')
+            if error is None:
+                notification.status, notification.sent_at, notification.last_error = Notification.SENT, sent_at, ''
+                sent += 1
+                continue
+            notification.last_error = error
+            if notification.attempts >= config['MAX_ATTEMPTS']:
+                notification.status = Notification.FAILED
+            else:
+                delay = config['RETRY_DELAY'] * 2 ** (notification.attempts - 1)
+                notification.status = Notification.QUEUED
+                notification.send_after = sent_at + timedelta(seconds=delay)
+            failed += 1
+        with transaction.atomic():
+            Notification.objects.bulk_update(
+                batch, ['status', 'attempts', 'send_after', 'sent_at', 'claimed_at', 'last_error'],
+            )
+
+    schedule_follow_up(channel, now)
+    if sent or failed:
+        events.record('notifications.dispatched', channel=channel, sent=sent, failed=failed)
+    return {'sent': sent, 'failed': failed}
+
+
+def schedule_follow_up(channel, now):
+    next_due = Notification.objects.filter(channel=channel, status=Notification.QUEUED).aggregate(
+        next_due=Min('send_after'),
+    )['next_due']
+    if next_due is None:
+        return
+    # At the start of a later minute than this dispatch's, whose key may still be taken by
+    # this very job, and by when a rate-limited channel has budget again
+    run_at = max(next_due, now).replace(second=0, microsecond=0) + timedelta(minutes=1)
+    enqueue(
+        'notification_module.dispatch', {'channel': channel}, delay=(run_at - now).total_seconds(),
+        key=f'notifications:{channel}:{run_at:%Y%m%d%H%M}',
+    )
@@ -0,0 +1,27 @@
+from job_module.jobs import job
+from . import dispatch
+
+
+@job('notification_module.notify_absences')
+def notify_absences(session_id):
+    """
+    Queue absence notices for an attendance session after it was taken or synced.
+    """
+    return dispatch.queue_absences(session_id)
+
+
+@job('notification_module.notify_grade')
+def notify_grade(score_id):
+    """
+    Queue a grade notice after a score was saved.
+    """
+    return dispatch.queue_grade(score_id)
+
+
+# Not atomic: claims and results are committed as they happen, never across a provider call
+@job('notification_module.dispatch', max_attempts=5, retry_delay=60, atomic=False)
+def dispatch_channel(channel):
+    """
+    Send the due notifications of a channel; see dispatch.dispatch().
+    """
+    return dispatch.dispatch(channel)
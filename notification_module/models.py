@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """
+    A message to a student's parents, queued by the notification jobs and sent in batches
+    by the provider of its channel (see notification_module.dispatch).
+    """
+    SMS = 'sms'
+    EMAIL = 'email'
+    CHANNEL_CHOICES = (
+        (SMS, 'SMS'),
+        (EMAIL, 'Email'),
+    )
+
+    ABSENCE = 'absence'
+    GRADE = 'grade'
+    KIND_CHOICES = (
+        (ABSENCE, 'Absence'),
+        (GRADE, 'Grade'),
+    )
+
+    QUEUED = 'queued'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    # Phone number or email address
+    address = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200, blank=True)
+    body = models.TextField()
+    # The same event never notifies the same address twice
+    dedup_key = models.CharField(max_length=200, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    send_after = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    # When a dispatcher claimed the message for sending
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The dispatcher's query: due messages of a channel, oldest first
+            models.Index(fields=['channel', 'status', 'send_after'], name='notification_due_idx'),
+            # Messages sent in the last minute, for the rate limit
+            models.Index(fields=['channel', 'sent_at'], name='notification_sent_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.channel} to {self.address} ({self.status})'
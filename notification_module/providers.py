@@ -0,0 +1,85 @@
+"""
+Providers deliver a batch of notifications of one channel.
+
+NOTIFICATIONS['PROVIDERS'] maps each channel to the dotted path of a provider class
+(BACKEND) and its options. `send_batch()` returns, per notification id, None if the
+message was accepted or the error; raising fails the whole batch. Either way the
+dispatcher retries what failed.
+"""
+import json
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+
+class Provider:
+    def __init__(self, channel, options):
+        self.channel = channel
+        self.options = options
+
+    def send_batch(self, notifications):
+        raise NotImplementedError
+
+
+class LoopbackProvider(Provider):
+    """
+    Appends each message as a JSON line to the file at PATH (logs/notifications.jsonl by
+    default) instead of sending it. The stand-in for development and tests.
+    """
+
+    def send_batch(self, notifications):
+        path = Path(self.options.get('PATH') or settings.BASE_DIR / 'logs' / 'notifications.jsonl')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sent_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        with path.open('a', encoding='utf-8') as file:
+            for notification in notifications:
+                file.write(json.dumps({
+                    'ts': sent_at, 'id': notification.pk, 'channel': self.channel, 'to': notification.address,
+                    'subject': notification.subject, 'body': notification.body,
+                }, ensure_ascii=False) + '\n')
+        return {notification.pk: None for notification in notifications}
+
+
+class EmailProvider(Provider):
+    """
+    Sends through Django's email backend, over one connection per batch.
+    """
+
+    def send_batch(self, notifications):
+        results = {}
+        with get_connection(fail_silently=False) as connection:
+            for notification in notifications:
+                message = EmailMessage(
+                    notification.subject, notification.body, self.options.get('FROM'), [notification.address],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    results[notification.pk] = repr(error)
+                else:
+                    results[notification.pk] = None
+        return results
+
+
+class HttpSmsProvider(Provider):
+    """
+    Posts the batch as JSON to an SMS gateway at URL, authenticated with TOKEN:
+    {"messages": [{"id": ..., "to": ..., "text": ...}, ...]}. Any 2xx response accepts
+    every message of the batch.
+    """
+
+    def send_batch(self, notifications):
+        body = json.dumps({'messages': [
+            {'id': notification.pk, 'to': notification.address, 'text': notification.body}
+            for notification in notifications
+        ]}).encode()
+        request = urllib.request.Request(self.options['URL'], data=body, method='POST', headers={
+            'Content-Type': 'application/json', 'Authorization': f'Bearer {self.options.get("TOKEN", "")}',
+        })
+        with urllib.request.urlopen(request, timeout=self.options.get('TIMEOUT', 10)):
+            pass
+        return {notification.pk: None for notification in notifications}
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from account_module.models import Score
+from job_module.jobs import enqueue
+
+
+@receiver(post_save, sender=Score)
+def notify_grade(sender, instance, **kwargs):
+    # An unchanged total is deduplicated when the notice is queued
+    enqueue('notification_module.notify_grade', {'score_id': instance.pk})
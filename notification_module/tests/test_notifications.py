@@ -0,0 +1,217 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from account_module.models import User, Term, Class, AttendanceSession, Score
+from job_module.jobs import enqueue, run_pending
+from job_module.models import Job
+from notification_module.dispatch import dispatch, queue_absences, queue_grade
+from notification_module.models import Notification
+from notification_module.providers import LoopbackProvider, Provider
+
+
+class FailingProvider(Provider):
+    def send_batch(self, notifications):
+        raise ConnectionError('gateway down')
+
+
+class OverlappingProvider(LoopbackProvider):
+    # Runs a second dispatch of the channel while the first one is sending
+    overlapped = False
+
+    def send_batch(self, notifications):
+        if not OverlappingProvider.overlapped:
+            OverlappingProvider.overlapped = True
+            dispatch(self.channel)
+        return super().send_batch(notifications)
+
+
+class TransactionCheckingProvider(LoopbackProvider):
+    # Records whether each batch was sent inside a transaction, and whether its claim was committed
+    calls = []
+
+    def send_batch(self, notifications):
+        claimed = Notification.objects.filter(pk__in=[n.pk for n in notifications], status=Notification.SENDING)
+        TransactionCheckingProvider.calls.append((connection.in_atomic_block, claimed.count()))
+        return super().send_batch(notifications)
+
+
+class NotificationTest(TestCase):
+    def setUp(self):
+        outbox_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outbox_dir)
+        self.outbox = Path(outbox_dir) / 'outbox.jsonl'
+        self.settings_override = override_settings(NOTIFICATIONS={
+            'PROVIDERS': {
+                'sms': {'PATH': self.outbox, 'BATCH_SIZE': 2, 'RATE_PER_MINUTE': 3},
+                'email': {'PATH': self.outbox},
+            },
+            'MAX_ATTEMPTS': 2,
+            'RETRY_DELAY': 60,
+        })
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', password='testpass123',
+        )
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}', national_id=f'098765432{i}', user_type='student', current_term=self.term,
+                first_name='Student', last_name=str(i), parent_number=f'0912000000{i}',
+                email='family0@example.com' if i == 0 else '',
+            )
+            for i in range(5)
+        ]
+        self.class_obj.students.add(*self.students)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+        self.client.force_login(self.teacher)
+
+    def take_attendance(self, present=()):
+        url = reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.pk])
+        self.client.post(url, {f'student_{student.pk}': 'on' for student in present})
+
+    def sent_lines(self):
+        if not self.outbox.exists():
+            return []
+        return [json.loads(line) for line in self.outbox.read_text().splitlines()]
+
+    def test_attendance_request_only_queues_a_job(self):
+        self.take_attendance(present=self.students[1:])
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(list(Job.objects.values_list('name', flat=True)), ['notification_module.notify_absences'])
+
+        run_pending()
+        self.assertEqual(
+            sorted((line['channel'], line['to']) for line in self.sent_lines()),
+            [('email', 'family0@example.com'), ('sms', '09120000000')],
+        )
+        self.assertIn('Student 0 was absent from Class A (session 1).', self.sent_lines()[0]['body'])
+
+    def test_resubmitted_attendance_is_not_sent_twice(self):
+        self.take_attendance(present=self.students[1:])
+        run_pending()
+        self.take_attendance(present=self.students[2:])
+        self.take_attendance(present=self.students[1:])
+        self.take_attendance(present=self.students[2:])
+        run_pending()
+        self.assertEqual(Notification.objects.filter(channel=Notification.SMS).count(), 2)
+        self.assertEqual(len(self.sent_lines()), 3)
+
+    def test_batches_within_the_rate_limit(self):
+        self.take_attendance()
+        run_pending()
+        sms = Notification.objects.filter(channel=Notification.SMS)
+        self.assertEqual(sms.filter(status=Notification.SENT).count(), 3)
+        self.assertEqual(sms.filter(status=Notification.QUEUED).count(), 2)
+        follow_up = Job.objects.get(status=Job.QUEUED)
+        self.assertEqual(follow_up.payload, {'channel': 'sms'})
+        self.assertGreater(follow_up.run_after, timezone.now())
+
+        # A minute later the budget is back
+        sms.update(sent_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(dispatch('sms'), {'sent': 2, 'failed': 0})
+
+    def test_failures_are_retried_then_given_up(self):
+        self.take_attendance(present=self.students[1:])
+        providers = {
+            'sms': {'BACKEND': 'notification_module.tests.test_notifications.FailingProvider'},
+            'email': {'PATH': self.outbox},
+        }
+        with self.settings(NOTIFICATIONS={'PROVIDERS': providers, 'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 60}):
+            run_pending()
+            notification = Notification.objects.get(channel=Notification.SMS)
+            self.assertEqual((notification.status, notification.attempts), (Notification.QUEUED, 1))
+            self.assertIn('gateway down', notification.last_error)
+            self.assertGreater(notification.send_after, timezone.now())
+
+            Notification.objects.update(send_after=timezone.now())
+            dispatch('sms')
+            self.assertEqual(Notification.objects.get(pk=notification.pk).status, Notification.FAILED)
+
+    def test_concurrent_dispatches_send_each_message_once(self):
+        self.take_attendance()
+        queue_absences(self.session.pk)
+        providers = {
+            'sms': {'BACKEND': 'notification_module.tests.test_notifications.OverlappingProvider',
+                    'PATH': self.outbox, 'BATCH_SIZE': 2, 'RATE_PER_MINUTE': 100},
+        }
+        OverlappingProvider.overlapped = False
+        with self.settings(NOTIFICATIONS={'PROVIDERS': providers}):
+            dispatch('sms')
+        self.assertTrue(OverlappingProvider.overlapped)
+        addresses = [line['to'] for line in self.sent_lines() if line['channel'] == 'sms']
+        self.assertEqual(sorted(addresses), sorted(student.parent_number for student in self.students))
+        self.assertFalse(Notification.objects.filter(channel=Notification.SMS).exclude(status=Notification.SENT).exists())
+
+    def test_messages_left_sending_are_queued_again(self):
+        self.take_attendance()
+        queue_absences(self.session.pk)
+        Notification.objects.update(status=Notification.SENDING, claimed_at=timezone.now() - timedelta(minutes=5))
+        with self.settings(NOTIFICATIONS={'PROVIDERS': {'sms': {'PATH': self.outbox}}, 'SEND_TIMEOUT': 600}):
+            self.assertEqual(dispatch('sms'), {'sent': 0, 'failed': 0})
+        Notification.objects.update(claimed_at=timezone.now() - timedelta(minutes=15))
+        with self.settings(NOTIFICATIONS={'PROVIDERS': {'sms': {'PATH': self.outbox}}, 'SEND_TIMEOUT': 600}):
+            self.assertEqual(dispatch('sms'), {'sent': 5, 'failed': 0})
+
+    def test_only_the_class_members_are_notified(self):
+        # A student of the term in another class, whom the attendance page also records
+        other = User.objects.create_user(
+            username='student9', national_id='0987654329', user_type='student', current_term=self.term,
+            parent_number='09120000009',
+        )
+        Class.objects.create(name="Class B", gender='female', teacher=self.teacher, term=self.term).students.add(other)
+        self.take_attendance(present=self.students)
+        self.assertTrue(self.session.records.filter(student=other, present=False).exists())
+        self.assertEqual(queue_absences(self.session.pk), 0)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_grade_notice(self):
+        score = Score.objects.create(student=self.students[0], term=self.term, quiz_1=20, quiz_2=20, final=40)
+        run_pending()
+        self.assertIn('Student 0 scored 80 out of 100 in Term 1.', [line['body'] for line in self.sent_lines()])
+
+        # The same total again is not a new event
+        score.save()
+        queue_grade(score.pk)
+        self.assertEqual(Notification.objects.filter(kind=Notification.GRADE).count(), 2)
+
+    def test_offline_sync_queues_absences(self):
+        url = reverse('api_teacher_attendance_sync')
+        marks = [{
+            'key': 'a', 'session': self.session.pk, 'student': self.students[0].pk, 'present': False,
+            'marked_at': timezone.now().isoformat(),
+        }]
+        self.client.post(url, json.dumps({'marks': marks}), content_type='application/json')
+        run_pending()
+        self.assertEqual(Notification.objects.filter(status=Notification.SENT).count(), 2)
+
+
+class DispatchTransactionTest(TransactionTestCase):
+    def test_provider_is_called_outside_any_transaction(self):
+        outbox_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outbox_dir)
+        student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', parent_number='09120000000',
+        )
+        Notification.objects.bulk_create([
+            Notification(student=student, kind=Notification.ABSENCE, channel=Notification.SMS,
+                         address=student.parent_number, body=f'Absent {i}', dedup_key=f'absence:{i}')
+            for i in range(3)
+        ])
+        providers = {'sms': {'BACKEND': 'notification_module.tests.test_notifications.TransactionCheckingProvider',
+                             'PATH': Path(outbox_dir) / 'outbox.jsonl', 'BATCH_SIZE': 2}}
+        TransactionCheckingProvider.calls = []
+        with self.settings(NOTIFICATIONS={'PROVIDERS': providers}):
+            enqueue('notification_module.dispatch', {'channel': 'sms'})
+            self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(TransactionCheckingProvider.calls, [(False, 2), (False, 1)])
+        self.assertEqual(Notification.objects.filter(status=Notification.SENT).count(), 3)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from account_module import changes, slug_cache
+from account_module.models import User, Class, Enrollment, AttendanceSession, AttendanceRecord, Score
+from . import attendance_sync
+from .pagination import KeysetPaginator, InvalidCursor
+
+
+class JsonListView(View):
+    """
+    Base class for the read-only panel API.
+
+    Subclasses provide `get_queryset()` and the projected `fields`; this class handles
+    authentication, keyset pagination, serialization and ETag revalidation.
+    """
+    fields = ()
+    expressions = {}
+    key = 'id'
+    user_type = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'detail': 'Authentication required.'}, status=401)
+        if self.user_type and request.user.user_type != self.user_type:
+            return JsonResponse({'detail': 'You are not allowed to access this resource.'}, status=403)
+
+        queryset = self.get_queryset().values(*self.fields, **self.expressions)
+        try:
+            rows, next_cursor = KeysetPaginator(queryset, key=self.key).paginate(request.GET)
+        except InvalidCursor as error:
+            return JsonResponse({'detail': str(error)}, status=400)
+
+        body = json.dumps({'results': rows, 'next': next_cursor}, cls=DjangoJSONEncoder)
+        etag = '"%s"' % hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+# Teacher API
+class TeacherClassesApiView(JsonListView):
+    user_type = 'teacher'
+    fields = ('id', 'name', 'slug', 'gender', 'term_id')
+    expressions = {'term_name': F('term__name')}
+
+    def get_queryset(self):
+        return Class.objects.filter(teacher=self.request.user)
+
+
+class OwnedClassMixin:
+    def class_id(self):
+        """
+        Primary key of the URL's class, from the slug cache. The cached teacher may be
+        stale, so the list queries check ownership themselves.
+        """
+        values = slug_cache.classes.resolve(self.kwargs['class_slug'])
+        return values and values['id']
+
+
+class TeacherClassSessionsApiView(OwnedClassMixin, JsonListView):
+    user_type = 'teacher'
+    fields = ('id', 'session_number')
+
+    def get_queryset(self):
+        class_id = self.class_id()
+        if class_id is None:
+            return AttendanceSession.objects.none()
+        return AttendanceSession.objects.filter(class_obj_id=class_id, class_obj__teacher=self.request.user)
+
+
+class TeacherClassRosterApiView(OwnedClassMixin, JsonListView):
+    user_type = 'teacher'
+    fields = ('id', 'slug', 'first_name', 'last_name', 'gender')
+
+    def get_queryset(self):
+        class_id = self.class_id()
+        if class_id is None:
+            return User.objects.none()
+        return User.objects.filter(
+            user_type='student', enrollments__class_obj_id=class_id,
+            enrollments__class_obj__teacher=self.request.user,
+            enrollments__status__in=Enrollment.MEMBER_STATUSES,
+        )
+
+
+class TeacherTodaySessionsApiView(JsonListView):
+    user_type = 'teacher'
+    fields = ('id', 'session_number', 'date')
+    expressions = {'class_slug': F('class_obj__slug'), 'class_name': F('class_obj__name')}
+
+    def get_queryset(self):
+        # Served by the index on the session date
+        return AttendanceSession.objects.filter(date=timezone.localdate(), class_obj__teacher=self.request.user)
+
+
+class TeacherSessionAttendanceApiView(JsonListView):
+    user_type = 'teacher'
+    fields = ('id', 'student_id', 'present')
+
+    def get_queryset(self):
+        return AttendanceRecord.objects.filter(
+            session_id=self.kwargs['pk'],
+            session__class_obj__teacher=self.request.user,
+        )
+
+
+class TeacherAttendanceSyncApiView(View):
+    """
+    Applies a batch of attendance marks taken offline, across any sessions of the teacher's
+    classes, in one transaction (see attendance_sync). The body is JSON, optionally sent
+    with `Content-Encoding: gzip` or `deflate`:
+
+        {"marks": [{"key": "...", "session": 12, "student": 34, "present": true,
+                    "marked_at": "2024-05-01T08:15:00Z"}, ...]}
+
+    The response has one [key, status] pair per mark, in the order they were sent.
+    """
+    max_marks = 2000
+
+    def read_body(self, request):
+        encoding = request.headers.get('Content-Encoding', 'identity').lower()
+        if encoding == 'identity':
+            return request.body
+        if encoding not in ('gzip', 'deflate'):
+            raise ValueError(f'Unsupported Content-Encoding {encoding!r}.')
+        # Bounded, so a small compressed body cannot expand without limit
+        limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32 if encoding == 'gzip' else zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(request.body, limit)
+        except zlib.error:
+            raise ValueError('The body is not valid compressed data.')
+        if decompressor.unconsumed_tail:
+            raise ValueError('The decompressed body is too large.')
+        return body
+
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse({'detail': 'Authentication required.'}, status=401)
+        if request.user.user_type != 'teacher':
+            return JsonResponse({'detail': 'You are not allowed to access this resource.'}, status=403)
+        try:
+            payload = json.loads(self.read_body(request))
+            marks = payload['marks'] if isinstance(payload, dict) else None
+            if isinstance(marks, list) and len(marks) > self.max_marks:
+                raise ValueError(f'At most {self.max_marks} marks can be sent at once.')
+            results = attendance_sync.apply_marks(request.user, marks)
+        except (ValueError, KeyError):
+            return JsonResponse({'detail': 'Expected {"marks": [...]} as JSON.'}, status=400)
+        return JsonResponse({'results': results})
+
+
+# Student API
+class StudentScoresApiView(JsonListView):
+    user_type = 'student'
+    fields = ('id', 'term_id', 'quiz_1', 'quiz_2', 'oral_or_listening', 'class_activity', 'final')
+    expressions = {'term_name': F('term__name')}
+
+    def get_queryset(self):
+        return Score.objects.filter(student=self.request.user)
+
+
+class StudentAttendanceApiView(JsonListView):
+    user_type = 'student'
+    fields = ('id', 'session_id', 'present')
+    expressions = {
+        'session_number': F('session__session_number'),
+        'class_slug': F('session__class_obj__slug'),
+    }
+
+    def get_queryset(self):
+        return AttendanceRecord.objects.filter(student=self.request.user)
+
+
+# Change feed
+class ChangeFeedApiView(View):
+    """
+    Incremental sync for office systems: the changes logged after the `after` cursor, oldest
+    first. Pass the returned `next` as `after` in the following request; `more` says whether
+    to ask again right away. Requires a staff session or `Authorization: Bearer
+    <CHANGE_FEED['TOKEN']>`.
+
+    A consumer first downloads everything through the other endpoints, then follows the
+    feed from the cursor it got before that download. A cursor older than the pruned part
+    of the log gets 410 and must download everything again.
+    """
+
+    def is_authorized(self, request):
+        token = changes.change_feed_settings()['TOKEN']
+        header = request.headers.get('Authorization', '')
+        if token and header.startswith('Bearer ') and constant_time_compare(header[len('Bearer '):], token):
+            return True
+        return request.user.is_authenticated and request.user.is_staff
+
+    def get(self, request):
+        if not self.is_authorized(request):
+            return JsonResponse({'detail': 'You are not allowed to access this resource.'}, status=403)
+        try:
+            after, limit = KeysetPaginator(None, default_limit=100, max_limit=1000).parse(request.GET)
+            rows, more = changes.feed(after, limit)
+        except InvalidCursor as error:
+            return JsonResponse({'detail': str(error)}, status=400)
+        except changes.CursorExpired as error:
+            return JsonResponse({'detail': str(error)}, status=410)
+
+        next_cursor = rows[-1]['id'] if rows else after
+        return JsonResponse({'results': rows, 'next': next_cursor, 'more': more})
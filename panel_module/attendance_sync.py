@@ -0,0 +1,175 @@
+"""
+Batched attendance sync for teachers working offline.
+
+The client queues marks while offline and posts them in one batch when it reconnects.
+Each mark carries an idempotency key and the time it was taken on the device. Conflicts
+between marks of the same student and session, from this batch, an earlier one or the
+attendance page, are resolved by last writer wins on that time. A mark replayed after a
+lost response therefore changes nothing, and is reported as a duplicate when it is still
+the winning mark.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from account_module import changes
+from account_module.models import Enrollment, AttendanceSession, AttendanceRecord, touch_student_data
+from job_module.jobs import enqueue
+
+APPLIED = 'applied'
+DUPLICATE = 'duplicate'
+STALE = 'stale'
+NOT_FOUND = 'not_found'
+INVALID = 'invalid'
+
+
+class InvalidBatch(ValueError):
+    """
+    Raised when the payload is not a batch of marks at all.
+    """
+
+
+@dataclass
+class Mark:
+    key: str
+    session_id: int
+    student_id: int
+    present: bool
+    marked_at: datetime
+
+
+def parse_mark(item, now):
+    """
+    A Mark from one item of the payload, or None if the item is malformed. Times in the
+    future (a fast device clock) are clamped to now, so they cannot win every later conflict.
+    """
+    if not isinstance(item, dict):
+        return None
+    key, session_id, student_id = item.get('key'), item.get('session'), item.get('student')
+    present, marked_at = item.get('present'), item.get('marked_at')
+    if not isinstance(key, str) or not 0 < len(key) <= 64:
+        return None
+    if type(session_id) is not int or type(student_id) is not int or not isinstance(present, bool):
+        return None
+    try:
+        marked_at = parse_datetime(marked_at) if isinstance(marked_at, str) else None
+    except ValueError:
+        marked_at = None
+    if marked_at is None:
+        return None
+    if timezone.is_naive(marked_at):
+        marked_at = timezone.make_aware(marked_at, dt_timezone.utc)
+    return Mark(key, session_id, student_id, present, min(marked_at, now))
+
+
+def apply_marks(teacher, items):
+    """
+    Apply a batch of marks for `teacher` in one transaction. Returns a [key, status] pair
+    per item, in the order of the payload.
+    """
+    if not isinstance(items, list):
+        raise InvalidBatch('`marks` must be a list.')
+    now = timezone.now()
+    marks = [parse_mark(item, now) for item in items]
+    valid = [mark for mark in marks if mark is not None]
+
+    session_ids = {mark.session_id for mark in valid}
+    student_ids = {mark.student_id for mark in valid}
+    # Sessions of the teacher's classes, and which of the students are enrolled in them
+    class_of_session = dict(
+        AttendanceSession.objects.filter(pk__in=session_ids, class_obj__teacher_id=teacher.pk)
+        .values_list('pk', 'class_obj_id')
+    )
+    enrolled = set(
+        Enrollment.objects.members().filter(
+            class_obj_id__in=set(class_of_session.values()), student_id__in=student_ids,
+        ).values_list('class_obj_id', 'student_id')
+    )
+
+    results = []
+    with transaction.atomic():
+        records = {
+            (record.session_id, record.student_id): record
+            for record in AttendanceRecord.objects.select_for_update().filter(
+                session_id__in=class_of_session, student_id__in=student_ids,
+            )
+        }
+        to_create, to_update = {}, {}
+        # Where the results of the marks applied to each new record are
+        applied_to = {}
+        for item, mark in zip(items, marks):
+            if mark is None:
+                results.append([item.get('key') if isinstance(item, dict) else None, INVALID])
+                continue
+            if (class_of_session.get(mark.session_id), mark.student_id) not in enrolled:
+                results.append([mark.key, NOT_FOUND])
+                continue
+            record = records.get((mark.session_id, mark.student_id))
+            if record is None:
+                record = records[mark.session_id, mark.student_id] = AttendanceRecord(
+                    session_id=mark.session_id, student_id=mark.student_id,
+                )
+                to_create[id(record)] = record
+            elif record.sync_key == mark.key:
+                results.append([mark.key, DUPLICATE])
+                continue
+            elif (record.marked_at or record.updated_at) >= mark.marked_at:
+                results.append([mark.key, STALE])
+                continue
+            elif id(record) not in to_create:
+                to_update[id(record)] = record
+            record.present, record.marked_at, record.sync_key, record.updated_at = (
+                mark.present, mark.marked_at, mark.key, now,
+            )
+            if id(record) in to_create:
+                applied_to.setdefault(id(record), []).append(len(results))
+            results.append([mark.key, APPLIED])
+
+        created = insert_records(list(to_create.values()))
+        kept = {id(record) for record in created}
+        for record in to_create.values():
+            if id(record) not in kept:
+                for index in applied_to[id(record)]:
+                    results[index][1] = STALE
+        AttendanceRecord.objects.bulk_update(
+            to_update.values(), ['present', 'marked_at', 'sync_key', 'updated_at'], batch_size=500,
+        )
+        written = [*created, *to_update.values()]
+        # Bulk writes skip the signals behind the students' page versions and the change log
+        touch_student_data(record.student_id for record in written)
+        changes.record_many(written)
+        for session_id in sorted({record.session_id for record in written if not record.present}):
+            enqueue('notification_module.notify_absences', {'session_id': session_id})
+    return results
+
+
+def insert_records(records):
+    """
+    Insert new records and return those that were written. A record of the same session
+    and student created by a concurrent request since the select is kept, unless the mark
+    being inserted is later, as the marks of existing records are.
+    """
+    AttendanceRecord.objects.bulk_create(records, ignore_conflicts=True)
+    stored = {
+        (row.session_id, row.student_id): row
+        for row in AttendanceRecord.objects.filter(
+            session_id__in={record.session_id for record in records},
+            student_id__in={record.student_id for record in records},
+        )
+    }
+    written = []
+    for record in records:
+        row = stored[record.session_id, record.student_id]
+        if row.sync_key != record.sync_key:
+            later = Q(marked_at__lt=record.marked_at) | Q(marked_at__isnull=True, updated_at__lt=record.marked_at)
+            if not AttendanceRecord.objects.filter(later, pk=row.pk).update(
+                present=record.present, marked_at=record.marked_at, sync_key=record.sync_key,
+                updated_at=record.updated_at,
+            ):
+                continue
+        record.pk = row.pk
+        written.append(record)
+    return written
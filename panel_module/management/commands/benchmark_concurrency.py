@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from .benchmark_views import Command as BenchmarkViewsCommand, percentile
+
+
+class Command(BenchmarkViewsCommand):
+    help = ('Send concurrent requests to the async panel views through the ASGI application '
+            'and report throughput and p50/p95 latency per concurrency level as JSON.')
+    reported_options = ('concurrency', 'requests')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', default='1,2,4,8,16',
+                            help='Comma-separated numbers of requests kept in flight.')
+        parser.add_argument('--requests', type=int, default=64, help='Requests per URL and concurrency level.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrency must be a comma-separated list of integers.')
+        if not levels or min(levels) < 1 or options['requests'] < 1:
+            raise CommandError('Concurrency levels and --requests must be at least 1.')
+        targets = self.sample_targets()
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            application = get_asgi_application()
+            results = [
+                async_to_sync(self.measure_level)(application, case, level, options['requests'])
+                for case in self.async_cases(targets)
+                for level in levels
+            ]
+        report = {'meta': self.metadata(options), 'results': results}
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output)
+            self.stderr.write(f'Wrote {len(results)} results to {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+    def async_cases(self, t):
+        teacher, student, class_obj = t['teacher'], t['student'], t['class_obj']
+        return [
+            # (name, user, url)
+            ('attendance_active_courses', teacher, reverse('attendance_active_courses', args=[teacher.slug])),
+            ('attendance_sessions', teacher, reverse('attendance_sessions', args=[teacher.slug, class_obj.slug])),
+            ('student_panel', student, reverse('student_panel', args=[student.slug])),
+            ('attendance_course', student, reverse('attendance_course', args=[student.slug])),
+            ('score_detail', student, reverse('score_detail', args=[student.slug, class_obj.slug])),
+        ]
+
+    @staticmethod
+    def session_cookie(user):
+        client = Client()
+        client.force_login(user)
+        return f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+    async def measure_level(self, application, case, level, requests):
+        name, user, url = case
+        cookie = await asyncio.to_thread(self.session_cookie, user)
+        semaphore = asyncio.Semaphore(level)
+        timings, statuses = [], {}
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                status = await self.request(application, url, cookie)
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        return {
+            'name': name,
+            'url': url,
+            'concurrency': level,
+            'requests': requests,
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            'throughput_rps': round(requests / elapsed, 1),
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+        }
+
+    @staticmethod
+    async def request(application, url, cookie):
+        """
+        Send one GET through the ASGI application, as an ASGI server would (each request
+        gets its own thread-sensitive context), and return the response status.
+        """
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url,
+            'raw_path': url.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+            'client': ('127.0.0.1', 0),
+            'server': ('testserver', 80),
+        }
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        status = None
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # The client never disconnects; the handler cancels this wait once it has responded
+            await asyncio.Future()
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        await application(scope, receive, send)
+        return status
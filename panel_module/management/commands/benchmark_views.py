@@ -0,0 +1,179 @@
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from account_module.management.commands.generate_dataset import DEFAULT_PASSWORD
+from account_module.models import User, Class, Term, AttendanceSession, AttendanceRecord, Score
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = ('Drive every panel, gateway and index URL through the test client and report '
+            'p50/p95 latency, query counts and peak memory as JSON. Whatever the requests '
+            'write is rolled back.')
+    # Options copied into the report's metadata
+    reported_options = ('iterations', 'warmup')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of the sampled users, for gateway POSTs.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+        targets = self.sample_targets()
+        # The test client talks to the "testserver" host, as it does under the test runner.
+        # The POSTs submit attendance and log users in, which writes records, change-log
+        # rows, sessions and queued absence notifications; none of that may outlive the run.
+        # Neither may the metrics of its requests, kept in memory instead of METRICS['DIR'].
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], METRICS={**settings.METRICS, 'DIR': None},
+        ), transaction.atomic():
+            results = [
+                self.measure(case, options['iterations'], options['warmup'])
+                for case in self.cases(targets, options['password'])
+            ]
+            transaction.set_rollback(True)
+        report = {'meta': self.metadata(options), 'results': results}
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output)
+            self.stderr.write(f'Wrote {len(results)} results to {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+    def sample_targets(self):
+        """
+        Pick the busiest class (and its teacher, a session and a student) so the numbers
+        reflect the worst realistic page rather than an empty one.
+        """
+        class_obj = (
+            Class.objects.annotate(size=Count('students')).filter(size__gt=0)
+            .select_related('teacher').order_by('-size', 'pk').first()
+        )
+        if class_obj is None:
+            raise CommandError('No class with students found; run generate_dataset first.')
+        session = class_obj.attendance_sessions.order_by('session_number').first()
+        if session is None:
+            raise CommandError(f'Class {class_obj} has no attendance sessions.')
+        return {
+            'class_obj': class_obj,
+            'teacher': class_obj.teacher,
+            'session': session,
+            'student': class_obj.students.order_by('pk').first(),
+        }
+
+    def cases(self, t, password):
+        teacher, student, class_obj, session = t['teacher'], t['student'], t['class_obj'], t['session']
+        marks = {f'student_{pk}': 'on' for pk in class_obj.students.values_list('pk', flat=True)}
+        return [
+            # (name, method, user, url, data)
+            ('home', 'get', None, reverse('home'), None),
+            ('register', 'get', None, reverse('register'), None),
+            ('teacher-gateway', 'get', None, reverse('teacher-gateway'), None),
+            ('teacher-gateway', 'post', None, reverse('teacher-gateway'),
+             {'username': teacher.username, 'password': password}),
+            ('student-gateway', 'get', None, reverse('student-gateway'), None),
+            ('student-gateway', 'post', None, reverse('student-gateway'),
+             {'username': student.username, 'password': password}),
+            ('teacher_panel', 'get', teacher, reverse('teacher_panel', args=[teacher.slug]), None),
+            ('attendance_active_courses', 'get', teacher, reverse('attendance_active_courses', args=[teacher.slug]), None),
+            ('attendance_sessions', 'get', teacher, reverse('attendance_sessions', args=[teacher.slug, class_obj.slug]), None),
+            ('attendance_taking', 'get', teacher,
+             reverse('attendance_taking', args=[teacher.slug, class_obj.slug, session.pk]), None),
+            ('attendance_taking', 'post', teacher,
+             reverse('attendance_taking', args=[teacher.slug, class_obj.slug, session.pk]), marks),
+            ('score_active_courses', 'get', teacher, reverse('score_active_courses', args=[teacher.slug]), None),
+            ('score_students', 'get', teacher, reverse('score_students', args=[teacher.slug, class_obj.slug]), None),
+            ('score_taking', 'get', teacher,
+             reverse('score_taking', args=[teacher.slug, class_obj.slug, student.slug]), None),
+            ('student_panel', 'get', student, reverse('student_panel', args=[student.slug]), None),
+            ('attendance_course', 'get', student, reverse('attendance_course', args=[student.slug]), None),
+            ('attendance_info', 'get', student, reverse('attendance_info', args=[student.slug, class_obj.slug]), None),
+            ('score_courses', 'get', student, reverse('score_courses', args=[student.slug]), None),
+            ('score_detail', 'get', student, reverse('score_detail', args=[student.slug, class_obj.slug]), None),
+            ('api_teacher_class_students', 'get', teacher,
+             reverse('api_teacher_class_students', args=[class_obj.slug]), None),
+            ('api_student_attendance', 'get', student, reverse('api_student_attendance'), None),
+        ]
+
+    def measure(self, case, iterations, warmup):
+        name, method, user, url, data = case
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        send = getattr(client, method)
+
+        for _ in range(warmup):
+            send(url, data)
+
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = send(url, data)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Query capture and tracemalloc both add overhead, so they get a run of their own
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            send(url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            'name': name,
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'iterations': iterations,
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def metadata(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            **{name: options[name] for name in self.reported_options},
+            # Row counts identify the dataset, so reports are only compared like for like
+            'dataset': {
+                'terms': Term.objects.count(),
+                'classes': Class.objects.count(),
+                'users': User.objects.count(),
+                'sessions': AttendanceSession.objects.count(),
+                'attendance_records': AttendanceRecord.objects.count(),
+                'scores': Score.objects.count(),
+            },
+        }
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from account_module import slug_cache
+from account_module.models import Class, Enrollment, AttendanceSession
+
+
+@dataclass
+class OwnedObjects:
+    teacher: object
+    class_obj: object
+    session: object = None
+    student: object = None
+
+
+class TeacherOwnershipMixin:
+    """
+    Resolves the teacher, class and (when in the URL) attendance session or student of a
+    teacher panel URL in at most one query. The teacher is `request.user`, which must own
+    the teacher slug in the URL, and the class must be one they teach; anything else is
+    a 404. Ownership is always checked by the query that loads the session, enrollment
+    or class; the slug cache only turns the class slug of class-only URLs into its key.
+
+    The objects are cached on the request, so helpers called while serving it (such as
+    get_context_data) share the one lookup.
+    """
+    teacher_slug_kwarg = 'teacher_slug'
+    class_slug_kwarg = 'class_slug'
+    session_kwarg = None
+    student_slug_kwarg = None
+
+    def get_owned_objects(self):
+        owned = getattr(self.request, '_owned_objects', None)
+        if owned is None:
+            owned = self.request._owned_objects = self.resolve_owned_objects(self.request.user)
+        return owned
+
+    async def aget_owned_objects(self):
+        owned = getattr(self.request, '_owned_objects', None)
+        if owned is None:
+            user = await self.request.auser()
+            owned = await sync_to_async(self.resolve_owned_objects)(user)
+            self.request._owned_objects = owned
+        return owned
+
+    def resolve_owned_objects(self, user):
+        if (not user.is_authenticated or user.user_type != 'teacher'
+                or user.slug != self.kwargs[self.teacher_slug_kwarg]):
+            raise Http404('No class taught by you matches the given query.')
+        class_slug = self.kwargs[self.class_slug_kwarg]
+
+        if self.session_kwarg:
+            session = AttendanceSession.objects.select_related('class_obj__term').filter(
+                pk=self.kwargs[self.session_kwarg], class_obj__slug=class_slug, class_obj__teacher_id=user.pk,
+            ).first()
+            if session is None:
+                raise Http404('No class taught by you matches the given query.')
+            return OwnedObjects(user, session.class_obj, session=session)
+
+        if self.student_slug_kwarg:
+            student = slug_cache.users.get_instance(self.kwargs[self.student_slug_kwarg])
+            if student is None or student.user_type != 'student':
+                raise Http404('No student matches the given query.')
+            # The enrollment row, so enrollment is checked in the same query
+            enrollment = Enrollment.objects.members().select_related('class_obj__term').filter(
+                student_id=student.pk, class_obj__slug=class_slug, class_obj__teacher_id=user.pk,
+            ).first()
+            if enrollment is None:
+                raise Http404('No class taught by you matches the given query.')
+            return OwnedObjects(user, enrollment.class_obj, student=student)
+
+        # The slug cache only names the class; who teaches it is read from the database,
+        # since the cache of another process may still hold the previous teacher
+        values = slug_cache.classes.resolve(class_slug)
+        class_obj = values and Class.objects.select_related('term').filter(
+            pk=values['id'], teacher_id=user.pk,
+        ).first()
+        if not class_obj:
+            raise Http404('No class taught by you matches the given query.')
+        return OwnedObjects(user, class_obj)
+
+
+class StudentDataConditionalMixin:
+    """
+    Answers If-None-Match/If-Modified-Since on a student page with 304 without rendering.
+
+    The validators come from the student's data_version and data_updated_at, which are
+    on the user row loaded for every request anyway, so checking them costs no query.
+    The page must show only the student's own data (see touch_student_data()).
+    """
+
+    @staticmethod
+    def validators(student):
+        if not student.is_authenticated:
+            return None, None
+        last_modified = student.data_updated_at or student.date_joined
+        return f'W/"student-{student.pk}-{student.data_version}"', int(last_modified.timestamp())
+
+    def not_modified_response(self, student):
+        etag, last_modified = self.validators(student)
+        if etag is None:
+            return None
+        return get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+
+    def add_validators(self, response, student):
+        etag, last_modified = self.validators(student)
+        if etag is not None and response.status_code == 200:
+            response.headers.setdefault('ETag', etag)
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+            # Browsers must revalidate rather than reuse the page after the student signs out
+            response.headers.setdefault('Cache-Control', 'private, no-cache')
+        return response
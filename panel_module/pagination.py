@@ -0,0 +1,50 @@
+class InvalidCursor(ValueError):
+    """
+    Raised when the `after` or `limit` query parameters cannot be parsed.
+    """
+
+
+class KeysetPaginator:
+    """
+    Seek-based paginator: each page is `WHERE key > cursor ORDER BY key LIMIT n`.
+
+    Unlike OFFSET pagination the cost of a page does not grow with its position,
+    as long as `key` is unique and indexed (the primary key by default).
+    """
+    default_limit = 50
+    max_limit = 200
+
+    def __init__(self, queryset, key='id', default_limit=None, max_limit=None):
+        self.queryset = queryset
+        self.key = key
+        self.default_limit = default_limit or self.default_limit
+        self.max_limit = max_limit or self.max_limit
+
+    def parse(self, params):
+        """
+        Read the cursor and page size from a QueryDict.
+        """
+        try:
+            after = int(params['after']) if params.get('after') else None
+            limit = int(params['limit']) if params.get('limit') else self.default_limit
+        except ValueError:
+            raise InvalidCursor('`after` and `limit` must be integers.')
+        if limit < 1:
+            raise InvalidCursor('`limit` must be a positive integer.')
+        return after, min(limit, self.max_limit)
+
+    def paginate(self, params):
+        """
+        Return the rows of the requested page and the cursor of the next one (or None).
+        """
+        after, limit = self.parse(params)
+        queryset = self.queryset.order_by(self.key)
+        if after is not None:
+            queryset = queryset.filter(**{f'{self.key}__gt': after})
+
+        # Fetch one extra row to learn whether another page exists without a COUNT query
+        rows = list(queryset[:limit + 1])
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, rows[-1][self.key]
+        return rows, None
@@ -0,0 +1,43 @@
+from django.test import TestCase
+from account_module.models import User, Class, Term, AttendanceSession
+
+
+class PanelTestCase(TestCase):
+    """
+    A term with a teacher's class, one student enrolled in it and its first session.
+    """
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1',
+            national_id='1234567890',
+            first_name='John',
+            last_name='Doe',
+            user_type='teacher',
+            gender='male',
+            password='testpass123',
+            slug='teacher-slug'
+        )
+        self.class_obj = Class.objects.create(
+            name="Class A",
+            gender='female',
+            teacher=self.teacher,
+            term=self.term,
+            slug='class-slug'
+        )
+        self.student = User.objects.create_user(
+            username='student1',
+            national_id='0987654321',
+            first_name='Jane',
+            last_name='Smith',
+            user_type='student',
+            gender='female',
+            password='testpass123',
+            current_term=self.term,
+            slug='student-slug'
+        )
+        self.class_obj.students.add(self.student)
+        self.session = AttendanceSession.objects.create(
+            session_number=1,
+            class_obj=self.class_obj
+        )
@@ -0,0 +1,138 @@
+from django.test import TestCase
+from django.urls import reverse
+from account_module.models import User, Class, Term, AttendanceSession, AttendanceRecord, Score
+
+
+class PanelApiTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1',
+            national_id='1234567890',
+            first_name='John',
+            last_name='Doe',
+            user_type='teacher',
+            gender='male',
+            password='testpass123',
+        )
+        self.class_obj = Class.objects.create(
+            name="Class A",
+            gender='female',
+            teacher=self.teacher,
+            term=self.term,
+            slug='class-slug'
+        )
+        self.students = []
+        for i in range(5):
+            student = User.objects.create_user(
+                username=f'student{i}',
+                national_id=f'098765432{i}',
+                first_name='Jane',
+                last_name=f'Smith {i}',
+                user_type='student',
+                gender='female',
+                password='testpass123',
+                current_term=self.term,
+            )
+            self.students.append(student)
+        self.class_obj.students.add(*self.students)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+        for student in self.students:
+            AttendanceRecord.objects.create(session=self.session, student=student, present=True)
+
+    def test_requires_authentication(self):
+        response = self.client.get(reverse('api_teacher_classes'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_rejects_wrong_user_type(self):
+        self.client.force_login(self.students[0])
+        response = self.client.get(reverse('api_teacher_classes'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_teacher_classes(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('api_teacher_classes'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['next'], None)
+        self.assertEqual(data['results'][0]['slug'], 'class-slug')
+        self.assertEqual(data['results'][0]['term_name'], 'Term 1')
+
+    def test_roster_keyset_pagination(self):
+        self.client.force_login(self.teacher)
+        url = reverse('api_teacher_class_students', args=[self.class_obj.slug])
+
+        first = self.client.get(url, {'limit': 2}).json()
+        self.assertEqual([row['id'] for row in first['results']], [s.id for s in self.students[:2]])
+        self.assertEqual(first['next'], self.students[1].id)
+
+        second = self.client.get(url, {'limit': 2, 'after': first['next']}).json()
+        self.assertEqual([row['id'] for row in second['results']], [s.id for s in self.students[2:4]])
+
+        last = self.client.get(url, {'limit': 2, 'after': second['next']}).json()
+        self.assertEqual([row['id'] for row in last['results']], [self.students[4].id])
+        self.assertIsNone(last['next'])
+
+    def test_invalid_cursor(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('api_teacher_classes'), {'after': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_teacher_cannot_read_roster(self):
+        other = User.objects.create_user(
+            username='teacher2',
+            national_id='2234567890',
+            user_type='teacher',
+            password='testpass123',
+        )
+        self.client.force_login(other)
+        response = self.client.get(reverse('api_teacher_class_students', args=[self.class_obj.slug]))
+        self.assertEqual(response.json()['results'], [])
+
+    def test_roster_ignores_the_cached_teacher(self):
+        self.client.force_login(self.teacher)
+        url = reverse('api_teacher_class_students', args=[self.class_obj.slug])
+        self.assertEqual(len(self.client.get(url).json()['results']), 5)
+        # The slug cache still names this teacher; the query must not
+        other = User.objects.create_user(username='teacher2', national_id='2234567890', user_type='teacher')
+        Class.objects.filter(pk=self.class_obj.pk).update(teacher=other)
+        self.assertEqual(self.client.get(url).json()['results'], [])
+        url = reverse('api_teacher_class_sessions', args=[self.class_obj.slug])
+        self.assertEqual(self.client.get(url).json()['results'], [])
+
+    def test_session_attendance(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('api_teacher_session_attendance', args=[self.session.pk]))
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_etag_not_modified(self):
+        self.client.force_login(self.teacher)
+        url = reverse('api_teacher_class_sessions', args=[self.class_obj.slug])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        AttendanceSession.objects.create(session_number=2, class_obj=self.class_obj)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_student_scores_and_attendance(self):
+        student = self.students[0]
+        Score.objects.create(student=student, term=self.term, quiz_1=10, final=20)
+        self.client.force_login(student)
+
+        scores = self.client.get(reverse('api_student_scores')).json()['results']
+        self.assertEqual(len(scores), 1)
+        self.assertEqual(scores[0]['final'], 20)
+
+        attendance = self.client.get(reverse('api_student_attendance')).json()['results']
+        self.assertEqual(attendance, [{
+            'id': attendance[0]['id'],
+            'session_id': self.session.id,
+            'present': True,
+            'session_number': 1,
+            'class_slug': 'class-slug',
+        }])
@@ -0,0 +1,147 @@
+import gzip
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from account_module.models import User, Class, Term, AttendanceSession, AttendanceRecord, Change
+
+
+class AttendanceSyncApiTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', password='testpass123',
+        )
+        self.other_teacher = User.objects.create_user(
+            username='teacher2', national_id='2234567890', user_type='teacher', password='testpass123',
+        )
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term,
+        )
+        self.class_a = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.class_b = Class.objects.create(name="Class B", gender='female', teacher=self.teacher, term=self.term)
+        self.foreign_class = Class.objects.create(
+            name="Class C", gender='female', teacher=self.other_teacher, term=self.term,
+        )
+        for class_obj in (self.class_a, self.class_b, self.foreign_class):
+            class_obj.students.add(self.student)
+        self.session_a = AttendanceSession.objects.create(session_number=1, class_obj=self.class_a)
+        self.session_b = AttendanceSession.objects.create(session_number=1, class_obj=self.class_b)
+        self.foreign_session = AttendanceSession.objects.create(session_number=1, class_obj=self.foreign_class)
+        self.url = reverse('api_teacher_attendance_sync')
+        self.client.force_login(self.teacher)
+
+    def mark(self, key, session, present=True, minutes_ago=10, student=None):
+        marked_at = timezone.now() - timedelta(minutes=minutes_ago)
+        return {
+            'key': key, 'session': session.pk, 'student': (student or self.student).pk, 'present': present,
+            'marked_at': marked_at.isoformat(),
+        }
+
+    def sync(self, *marks, **headers):
+        body = json.dumps({'marks': list(marks)})
+        response = self.client.post(self.url, body, content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def record(self, session):
+        return AttendanceRecord.objects.get(session=session, student=self.student)
+
+    def test_marks_across_sessions_and_classes(self):
+        results = self.sync(self.mark('a', self.session_a), self.mark('b', self.session_b, present=False))
+        self.assertEqual(results, [['a', 'applied'], ['b', 'applied']])
+        self.assertTrue(self.record(self.session_a).present)
+        self.assertFalse(self.record(self.session_b).present)
+        self.assertEqual(self.record(self.session_a).sync_key, 'a')
+        self.assertEqual(Change.objects.filter(table='attendance_record').count(), 2)
+
+    def test_replayed_batch_is_a_duplicate(self):
+        marks = [self.mark('a', self.session_a)]
+        self.sync(*marks)
+        self.assertEqual(self.sync(*marks), [['a', 'duplicate']])
+        self.assertEqual(AttendanceRecord.objects.count(), 1)
+
+    def test_one_record_per_student_and_session(self):
+        AttendanceRecord.objects.create(session=self.session_a, student=self.student)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AttendanceRecord.objects.create(session=self.session_a, student=self.student)
+
+    def test_record_created_concurrently_keeps_the_later_mark(self):
+        self.sync(self.mark('a', self.session_a, minutes_ago=10))
+        # As if the record was created by another request after this one's select
+        unseen = mock.patch.object(AttendanceRecord.objects, 'select_for_update', return_value=AttendanceRecord.objects.none())
+        with unseen:
+            self.assertEqual(self.sync(self.mark('b', self.session_a, present=False, minutes_ago=20)), [['b', 'stale']])
+        record = self.record(self.session_a)
+        self.assertEqual((record.present, record.sync_key), (True, 'a'))
+        with unseen:
+            self.assertEqual(self.sync(self.mark('c', self.session_a, present=False, minutes_ago=5)), [['c', 'applied']])
+        record = self.record(self.session_a)
+        self.assertEqual((record.present, record.sync_key), (False, 'c'))
+        self.assertEqual(AttendanceRecord.objects.count(), 1)
+
+    def test_last_writer_wins(self):
+        results = self.sync(
+            self.mark('new', self.session_a, present=True, minutes_ago=5),
+            self.mark('old', self.session_a, present=False, minutes_ago=20),
+        )
+        self.assertEqual(results, [['new', 'applied'], ['old', 'stale']])
+        self.assertTrue(self.record(self.session_a).present)
+
+        self.assertEqual(self.sync(self.mark('newer', self.session_a, present=False, minutes_ago=1)),
+                         [['newer', 'applied']])
+        self.assertFalse(self.record(self.session_a).present)
+
+    def test_offline_marks_older_than_the_attendance_page_lose(self):
+        url = reverse('attendance_taking', args=[self.teacher.slug, self.class_a.slug, self.session_a.pk])
+        self.client.post(url, {f'student_{self.student.pk}': 'on'})
+        self.assertEqual(self.sync(self.mark('a', self.session_a, present=False)), [['a', 'stale']])
+        self.assertTrue(self.record(self.session_a).present)
+
+    def test_future_timestamps_are_clamped(self):
+        self.sync(self.mark('future', self.session_a, minutes_ago=-60 * 24))
+        self.assertLessEqual(self.record(self.session_a).marked_at, timezone.now())
+
+    def test_other_teachers_sessions_and_unenrolled_students(self):
+        outsider = User.objects.create_user(username='student2', national_id='1987654321', user_type='student')
+        results = self.sync(
+            self.mark('foreign', self.foreign_session),
+            self.mark('outsider', self.session_a, student=outsider),
+            {'key': 'broken', 'session': 'x'},
+        )
+        self.assertEqual(results, [['foreign', 'not_found'], ['outsider', 'not_found'], ['broken', 'invalid']])
+        self.assertFalse(AttendanceRecord.objects.exists())
+
+    def test_gzip_body(self):
+        body = gzip.compress(json.dumps({'marks': [self.mark('a', self.session_a)]}).encode())
+        response = self.client.post(
+            self.url, body, content_type='application/json', headers={'Content-Encoding': 'gzip'},
+        )
+        self.assertEqual(response.json()['results'], [['a', 'applied']])
+
+    def test_bad_requests(self):
+        for body, headers in (
+            ('not json', {}),
+            (json.dumps({'marks': 'nope'}), {}),
+            ('plain', {'Content-Encoding': 'gzip'}),
+            ('plain', {'Content-Encoding': 'br'}),
+        ):
+            response = self.client.post(self.url, body, content_type='application/json', headers=headers)
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_oversized_decompressed_body(self):
+        body = gzip.compress(b' ' * (3 * 1024 * 1024))
+        with self.settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1024 * 1024):
+            response = self.client.post(
+                self.url, body, content_type='application/json', headers={'Content-Encoding': 'gzip'},
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_teachers_only(self):
+        self.client.force_login(self.student)
+        response = self.client.post(self.url, '{"marks": []}', content_type='application/json')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command, CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from account_module.models import AttendanceRecord
+from job_module.models import Job
+
+
+class BenchmarkViewsCommandTest(TestCase):
+    def test_reports_every_url(self):
+        call_command('generate_dataset', terms=1, classes_per_gender=1, students=6, teachers=1, stdout=StringIO())
+        records = AttendanceRecord.objects.count()
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS={'DIR': directory}):
+            call_command('benchmark_views', iterations=2, warmup=0, stdout=out, stderr=StringIO())
+            # Nor are the metrics of its requests
+            self.assertEqual(os.listdir(directory), [])
+        report = json.loads(out.getvalue())
+        # The attendance POSTs are rolled back
+        self.assertEqual(AttendanceRecord.objects.count(), records)
+        self.assertFalse(Job.objects.exists())
+
+        self.assertEqual(report['meta']['dataset']['users'], 7)
+        names = {result['name'] for result in report['results']}
+        self.assertIn('attendance_taking', names)
+        self.assertIn('student-gateway', names)
+        for result in report['results']:
+            self.assertLess(result['status'], 400, result)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_requires_data(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_views', stdout=StringIO())
+
+
+class BenchmarkConcurrencyCommandTest(TransactionTestCase):
+    # The ASGI handler serves each request from its own thread and connection, which
+    # would not see the data of a TestCase transaction
+    def test_reports_every_level(self):
+        call_command('generate_dataset', terms=1, classes_per_gender=1, students=6, teachers=1, stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_concurrency', concurrency='1,4', requests=8, stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['meta']['concurrency'], '1,4')
+        self.assertEqual({result['concurrency'] for result in report['results']}, {1, 4})
+        self.assertIn('attendance_sessions', {result['name'] for result in report['results']})
+        for result in report['results']:
+            self.assertEqual(result['statuses'], {'200': 8}, result)
+            self.assertGreater(result['throughput_rps'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+
+    def test_rejects_bad_levels(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_concurrency', concurrency='0', stdout=StringIO())
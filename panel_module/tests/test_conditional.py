@@ -0,0 +1,88 @@
+from django.test import TestCase
+from django.urls import reverse
+from account_module.models import User, Class, Term, AttendanceSession, AttendanceRecord, Score
+
+
+class StudentConditionalGetTest(TestCase):
+    def setUp(self):
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', password='testpass123',
+        )
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term,
+            password='testpass123',
+        )
+        self.class_obj = Class.objects.create(name="Class A", gender='female', teacher=self.teacher, term=self.term)
+        self.class_obj.students.add(self.student)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+        self.record = AttendanceRecord.objects.create(session=self.session, student=self.student, present=False)
+        self.score = Score.objects.create(student=self.student, term=self.term, final=10)
+        self.score_url = reverse('score_detail', args=[self.student.slug, self.class_obj.slug])
+        self.attendance_url = reverse('attendance_info', args=[self.student.slug, self.class_obj.slug])
+        self.client.force_login(self.student)
+
+    def revalidate(self, url, response):
+        return self.client.get(url, headers={
+            'If-None-Match': response['ETag'], 'If-Modified-Since': response['Last-Modified'],
+        })
+
+    def test_unchanged_pages_are_not_rendered_again(self):
+        for url in (self.score_url, self.attendance_url):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['ETag'].startswith('W/"student-'))
+            self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+            with self.assertNumQueries(2):  # session and user
+                revalidated = self.revalidate(url, response)
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.content, b'')
+
+    def test_score_change_invalidates(self):
+        response = self.client.get(self.score_url)
+        self.score.final = 30
+        self.score.save()
+        revalidated = self.client.get(self.score_url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+
+    def test_attendance_taken_by_the_teacher_invalidates(self):
+        response = self.client.get(self.attendance_url)
+        self.client.force_login(self.teacher)
+        url = reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.pk])
+        self.client.post(url, {f'student_{self.student.pk}': 'on'})
+        self.record.refresh_from_db()
+        self.assertTrue(self.record.present)
+
+        self.client.force_login(self.student)
+        revalidated = self.client.get(self.attendance_url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 200)
+
+    def test_other_students_changes_do_not_invalidate(self):
+        response = self.client.get(self.score_url)
+        other = User.objects.create_user(username='student2', national_id='1987654321', user_type='student')
+        Score.objects.create(student=other, term=self.term, final=50)
+        self.assertEqual(self.revalidate(self.score_url, response).status_code, 304)
+
+    def test_validators_are_per_student(self):
+        response = self.client.get(self.score_url)
+        other = User.objects.create_user(username='student2', national_id='1987654321', user_type='student')
+        self.client.force_login(other)
+        revalidated = self.client.get(self.score_url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 200)
+
+    def test_class_rename_invalidates(self):
+        response = self.client.get(self.attendance_url)
+        self.term.name = 'Spring'
+        self.term.save()
+        self.assertEqual(self.revalidate(self.attendance_url, response).status_code, 200)
+
+    def test_updated_at_is_maintained(self):
+        before = self.record.updated_at
+        AttendanceRecord.objects.filter(pk=self.record.pk).update(updated_at=before.replace(year=2000))
+        self.client.force_login(self.teacher)
+        url = reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.pk])
+        self.client.post(url, {f'student_{self.student.pk}': 'on'})
+        self.record.refresh_from_db()
+        self.assertGreaterEqual(self.record.updated_at, before)
@@ -0,0 +1,110 @@
+from django.http import Http404
+from django.test import TestCase, RequestFactory
+from django.urls import reverse
+from account_module import slug_cache
+from account_module.models import User, Class, Term, AttendanceSession
+from panel_module.views import TakeAttendanceView, SetScoreView, ScoresStudentsView
+
+
+class TeacherOwnershipMixinTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.term = Term.objects.create(name="Term 1", order=1)
+        self.teacher = User.objects.create_user(
+            username='teacher1', national_id='1234567890', user_type='teacher', slug='teacher-slug',
+        )
+        self.other_teacher = User.objects.create_user(
+            username='teacher2', national_id='2234567890', user_type='teacher', slug='other-slug',
+        )
+        self.student = User.objects.create_user(
+            username='student1', national_id='0987654321', user_type='student', current_term=self.term,
+            slug='student-slug',
+        )
+        self.outsider = User.objects.create_user(
+            username='student2', national_id='1987654321', user_type='student', current_term=self.term,
+            slug='outsider-slug',
+        )
+        self.class_obj = Class.objects.create(
+            name="Class A", gender='male', teacher=self.teacher, term=self.term, slug='class-slug',
+        )
+        self.class_obj.students.add(self.student)
+        self.session = AttendanceSession.objects.create(session_number=1, class_obj=self.class_obj)
+
+    def view(self, view_class, user, **kwargs):
+        request = self.factory.get('/')
+        request.user = user
+        view = view_class()
+        view.setup(request, teacher_slug=user.slug, class_slug=self.class_obj.slug, **kwargs)
+        return view
+
+    def test_session_url_resolves_in_one_query(self):
+        view = self.view(TakeAttendanceView, self.teacher, pk=self.session.pk)
+        with self.assertNumQueries(1):
+            owned = view.get_owned_objects()
+            self.assertEqual(owned.class_obj.term, self.term)
+        self.assertEqual((owned.teacher, owned.class_obj, owned.session), (self.teacher, self.class_obj, self.session))
+
+        # Cached on the request
+        with self.assertNumQueries(0):
+            self.assertIs(view.get_owned_objects(), owned)
+
+    def test_student_url_resolves_in_one_query(self):
+        slug_cache.users.resolve(self.student.slug)
+        view = self.view(SetScoreView, self.teacher, student_slug=self.student.slug)
+        with self.assertNumQueries(1):
+            owned = view.get_owned_objects()
+        self.assertEqual((owned.class_obj, owned.student), (self.class_obj, self.student))
+
+    def test_student_must_be_enrolled(self):
+        view = self.view(SetScoreView, self.teacher, student_slug=self.outsider.slug)
+        with self.assertRaises(Http404):
+            view.get_owned_objects()
+
+    def test_class_url_resolves_in_one_query(self):
+        slug_cache.classes.resolve(self.class_obj.slug)
+        view = self.view(ScoresStudentsView, self.teacher)
+        with self.assertNumQueries(1):
+            owned = view.get_owned_objects()
+            self.assertEqual(owned.class_obj.term.name, self.term.name)
+        self.assertEqual(owned.class_obj, self.class_obj)
+
+    def test_class_url_ignores_the_cached_teacher(self):
+        slug_cache.classes.resolve(self.class_obj.slug)
+        # As another process would: the cache keeps the teacher it read
+        Class.objects.filter(pk=self.class_obj.pk).update(teacher=self.other_teacher)
+        with self.assertRaises(Http404):
+            self.view(ScoresStudentsView, self.teacher).get_owned_objects()
+        owned = self.view(ScoresStudentsView, self.other_teacher).get_owned_objects()
+        self.assertEqual(owned.class_obj, self.class_obj)
+
+    def test_class_of_another_teacher(self):
+        view = self.view(ScoresStudentsView, self.other_teacher)
+        with self.assertRaises(Http404):
+            view.get_owned_objects()
+
+    def test_session_of_another_class(self):
+        other_class = Class.objects.create(name="Class B", gender='male', teacher=self.other_teacher, term=self.term)
+        other_session = AttendanceSession.objects.create(session_number=1, class_obj=other_class)
+        view = self.view(TakeAttendanceView, self.teacher, pk=other_session.pk)
+        with self.assertRaises(Http404):
+            view.get_owned_objects()
+
+    def test_views_reject_other_teachers(self):
+        self.client.force_login(self.other_teacher)
+        urls = [
+            reverse('attendance_sessions', args=[self.teacher.slug, self.class_obj.slug]),
+            reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.pk]),
+            reverse('score_students', args=[self.teacher.slug, self.class_obj.slug]),
+            reverse('score_taking', args=[self.teacher.slug, self.class_obj.slug, self.student.slug]),
+            # Their own slug does not help with a class they do not teach
+            reverse('attendance_taking', args=[self.other_teacher.slug, self.class_obj.slug, self.session.pk]),
+        ]
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+        response = self.client.post(urls[1], {f'student_{self.student.pk}': 'on'})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(self.session.records.exists())
+
+    def test_anonymous_user(self):
+        url = reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,186 @@
+import difflib
+import json
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, URLPattern
+from django.utils import timezone
+from account_module import slug_cache, urls as account_urls
+from account_module.models import User, Class, Term, AttendanceSession, AttendanceRecord, Score
+from panel_module import urls as panel_urls
+from panel_module.tests.base import PanelTestCase
+
+SCORE_DATA = {'quiz_1': 20, 'quiz_2': 20, 'oral_or_listening': 10, 'class_activity': 10, 'final': 10}
+
+# (url name, HTTP method, user to log in as, URL args, POST data)
+CASES = [
+    ('teacher_panel', 'get', 'teacher', lambda t: [t.teacher.slug], None),
+    ('attendance_active_courses', 'get', 'teacher', lambda t: [t.teacher.slug], None),
+    ('attendance_sessions', 'get', 'teacher', lambda t: [t.teacher.slug, t.class_obj.slug], None),
+    ('attendance_taking', 'get', 'teacher', lambda t: [t.teacher.slug, t.class_obj.slug, t.session.pk], None),
+    ('attendance_taking', 'post', 'teacher', lambda t: [t.teacher.slug, t.class_obj.slug, t.session.pk],
+     lambda t: {f'student_{pk}': 'on' for pk in t.class_obj.students.values_list('pk', flat=True)}),
+    ('attendance_success', 'get', 'teacher', lambda t: [], None),
+    ('score_active_courses', 'get', 'teacher', lambda t: [t.teacher.slug], None),
+    ('score_students', 'get', 'teacher', lambda t: [t.teacher.slug, t.class_obj.slug], None),
+    ('score_taking', 'get', 'teacher', lambda t: [t.teacher.slug, t.class_obj.slug, t.student.slug], None),
+    ('score_taking', 'post', 'teacher', lambda t: [t.teacher.slug, t.class_obj.slug, t.student.slug],
+     lambda t: SCORE_DATA),
+    ('student_panel', 'get', 'student', lambda t: [t.student.slug], None),
+    ('attendance_course', 'get', 'student', lambda t: [t.student.slug], None),
+    ('attendance_info', 'get', 'student', lambda t: [t.student.slug, t.class_obj.slug], None),
+    ('score_courses', 'get', 'student', lambda t: [t.student.slug], None),
+    ('score_detail', 'get', 'student', lambda t: [t.student.slug, t.class_obj.slug], None),
+    ('api_teacher_classes', 'get', 'teacher', lambda t: [], None),
+    ('api_teacher_class_sessions', 'get', 'teacher', lambda t: [t.class_obj.slug], None),
+    ('api_teacher_class_students', 'get', 'teacher', lambda t: [t.class_obj.slug], None),
+    ('api_teacher_today_sessions', 'get', 'teacher', lambda t: [], None),
+    ('api_teacher_session_attendance', 'get', 'teacher', lambda t: [t.session.pk], None),
+    ('api_teacher_attendance_sync', 'post', 'teacher', lambda t: [], lambda t: t.sync_payload()),
+    ('api_student_scores', 'get', 'student', lambda t: [], None),
+    ('api_student_attendance', 'get', 'student', lambda t: [], None),
+    ('api_changes', 'get', 'staff', lambda t: [], None),
+    ('register', 'get', None, lambda t: [], None),
+    ('register', 'post', None, lambda t: [], lambda t: t.registration_data()),
+    ('teacher-gateway', 'get', None, lambda t: [], None),
+    ('teacher-gateway', 'post', None, lambda t: [], lambda t: {'username': '1234567890', 'password': 'testpass123'}),
+    ('student-gateway', 'get', None, lambda t: [], None),
+    ('student-gateway', 'post', None, lambda t: [], lambda t: {'username': '0987654321', 'password': 'testpass123'}),
+    ('student-search', 'get', 'staff', lambda t: [], None),
+]
+
+
+def normalize(sql):
+    """
+    Blank out literals so that the diff shows structural differences, not changed ids.
+    """
+    return re.sub(r"'[^']*'|\b\d+\b", '?', sql)
+
+
+class QueryBudgetTest(PanelTestCase):
+    """
+    Every panel and gateway URL must issue the same number of queries whether the
+    class has a couple of students or a dozen; any per-row query is an N+1 regression.
+    """
+    small_size = 2
+    large_size = 12
+
+    def setUp(self):
+        super().setUp()
+        self.staff = User.objects.create_user(
+            username='staff1',
+            national_id='1111111111',
+            user_type='teacher',
+            is_staff=True,
+        )
+        # Grade submissions in both runs then update an existing score rather than creating one
+        Score.objects.create(student=self.student, term=self.term, final=10)
+        self.registrations = 0
+        self.size = 0
+
+    def grow(self, size):
+        """
+        Bulk-add rows until the dataset has `size` extra students, sessions, terms and classes.
+        """
+        start, self.size = self.size, size
+        students = User.objects.bulk_create([
+            User(
+                username=f'20{i:08d}', national_id=f'20{i:08d}', slug=f'seed-student-{i}',
+                first_name='Seed', last_name=f'Student {i}', user_type='student', gender='female',
+                current_term=self.term,
+            )
+            for i in range(start, size)
+        ])
+        self.class_obj.students.add(*students)
+        AttendanceSession.objects.bulk_create([
+            AttendanceSession(session_number=i + 2, class_obj=self.class_obj) for i in range(start, size)
+        ])
+        terms = Term.objects.bulk_create([
+            Term(name=f'Archive {i}', slug=f'archive-{i}', order=100 + i) for i in range(start, size)
+        ])
+        classes = Class.objects.bulk_create([
+            Class(name=f'Class {i}', slug=f'class-{i}', gender='female', teacher=self.teacher, term=term)
+            for i, term in zip(range(start, size), terms)
+        ])
+        for class_obj in classes:
+            class_obj.students.add(self.student)
+
+        # Reset the attendance grid so every student has an (absent) mark for every session
+        roster = list(self.class_obj.students.all())
+        AttendanceRecord.objects.filter(session__class_obj=self.class_obj).delete()
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(session=session, student=student, present=False)
+            for session in self.class_obj.attendance_sessions.all() for student in roster
+        ])
+        Score.objects.bulk_create(
+            [Score(student=self.student, term=term, final=50) for term in terms]
+            + [Score(student=student, term=self.term, final=50) for student in students]
+        )
+
+    def registration_data(self):
+        self.registrations += 1
+        national_id = f'30{self.size:04d}{self.registrations:04d}'
+        return {
+            'first_name': 'New', 'last_name': 'Student', 'user_type': 'student', 'gender': 'male',
+            'national_id': national_id, 'parent_number': '09123456789',
+            'password': 'securepassword123', 'confirm_password': 'securepassword123',
+        }
+
+    def sync_payload(self):
+        marked_at = timezone.now().isoformat()
+        return json.dumps({'marks': [
+            {'key': f'{self.size}-{pk}', 'session': self.session.pk, 'student': pk, 'present': True,
+             'marked_at': marked_at}
+            for pk in self.class_obj.students.values_list('pk', flat=True)
+        ]})
+
+    def capture(self, name, method, user, args, data):
+        self.client.logout()
+        if user:
+            self.client.force_login(getattr(self, user))
+        url = reverse(name, args=args(self))
+        payload = data(self) if data else None
+        # Measure every request against a cold slug cache, so both runs pay the same lookups
+        cache.clear()
+        for slugs in (slug_cache.users, slug_cache.classes):
+            slugs.local.clear()
+        with CaptureQueriesContext(connection) as queries:
+            if isinstance(payload, str):
+                response = getattr(self.client, method)(url, payload, content_type='application/json')
+            else:
+                response = getattr(self.client, method)(url, payload)
+        self.assertLess(response.status_code, 400, f'{method.upper()} {url} returned {response.status_code}')
+        return [normalize(query['sql']) for query in queries.captured_queries]
+
+    def capture_all(self):
+        return [self.capture(*case) for case in CASES]
+
+    def test_query_counts_are_constant(self):
+        self.grow(self.small_size)
+        small = self.capture_all()
+        self.grow(self.large_size)
+        large = self.capture_all()
+
+        failures = []
+        for case, small_sql, large_sql in zip(CASES, small, large):
+            if len(small_sql) != len(large_sql):
+                diff = '\n'.join(difflib.unified_diff(
+                    small_sql, large_sql, f'{self.small_size} rows', f'{self.large_size} rows', lineterm=''
+                ))
+                failures.append(
+                    f'{case[1].upper()} {case[0]}: {len(small_sql)} queries -> {len(large_sql)} queries\n{diff}'
+                )
+        if failures:
+            self.fail('Query count grows with data size:\n\n' + '\n\n'.join(failures))
+
+    def test_every_url_has_a_budget(self):
+        covered = {case[0] for case in CASES}
+        names = {
+            pattern.name
+            for module in (panel_urls, account_urls)
+            for pattern in module.urlpatterns
+            if isinstance(pattern, URLPattern)
+        }
+        self.assertEqual(names - covered, set())
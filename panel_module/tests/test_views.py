@@ -2,7 +2,7 @@ from django.test import TestCase, RequestFactory
 from django.urls import reverse, resolve
 from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
-from account_module.models import User, Class, Term, AttendanceSession, AttendanceRecord, Score
+from account_module.models import User, AttendanceRecord, Score
 from panel_module.views import (
     TeacherPanelView, TeacherActiveCoursesView, ClassSessionsView, TakeAttendanceView,
     AttendanceSuccessView, TeacherActiveCoursesForScoresView, ScoresStudentsView,
@@ -10,6 +10,7 @@ from panel_module.views import (
     StudentScoreActiveCoursesView, StudentScoreDetailView
 )
 from panel_module.forms import ScoreForm
+from panel_module.tests.base import PanelTestCase
 
 User = get_user_model()
 
@@ -81,43 +82,10 @@ class URLTests(TestCase):
         self.assertEqual(resolve(url).func.view_class, StudentScoreDetailView)
 
 
-class TeacherPanelViewsTest(TestCase):
+class TeacherPanelViewsTest(PanelTestCase):
     def setUp(self):
+        super().setUp()
         self.factory = RequestFactory()
-        self.teacher = User.objects.create_user(
-            username='teacher1',
-            national_id='1234567890',
-            first_name='John',
-            last_name='Doe',
-            user_type='teacher',
-            gender='male',
-            password='testpass123',
-            slug='teacher-slug'
-        )
-        self.term = Term.objects.create(name="Term 1", order=1)
-        self.class_obj = Class.objects.create(
-            name="Class A",
-            gender='male',
-            teacher=self.teacher,
-            term=self.term,
-            slug='class-slug'
-        )
-        self.student = User.objects.create_user(
-            username='student1',
-            national_id='0987654321',
-            first_name='Jane',
-            last_name='Smith',
-            user_type='student',
-            gender='female',
-            password='testpass123',
-            current_term=self.term,
-            slug='student-slug'
-        )
-        self.class_obj.students.add(self.student)
-        self.session = AttendanceSession.objects.create(
-            session_number=1,
-            class_obj=self.class_obj
-        )
 
     def test_teacher_panel_view(self):
         self.client.force_login(self.teacher)
@@ -141,6 +109,31 @@ class TeacherPanelViewsTest(TestCase):
         self.assertEqual(response.context['class_obj'], self.class_obj)
         self.assertIn(self.session, response.context['sessions'])
 
+    def test_class_sessions_view_other_teachers_class(self):
+        other = User.objects.create_user(
+            username='teacher2', national_id='1111111111', user_type='teacher', slug='other-slug',
+        )
+        self.client.force_login(other)
+        response = self.client.get(reverse('attendance_sessions', args=[other.slug, self.class_obj.slug]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('attendance_sessions', args=['missing', self.class_obj.slug]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_views_are_async(self):
+        for view in (TeacherActiveCoursesView, ClassSessionsView, StudentPanelView,
+                     StudentActiveCoursesView, StudentScoreDetailView):
+            self.assertTrue(view.view_is_async, view.__name__)
+
+    async def test_class_sessions_view_async_client(self):
+        await self.async_client.aforce_login(self.teacher)
+        response = await self.async_client.get(
+            reverse('attendance_sessions', args=[self.teacher.slug, self.class_obj.slug])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['sessions']), [self.session])
+        # Queries run in sync_to_async threads are still counted against the request
+        self.assertNotIn('"0 queries"', response['Server-Timing'])
+
     def test_take_attendance_view_get(self):
         self.client.force_login(self.teacher)
         response = self.client.get(reverse('attendance_taking', args=[self.teacher.slug, self.class_obj.slug, self.session.id]))
@@ -203,41 +196,9 @@ class TeacherPanelViewsTest(TestCase):
         self.assertTrue(Score.objects.filter(student=self.student).exists())
 
 
-class StudentPanelViewsTest(TestCase):
+class StudentPanelViewsTest(PanelTestCase):
     def setUp(self):
-        self.teacher = User.objects.create_user(
-            username='teacher1',
-            national_id='1234567890',
-            first_name='John',
-            last_name='Doe',
-            user_type='teacher',
-            gender='male',
-            password='testpass123'
-        )
-        self.term = Term.objects.create(name="Term 1", order=1)
-        self.class_obj = Class.objects.create(
-            name="Class A",
-            gender='male',
-            teacher=self.teacher,
-            term=self.term,
-            slug='class-slug'
-        )
-        self.student = User.objects.create_user(
-            username='student1',
-            national_id='0987654321',
-            first_name='Jane',
-            last_name='Smith',
-            user_type='student',
-            gender='female',
-            password='testpass123',
-            current_term=self.term,
-            slug='student-slug'
-        )
-        self.class_obj.students.add(self.student)
-        self.session = AttendanceSession.objects.create(
-            session_number=1,
-            class_obj=self.class_obj
-        )
+        super().setUp()
         self.attendance_record = AttendanceRecord.objects.create(
             session=self.session,
             student=self.student,
@@ -1,5 +1,5 @@
 from django.urls import path
-from panel_module import views
+from panel_module import views, api_views
 
 urlpatterns = [
     path('teacher-panel/<slug:slug>/', views.TeacherPanelView.as_view(), name='teacher_panel'),
@@ -20,4 +20,15 @@ urlpatterns = [
     path('student-panel/<slug:student_slug>/attendance/<slug:class_slug>/', views.StudentAttendanceDetailView.as_view(), name='attendance_info'),
     path('student-panel/<slug:slug>/score/', views.StudentScoreActiveCoursesView.as_view(), name='score_courses'),
     path('student-panel/<slug:student_slug>/score/<slug:class_slug>/', views.StudentScoreDetailView.as_view(), name='score_detail'),
+
+    # Read-only JSON API
+    path('api/teacher/classes/', api_views.TeacherClassesApiView.as_view(), name='api_teacher_classes'),
+    path('api/teacher/classes/<slug:class_slug>/sessions/', api_views.TeacherClassSessionsApiView.as_view(), name='api_teacher_class_sessions'),
+    path('api/teacher/classes/<slug:class_slug>/students/', api_views.TeacherClassRosterApiView.as_view(), name='api_teacher_class_students'),
+    path('api/teacher/sessions/today/', api_views.TeacherTodaySessionsApiView.as_view(), name='api_teacher_today_sessions'),
+    path('api/teacher/sessions/<int:pk>/attendance/', api_views.TeacherSessionAttendanceApiView.as_view(), name='api_teacher_session_attendance'),
+    path('api/teacher/attendance/sync/', api_views.TeacherAttendanceSyncApiView.as_view(), name='api_teacher_attendance_sync'),
+    path('api/student/scores/', api_views.StudentScoresApiView.as_view(), name='api_student_scores'),
+    path('api/student/attendance/', api_views.StudentAttendanceApiView.as_view(), name='api_student_attendance'),
+    path('api/changes/', api_views.ChangeFeedApiView.as_view(), name='api_changes'),
 ]
\ No newline at end of file
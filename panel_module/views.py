@@ -1,9 +1,21 @@
-from django.shortcuts import render, get_object_or_404, redirect
+import asyncio
+
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import render, redirect
 from django.urls import reverse
+from django.utils import timezone
 from django.views.generic import TemplateView, View
 from django.contrib import messages
-from account_module.models import User, Class, AttendanceSession, AttendanceRecord, Score, Term
+from account_module import changes, cold_storage
+from account_module.attendance_archive import session_presence, student_class_records
+from job_module.jobs import enqueue
+from account_module.models import (
+    User, Class, Enrollment, AttendanceSession, AttendanceRecord, Score, Term, touch_student_data,
+)
 from .forms import ScoreForm
+from .mixins import TeacherOwnershipMixin, StudentDataConditionalMixin
 
 
 # Teacher Panel Views
@@ -20,58 +32,60 @@ class TeacherPanelView(TemplateView):
 class TeacherActiveCoursesView(TemplateView):
     template_name = 'teacher_panel/teacher_active_courses.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        current_teacher = self.request.user
+    async def get(self, request, *args, **kwargs):
+        current_teacher = await request.auser()
 
-        # Filter classes taught by the current teacher and having at least one student
-        classes = Class.objects.filter(teacher=current_teacher, students__isnull=False).distinct()
+        # Filter classes taught by the current teacher and having at least one active student
+        classes = [
+            class_obj async for class_obj in
+            Class.objects.filter(teacher=current_teacher, enrollments__status=Enrollment.ACTIVE).distinct()
+        ]
 
-        context['current_teacher'] = current_teacher
-        context['classes'] = classes
-        return context
+        context = self.get_context_data(current_teacher=current_teacher, classes=classes, **kwargs)
+        return self.render_to_response(context)
 
 
-class ClassSessionsView(TemplateView):
+class ClassSessionsView(TeacherOwnershipMixin, TemplateView):
     template_name = 'teacher_panel/class_sessions.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    async def get(self, request, *args, **kwargs):
+        teacher = await request.auser()
 
-        # Retrieve the teacher by their slug
-        teacher_slug = self.kwargs.get('teacher_slug')
-        teacher = get_object_or_404(User, slug=teacher_slug)
-
-        # Retrieve the class by its slug and ensure it belongs to the teacher
-        class_slug = self.kwargs.get('class_slug')
-        class_obj = get_object_or_404(Class, slug=class_slug, teacher=teacher)
+        # The owned class and its sessions are independent lookups on the URL slug, so they
+        # are issued together; sessions of a class the teacher does not own are never shown
+        # because the ownership lookup raises 404
+        owned, sessions = await asyncio.gather(
+            self.aget_owned_objects(),
+            self.sessions(self.kwargs['class_slug'], teacher.pk),
+        )
 
-        # Retrieve all sessions for the class
-        sessions = class_obj.attendance_sessions.all()
+        context = self.get_context_data(teacher=owned.teacher, class_obj=owned.class_obj, sessions=sessions, **kwargs)
+        return self.render_to_response(context)
 
-        # Add data to the context
-        context['teacher'] = teacher
-        context['class_obj'] = class_obj
-        context['sessions'] = sessions
+    @staticmethod
+    async def sessions(class_slug, teacher_id):
+        return [
+            session async for session in AttendanceSession.objects.filter(
+                class_obj__slug=class_slug, class_obj__teacher_id=teacher_id,
+            )
+        ]
 
-        return context
 
+class TakeAttendanceView(TeacherOwnershipMixin, View):
+    session_kwarg = 'pk'
 
-class TakeAttendanceView(View):
     def get(self, request, teacher_slug, class_slug, pk):
-        teacher = get_object_or_404(User, slug=teacher_slug, user_type='teacher')
-        class_obj = get_object_or_404(Class, slug=class_slug)
-        session = get_object_or_404(AttendanceSession, pk=pk, class_obj=class_obj)
-
-        if teacher != class_obj.teacher:
-            return render(request, 'error.html', {'message': 'You are not authorized to take attendance for this class.'})
+        owned = self.get_owned_objects()
+        teacher, class_obj, session = owned.teacher, owned.class_obj, owned.session
 
         students = User.objects.filter(user_type='student', current_term=class_obj.term)
-        students_with_attendance = []
-        for student in students:
-            attendance_record = AttendanceRecord.objects.filter(session=session, student=student).first()
-            is_present = attendance_record.present if attendance_record else False
-            students_with_attendance.append({'student': student, 'is_present': is_present})
+        # One query for every mark in the session instead of one per student, archived
+        # marks included
+        present_by_student = session_presence(session)
+        students_with_attendance = [
+            {'student': student, 'is_present': present_by_student.get(student.id, False)}
+            for student in students
+        ]
 
         return render(request, 'teacher_panel/take_attendance.html', {
             'teacher': teacher,
@@ -81,21 +95,43 @@ class TakeAttendanceView(View):
         })
 
     def post(self, request, teacher_slug, class_slug, pk):
-        teacher = get_object_or_404(User, slug=teacher_slug, user_type='teacher')
-        class_obj = get_object_or_404(Class, slug=class_slug)
-        session = get_object_or_404(AttendanceSession, pk=pk, class_obj=class_obj)
-
-        if teacher != class_obj.teacher:
-            return render(request, 'error.html', {'message': 'You are not authorized to take attendance for this class.'})
-
-        students = User.objects.filter(user_type='student', current_term=class_obj.term)
-        for student in students:
-            present = request.POST.get(f'student_{student.id}') == 'on'
-            AttendanceRecord.objects.update_or_create(
-                session=session,
-                student=student,
-                defaults={'present': present}
+        owned = self.get_owned_objects()
+        class_obj, session = owned.class_obj, owned.session
+
+        student_ids = User.objects.filter(
+            user_type='student', current_term=class_obj.term
+        ).values_list('id', flat=True)
+        existing = {record.student_id: record for record in AttendanceRecord.objects.filter(session=session)}
+        now = timezone.now()
+        to_create, to_update = [], []
+        for student_id in student_ids:
+            present = request.POST.get(f'student_{student_id}') == 'on'
+            record = existing.get(student_id)
+            if record is None:
+                to_create.append(AttendanceRecord(
+                    session=session, student_id=student_id, present=present, marked_at=now,
+                ))
+            elif record.present != present:
+                record.present = present
+                record.marked_at = now
+                record.sync_key = None
+                # bulk_update() does not apply auto_now
+                record.updated_at = now
+                to_update.append(record)
+
+        with transaction.atomic():
+            AttendanceRecord.objects.bulk_create(
+                to_create, update_conflicts=True, unique_fields=['session', 'student'],
+                update_fields=['present', 'marked_at', 'sync_key', 'updated_at'],
             )
+            AttendanceRecord.objects.bulk_update(to_update, ['present', 'marked_at', 'sync_key', 'updated_at'])
+            # Bulk writes skip the signals that mark the students' pages as changed and
+            # feed the change log
+            touch_student_data(record.student_id for record in to_create + to_update)
+            changes.record_many(to_create + to_update)
+            # Parents of absent students are notified by the job worker, never by this request
+            if any(not record.present for record in to_create + to_update):
+                enqueue('notification_module.notify_absences', {'session_id': session.pk})
         return redirect('attendance_success')
 
 
@@ -111,54 +147,54 @@ class TeacherActiveCoursesForScoresView(TemplateView):
         context = super().get_context_data(**kwargs)
         current_teacher = self.request.user
 
-        # Filter classes taught by the current teacher and having at least one student
-        classes = Class.objects.filter(teacher=current_teacher, students__isnull=False).distinct()
+        # Filter classes taught by the current teacher and having at least one active student
+        classes = Class.objects.filter(teacher=current_teacher, enrollments__status=Enrollment.ACTIVE).distinct()
 
         context['current_teacher'] = current_teacher
         context['classes'] = classes
         return context
 
 
-class ScoresStudentsView(TemplateView):
+class ScoresStudentsView(TeacherOwnershipMixin, TemplateView):
     template_name = 'teacher_panel/scores_Students.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Retrieve the teacher by their slug
-        teacher_slug = self.kwargs.get('teacher_slug')
-        teacher = get_object_or_404(User, slug=teacher_slug)
-
-        # Retrieve the class by its slug and ensure it belongs to the teacher
-        class_slug = self.kwargs.get('class_slug')
-        class_obj = get_object_or_404(Class, slug=class_slug, teacher=teacher)
-        students = class_obj.students.filter(user_type='student')
+        # The teacher and the class, which must belong to them
+        owned = self.get_owned_objects()
+        class_obj = owned.class_obj
+        students = User.objects.filter(
+            user_type='student', enrollments__class_obj=class_obj,
+            enrollments__status__in=Enrollment.MEMBER_STATUSES,
+        )
 
-        context['teacher'] = teacher
+        context['teacher'] = owned.teacher
         context['class_obj'] = class_obj
         context['students'] = students
         return context
 
 
-class SetScoreView(View):
+class SetScoreView(TeacherOwnershipMixin, View):
+    student_slug_kwarg = 'student_slug'
+
     def get(self, request, teacher_slug, class_slug, student_slug):
+        self.get_owned_objects()
         score_form = ScoreForm()
         context = {'score_form': score_form}
         return render(request, 'teacher_panel/set_score.html', context)
 
     def post(self, request, teacher_slug, class_slug, student_slug):
-        teacher = get_object_or_404(User, slug=teacher_slug, user_type='teacher')
-        class_obj = get_object_or_404(Class, slug=class_slug)
-        student = get_object_or_404(User, slug=student_slug, user_type='student')
-
-        if teacher != class_obj.teacher:
-            return render(request, 'error.html', {'message': 'You are not authorized to access this page.'})
+        owned = self.get_owned_objects()
+        teacher, class_obj, student = owned.teacher, owned.class_obj, owned.student
 
-        score_form = ScoreForm(request.POST)
+        # Re-submitting grades edits the student's score for the term instead of adding another one
+        existing_score = Score.objects.filter(student=student, term_id=class_obj.term_id).first()
+        score_form = ScoreForm(request.POST, instance=existing_score)
         if score_form.is_valid():
             score = score_form.save(commit=False)
             score.student = student
-            score.term = class_obj.term
+            score.term_id = class_obj.term_id
             score.save()
             messages.success(request, 'Scores saved successfully.')
             return redirect(reverse('score_students', args=[teacher.slug, class_obj.slug]))
@@ -170,33 +206,50 @@ class SetScoreView(View):
 class StudentPanelView(TemplateView):
     template_name = 'student_panel/student_panel.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        current_student = self.request.user
-        context['current_student'] = current_student
-        return context
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(current_student=await request.auser(), **kwargs)
+        return self.render_to_response(context)
 
 
 class StudentActiveCoursesView(TemplateView):
     template_name = 'student_panel/student_active_course.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        current_student = self.request.user
-        classes = Class.objects.filter(students=current_student)
-        context['current_student'] = current_student
-        context['classes'] = classes
-        return context
+    async def get(self, request, *args, **kwargs):
+        current_student = await request.auser()
+        classes = [
+            class_obj async for class_obj in
+            Class.objects.filter(
+                enrollments__student=current_student, enrollments__status=Enrollment.ACTIVE,
+            ).select_related('term')
+        ]
+        context = self.get_context_data(current_student=current_student, classes=classes, **kwargs)
+        return self.render_to_response(context)
 
 
-class StudentAttendanceDetailView(TemplateView):
+class StudentAttendanceDetailView(StudentDataConditionalMixin, TemplateView):
     template_name = 'student_panel/student_attendance_detail.html'
 
+    def get(self, request, *args, **kwargs):
+        not_modified = self.not_modified_response(request.user)
+        if not_modified is not None:
+            return not_modified
+        return self.add_validators(super().get(request, *args, **kwargs), request.user)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         current_student = self.request.user
-        class_obj = get_object_or_404(Class, students=current_student)
-        sessions_info = AttendanceRecord.objects.filter(session__class_obj=class_obj, student_id=current_student.id)
+        # Classes the student finished stay readable
+        class_slug = self.kwargs.get('class_slug')
+        class_obj = Class.objects.select_related('term').filter(
+            slug=class_slug, enrollments__student=current_student,
+            enrollments__status__in=Enrollment.MEMBER_STATUSES,
+        ).first() or cold_storage.archived_class(current_student, class_slug)
+        if class_obj is None:
+            raise Http404('No such class.')
+        # Live and archived records alike; see account_module.attendance_archive
+        sessions_info = student_class_records(
+            current_student, class_obj, using=cold_storage.records_db(class_obj.term),
+        )
         context['current_student'] = current_student
         context['sessions_info'] = sessions_info
         context['class_obj'] = class_obj
@@ -217,11 +270,10 @@ class StudentScoreActiveCoursesView(TemplateView):
             .distinct()
         )
 
-        # Retrieve the Term objects for those terms
-        previous_terms = Term.objects.filter(id__in=terms_with_scores).order_by('-order')
-
-        # Debugging: Print the terms to verify
-        print("Previous Terms:", previous_terms)
+        # Retrieve the Term objects for those terms, archived ones included
+        previous_terms = Term.objects.filter(
+            Q(id__in=terms_with_scores) | Q(id__in=cold_storage.archived_score_term_ids(current_student))
+        ).order_by('-order')
 
         # Add data to the context
         context['current_student'] = current_student
@@ -229,15 +281,16 @@ class StudentScoreActiveCoursesView(TemplateView):
         return context
 
 
-class StudentScoreDetailView(TemplateView):
+class StudentScoreDetailView(StudentDataConditionalMixin, TemplateView):
     template_name = 'student_panel/student_score_detail.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        current_student = self.request.user
+    async def get(self, request, *args, **kwargs):
+        current_student = await request.auser()
+        not_modified = self.not_modified_response(current_student)
+        if not_modified is not None:
+            return not_modified
         # class_obj = get_object_or_404(Class, students=current_student)
-        scores = Score.objects.filter(student_id=current_student.id)
-        context['current_student'] = current_student
-        context['scores'] = scores
+        scores = await cold_storage.transcript(current_student)
+        context = self.get_context_data(current_student=current_student, scores=scores, **kwargs)
         # context['class_obj'] = class_obj
-        return context
\ No newline at end of file
+        return self.add_validators(self.render_to_response(context), current_student)
\ No newline at end of file